@@ -1,6 +1,12 @@
 from AlgorithmImports import *
 from datetime import date, datetime, timedelta, time as clock_time
 
+from lib.daily_bars import DailyBars
+from lib.event_calendar import EventCalendar
+from lib.spread_mark import SpreadMarks
+from lib.spread_search import SpreadLimits, SpreadSearch
+from lib.trade_journal import CLOSE, OPEN, STOP, TradeJournal
+
 
 class NickSpxZeroDteV1(QCAlgorithm):
     """SPXW 0DTE gap-reversal credit-spread strategy."""
@@ -50,9 +56,9 @@ class NickSpxZeroDteV1(QCAlgorithm):
         # triggers when the estimated spread-closing debit reaches $1.50.
         self.stop_loss_multiple = 100.0
 
-        # Scheduled high-impact days on which the strategy does not trade.
-        self.fomc_dates = self.build_fomc_dates()
-        self.pmi_dates = self.build_ism_pmi_dates(date(2020, 1, 1), date(2030, 12, 31))
+        # Scheduled high-impact days (FOMC, ISM PMI) on which the strategy
+        # does not trade.
+        self.event_calendar = EventCalendar.load(date(2020, 1, 1), date(2030, 12, 31))
 
         # Active spread.
         self.active_short_symbol = None
@@ -61,7 +67,33 @@ class NickSpxZeroDteV1(QCAlgorithm):
         self.active_long_strike = None
         self.active_spread_type = None
         self.active_entry_credit = None
-        self.stop_order_submitted = False
+        # Marks the open spread from its legs' quotes; fires the stop.
+        self.marks = SpreadMarks()
+        self.active_mark = None
+
+        # Trade records; their log lines are written at the end of the backtest.
+        self.journal = TradeJournal()
+        self.opened = self.journal.kind(
+            OPEN,
+            ("spx", "short_strike", "short_bid", "long_strike", "long_ask", "credit", "total_credit",
+             "short_otm", "hedge_otm", "width", "max_risk"),
+            "OPEN TRADE | {time:%Y-%m-%d %H:%M} ET | {tag} | SPX {spx:.2f} | "
+            "SELL {short_strike:.0f} @ {short_bid:.2f} | BUY {long_strike:.0f} @ {long_ask:.2f} | "
+            "NET {credit:.2f} | TOTAL ${total_credit:,.0f} | SHORT OTM {short_otm:.2%} | "
+            "HEDGE OTM {hedge_otm:.2%} | WIDTH {width:.0f} | MAX RISK ${max_risk:,.0f}"
+        )
+        self.stopped = self.journal.kind(
+            STOP,
+            ("entry_credit", "multiple", "level", "estimated_close"),
+            "STOP LOSS | {time:%Y-%m-%d %H:%M} ET | {tag} | ENTRY CREDIT {entry_credit:.2f} | "
+            "{multiple:g}X LEVEL {level:.2f} | ESTIMATED CLOSE {estimated_close:.2f}"
+        )
+        self.closed = self.journal.kind(
+            CLOSE,
+            ("spx", "short_strike", "long_strike"),
+            "CLOSE TRADE | {time:%Y-%m-%d %H:%M} ET | {tag} | SPX {spx:.2f} | "
+            "SHORT {short_strike:.0f} ITM | LONG {long_strike:.0f}"
+        )
 
         # Combined-spread statistics. QC's normal win rate counts each leg.
         self.spread_starting_equity = None
@@ -76,6 +108,10 @@ class NickSpxZeroDteV1(QCAlgorithm):
         self.consolidator.data_consolidated += self.on_signal_bar
         self.subscription_manager.add_consolidator(self.spx, self.consolidator)
 
+        # Completed sessions' OHLC, rolled forward from every SPX minute bar in
+        # on_data; the first session seeds it with a single history request.
+        self.daily_bars = DailyBars()
+
         self.schedule.on(
             self.date_rules.every_day(self.spx),
             self.time_rules.at(9, 29),
@@ -113,16 +149,15 @@ class NickSpxZeroDteV1(QCAlgorithm):
                 self.clear_active_spread()
 
         today = self.time.date()
-        if today in self.fomc_dates or today in self.pmi_dates:
+        if self.event_calendar.is_blackout(today):
             self.skip_today = True
             return
 
-        history = list(self.history[TradeBar](self.spx, 5, Resolution.DAILY))
-        completed = [bar for bar in history if bar.end_time.date() < today]
-        if not completed:
+        if not self.daily_bars.seeded:
+            self.daily_bars.seed(self.history[TradeBar](self.spx, 5, Resolution.DAILY))
+        self.previous_close = self.daily_bars.previous_close(today)
+        if self.previous_close is None:
             self.skip_today = True
-            return
-        self.previous_close = completed[-1].close
 
     def on_signal_bar(self, sender, bar):
         now = self.time.time()
@@ -202,7 +237,10 @@ class NickSpxZeroDteV1(QCAlgorithm):
     def on_data(self, data):
         # Monitor an existing position every minute. The stop is based on the
         # complete spread price, not on either option leg by itself.
-        self.check_three_x_stop()
+        self.marks.update(data)
+        bar = data.bars.get(self.spx)
+        if bar is not None:
+            self.daily_bars.update(bar)
 
         if self.pending_signal is None or self.skip_today or self.traded_today:
             return
@@ -247,116 +285,59 @@ class NickSpxZeroDteV1(QCAlgorithm):
         self.active_long_strike = long_contract.strike
         self.active_spread_type = spread_type
         self.active_entry_credit = credit
-        self.stop_order_submitted = False
+        self.active_mark = self.marks.track(
+            [(short_contract.symbol, -1), (long_contract.symbol, 1)],
+            credit,
+            stop_price=credit * self.stop_loss_multiple,
+            on_stop=self.on_three_x_stop,
+            quotes=[
+                (short_contract.bid_price, short_contract.ask_price),
+                (long_contract.bid_price, long_contract.ask_price)
+            ]
+        )
         self.spread_starting_equity = float(self.portfolio.total_portfolio_value)
         self.traded_today = True
         self.pending_signal = None
 
-        # Only actual trades are logged.
-        self.log(
-            f"OPEN TRADE | {self.signal_time:%Y-%m-%d %H:%M} ET | {spread_type} | "
-            f"SPX {self.signal_spx_price:.2f} | "
-            f"SELL {short_contract.strike:.0f} @ {short_contract.bid_price:.2f} | "
-            f"BUY {long_contract.strike:.0f} @ {long_contract.ask_price:.2f} | "
-            f"NET {credit:.2f} | TOTAL ${total_credit:,.0f} | "
-            f"SHORT OTM {short_otm:.2%} | HEDGE OTM {hedge_otm:.2%} | "
-            f"WIDTH {width:.0f} | MAX RISK ${maximum_loss:,.0f}"
+        # Only actual trades are journaled.
+        self.journal.record(
+            self.opened, self.signal_time,
+            self.signal_spx_price, short_contract.strike, short_contract.bid_price,
+            long_contract.strike, long_contract.ask_price, credit, total_credit,
+            short_otm, hedge_otm, width, maximum_loss,
+            tag=spread_type
         )
 
     def select_spread(self, contracts, signal, spot):
         """Return the valid spread closest to the desired $0.60/$0.10/$0.50 prices."""
-        if signal == "BULL_PUT":
-            short_limit = spot * (1 - self.minimum_short_otm_percent)
-            hedge_limit = spot * (1 - self.maximum_hedge_otm_percent)
-            short_candidates = [
-                c for c in contracts
-                if c.right == OptionRight.PUT
-                and hedge_limit < c.strike <= short_limit
-                and self.minimum_short_price <= c.bid_price <= self.maximum_short_price
-            ]
-        else:
-            short_limit = spot * (1 + self.minimum_short_otm_percent)
-            hedge_limit = spot * (1 + self.maximum_hedge_otm_percent)
-            short_candidates = [
-                c for c in contracts
-                if c.right == OptionRight.CALL
-                and short_limit <= c.strike < hedge_limit
-                and self.minimum_short_price <= c.bid_price <= self.maximum_short_price
-            ]
+        right = OptionRight.PUT if signal == "BULL_PUT" else OptionRight.CALL
+        limits = SpreadLimits.from_algorithm(self)
+        return SpreadSearch(contracts).best(right, signal, spot, limits)
 
-        best = None
-        best_score = float("inf")
-        for short in short_candidates:
-            for long in contracts:
-                if long.right != short.right:
-                    continue
-                if long.ask_price <= 0 or long.ask_price > self.maximum_hedge_price:
-                    continue
-
-                if signal == "BULL_PUT":
-                    valid_strike = hedge_limit <= long.strike < short.strike
-                else:
-                    valid_strike = short.strike < long.strike <= hedge_limit
-                if not valid_strike:
-                    continue
-
-                credit = short.bid_price - long.ask_price
-                if not self.minimum_net_credit <= credit <= self.maximum_net_credit:
-                    continue
-
-                score = (
-                    abs(short.bid_price - self.short_target_price)
-                    + abs(long.ask_price - self.hedge_target_price)
-                    + abs(credit - self.credit_target)
-                )
-                if score < best_score:
-                    best_score = score
-                    best = (short, long, credit)
-        return best
-
-    def check_three_x_stop(self):
+    def on_three_x_stop(self, mark):
         """
         Close the complete spread when its estimated closing debit reaches
         the configured multiple of the opening credit.
 
         Example: a spread opened for $0.50 is stopped at an estimated $1.50.
-        Closing debit = short option ask - long option bid.
+        Closing debit = short option ask - long option bid, kept current by
+        self.marks from the two legs' quotes.
         """
-        if (
-            self.active_short_symbol is None
-            or self.active_long_symbol is None
-            or self.active_entry_credit is None
-            or self.stop_order_submitted
-        ):
-            return
-
         short_qty = self.portfolio[self.active_short_symbol].quantity
         long_qty = self.portfolio[self.active_long_symbol].quantity
         if short_qty == 0 and long_qty == 0:
+            # Entry combo not filled yet (or already closed): test again next bar
+            self.marks.rearm(mark)
             return
 
-        short_security = self.securities[self.active_short_symbol]
-        long_security = self.securities[self.active_long_symbol]
-        short_ask = float(short_security.ask_price)
-        long_bid = float(long_security.bid_price)
-
-        # Do not act on incomplete or stale zero quotes.
-        if short_ask <= 0 or long_bid < 0:
-            return
-
-        closing_debit = max(short_ask - long_bid, 0)
-        stop_price = (
-            self.active_entry_credit
-            * self.stop_loss_multiple
-        )
-        if closing_debit < stop_price:
-            return
-
+        closing_debit = max(mark.price, 0)
+        stop_price = mark.stop_price
         if not (
             short_qty < 0
             and long_qty > 0
             and abs(short_qty) == abs(long_qty)
         ):
+            self.marks.rearm(mark)
             return
 
         closing_legs = [
@@ -373,15 +354,13 @@ class NickSpxZeroDteV1(QCAlgorithm):
             )
         )
         if any(ticket.status == OrderStatus.INVALID for ticket in tickets):
+            self.marks.rearm(mark)
             return
 
-        self.stop_order_submitted = True
-        self.log(
-            f"STOP LOSS | {self.time:%Y-%m-%d %H:%M} ET | "
-            f"{self.active_spread_type} | "
-            f"ENTRY CREDIT {self.active_entry_credit:.2f} | "
-            f"{self.stop_loss_multiple:g}X LEVEL {stop_price:.2f} | "
-            f"ESTIMATED CLOSE {closing_debit:.2f}"
+        self.journal.record(
+            self.stopped, self.time,
+            self.active_entry_credit, self.stop_loss_multiple, stop_price, closing_debit,
+            tag=self.active_spread_type
         )
         self.clear_active_spread()
 
@@ -424,10 +403,10 @@ class NickSpxZeroDteV1(QCAlgorithm):
 
         if any(ticket.status == OrderStatus.INVALID for ticket in tickets):
             return
-        self.log(
-            f"CLOSE TRADE | {self.time:%Y-%m-%d %H:%M} ET | "
-            f"{self.active_spread_type} | SPX {spot:.2f} | "
-            f"SHORT {self.active_short_strike:.0f} ITM | LONG {self.active_long_strike:.0f}"
+        self.journal.record(
+            self.closed, self.time,
+            spot, self.active_short_strike, self.active_long_strike,
+            tag=self.active_spread_type
         )
         self.clear_active_spread()
 
@@ -438,7 +417,9 @@ class NickSpxZeroDteV1(QCAlgorithm):
         self.active_long_strike = None
         self.active_spread_type = None
         self.active_entry_credit = None
-        self.stop_order_submitted = False
+        if self.active_mark is not None:
+            self.marks.untrack(self.active_mark)
+            self.active_mark = None
 
     def finalize_previous_spread(self):
         ending_equity = float(self.portfolio.total_portfolio_value)
@@ -466,78 +447,4 @@ class NickSpxZeroDteV1(QCAlgorithm):
     def on_end_of_algorithm(self):
         if self.spread_starting_equity is not None:
             self.finalize_previous_spread()
-
-    @staticmethod
-    def build_fomc_dates():
-        """Scheduled FOMC decision dates (not minutes-release dates)."""
-        raw = """
-        2020-01-29 2020-03-03 2020-03-15 2020-04-29 2020-06-10 2020-07-29 2020-09-16 2020-11-05 2020-12-16
-        2021-01-27 2021-03-17 2021-04-28 2021-06-16 2021-07-28 2021-09-22 2021-11-03 2021-12-15
-        2022-01-26 2022-03-16 2022-05-04 2022-06-15 2022-07-27 2022-09-21 2022-11-02 2022-12-14
-        2023-02-01 2023-03-22 2023-05-03 2023-06-14 2023-07-26 2023-09-20 2023-11-01 2023-12-13
-        2024-01-31 2024-03-20 2024-05-01 2024-06-12 2024-07-31 2024-09-18 2024-11-07 2024-12-18
-        2025-01-29 2025-03-19 2025-05-07 2025-06-18 2025-07-30 2025-09-17 2025-10-29 2025-12-10
-        2026-01-28 2026-03-18 2026-04-29 2026-06-17 2026-07-29 2026-09-16 2026-10-28 2026-12-09
-        """
-        return {datetime.strptime(x, "%Y-%m-%d").date() for x in raw.split()}
-
-    @staticmethod
-    def build_ism_pmi_dates(start, end):
-        """
-        ISM Manufacturing and Services PMI days.
-
-        ISM normally releases them on the first and third business days. For
-        trading purposes a business day is represented by a weekday, with the
-        observed New-Year, Independence-Day, Thanksgiving and Christmas shifts
-        below. January has historically had special ISM scheduling, so verified
-        January dates for 2020-2026 replace the general calculation.
-        """
-        fixed_holidays = set()
-        for year in range(start.year, end.year + 1):
-            # New Year's Day, Independence Day and Christmas (observed).
-            for month, day_number in ((1, 1), (7, 4), (12, 25)):
-                d = date(year, month, day_number)
-                if d.weekday() == 5:
-                    d -= timedelta(days=1)
-                elif d.weekday() == 6:
-                    d += timedelta(days=1)
-                fixed_holidays.add(d)
-            # Thanksgiving.
-            d = date(year, 11, 1)
-            while d.weekday() != 3:
-                d += timedelta(days=1)
-            fixed_holidays.add(d + timedelta(days=21))
-
-            # Labor Day: the first Monday in September. This commonly moves
-            # September Manufacturing PMI from Monday to Tuesday.
-            d = date(year, 9, 1)
-            while d.weekday() != 0:
-                d += timedelta(days=1)
-            fixed_holidays.add(d)
-
-        dates = set()
-        for year in range(start.year, end.year + 1):
-            for month in range(1, 13):
-                business_days = []
-                d = date(year, month, 1)
-                while d.month == month and len(business_days) < 3:
-                    if d.weekday() < 5 and d not in fixed_holidays:
-                        business_days.append(d)
-                    d += timedelta(days=1)
-                dates.add(business_days[0])
-                dates.add(business_days[2])
-
-        # Verified ISM January exceptions/schedules.
-        january = {
-            2020: (date(2020, 1, 3), date(2020, 1, 7)),
-            2021: (date(2021, 1, 5), date(2021, 1, 7)),
-            2022: (date(2022, 1, 4), date(2022, 1, 6)),
-            2023: (date(2023, 1, 4), date(2023, 1, 6)),
-            2024: (date(2024, 1, 3), date(2024, 1, 5)),
-            2025: (date(2025, 1, 3), date(2025, 1, 7)),
-            2026: (date(2026, 1, 5), date(2026, 1, 7)),
-        }
-        for year, pair in january.items():
-            dates = {d for d in dates if not (d.year == year and d.month == 1)}
-            dates.update(pair)
-        return {d for d in dates if start <= d <= end}
+        self.journal.emit(self.log)
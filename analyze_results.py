@@ -0,0 +1,31 @@
+import argparse
+import os
+
+from lib.export_analytics import (
+    PMCC_TRADES, EquityCurveWriter, ExportSummary, analyze_export, analyze_trades, write_yearly_csv,
+)
+
+# python3 analyze_results.py                              results/trades.csv, like analyze_results.rb
+# python3 analyze_results.py data/QQQ_21_7_35_28_84       an exported backtest (Trades + Daily Settlement)
+parser = argparse.ArgumentParser(description="Summarize a PMCC trades file or a backtest export directory.")
+parser.add_argument("path", nargs="?", default="results/trades.csv")
+parser.add_argument("--equity-curve", help="write date,equity,drawdown rows here (export directories)")
+parser.add_argument("--yearly", help="write Year,Profit/Loss rows here")
+args = parser.parse_args()
+
+if os.path.isdir(args.path):
+    if args.equity_curve:
+        with EquityCurveWriter(args.equity_curve) as curve:
+            summary = analyze_export(args.path, curve)
+    else:
+        summary = analyze_export(args.path)
+else:
+    summary = ExportSummary(analyze_trades(args.path, PMCC_TRADES))
+
+print(f"\n=== {args.path} ===")
+for line in summary.lines():
+    print(line)
+print("==============================\n")
+
+if args.yearly:
+    write_yearly_csv(summary.trades, args.yearly)
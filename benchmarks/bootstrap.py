@@ -0,0 +1,134 @@
+"""
+Throughput of lib.bootstrap, and checks of what its resampled paths keep.
+
+Times drawing --paths 15-year (return, VIX, bar) paths per scheme by
+index gather, against the copy loop it replaces (one block slice
+appended at a time, timed on a sample and scaled up). Then streams
+synthetic histories through run_pmcc and reports histories per second
+and the tracemalloc peak for 200 and for 1,000 histories, which should
+match: memory is one chunk however many histories are drawn. Checks:
+
+- every resampled (return, VIX) pair is a historical session;
+- blocks run on consecutive sessions, and a new block opens every
+  block_days sessions (circular) or with probability 1 / block_days
+  (stationary);
+- the returns' mean, vol and volatility clustering (lag-1
+  autocorrelation of |return|) stay near the history's;
+- a seed gives the same stream every time.
+
+    python3 -m benchmarks.bootstrap [--paths 10000] [--block-days 21]
+"""
+import argparse
+import time
+import tracemalloc
+
+import numpy as np
+
+from lib.bootstrap import CIRCULAR, KINDS, market_resampler, market_rows, synthetic_histories
+from lib.market_data import load_market_data
+from lib.pmcc import PmccConfig, run_pmcc, summarize
+
+SESSIONS = 252 * 15
+
+
+def copy_loop(columns, rng, paths, sessions, block_days):
+    """One path and one block slice at a time: the loop the gather replaces."""
+    count = len(columns[0])
+    out = []
+    for _ in range(paths):
+        blocks = [[] for _ in columns]
+        filled = 0
+        while filled < sessions:
+            start = int(rng.integers(0, count))
+            rows = np.arange(start, start + block_days) % count
+            for block, column in zip(blocks, columns):
+                block.append(column[rows])
+            filled += block_days
+        out.append([np.concatenate(block)[:sessions] for block in blocks])
+    return out
+
+
+def clustering(returns):
+    magnitude = np.abs(returns - returns.mean(axis=-1, keepdims=True))
+    a, b = magnitude[..., :-1], magnitude[..., 1:]
+    a = a - a.mean(axis=-1, keepdims=True)
+    b = b - b.mean(axis=-1, keepdims=True)
+    return float(np.mean((a * b).sum(axis=-1) / np.sqrt((a * a).sum(axis=-1) * (b * b).sum(axis=-1))))
+
+
+def check(market, resampler):
+    rng = np.random.default_rng(25)
+    rows = resampler.rows(rng, 400, SESSIONS)
+    sample = resampler.gather(rows)
+    _, returns = market_rows(market)
+    history = {tuple(pair) for pair in np.column_stack([returns, resampler.table[1]]).tolist()}
+    pairs = np.column_stack([sample["return"].ravel()[::97], sample["vix"].ravel()[::97]])
+    assert all(tuple(pair) in history for pair in pairs.tolist())
+
+    next_row = np.diff(rows, axis=1) % resampler.count == 1
+    if resampler.kind == CIRCULAR:
+        boundary = np.arange(1, SESSIONS) % resampler.block_days == 0
+        assert next_row[:, ~boundary].all()
+    else:
+        assert abs(next_row.mean() - (1 - 1 / resampler.block_days)) < 0.005
+
+    annual = np.sqrt(252)
+    assert abs(sample["return"].mean() - returns.mean()) * 252 < 0.01
+    assert abs(sample["return"].std() / returns.std() - 1) < 0.03
+    historical, resampled = clustering(returns), clustering(sample["return"])
+    shuffled = clustering(rng.permuted(sample["return"], axis=1))
+    assert abs(resampled - historical) < abs(shuffled - historical) / 3
+    print(f"  {resampler.kind:>10}: vol {sample['return'].std() * annual:.1%} (history {returns.std() * annual:.1%}), "
+          f"|return| autocorrelation {resampled:.3f} (history {historical:.3f}, shuffled {shuffled:.3f})")
+
+    first = [chunk["return"] for chunk in resampler.stream(600, 252, seed=7)]
+    again = [chunk["return"] for chunk in resampler.stream(600, 252, seed=7)]
+    assert all(np.array_equal(a, b) for a, b in zip(first, again))
+
+
+def replay(market, count):
+    """(seconds, tracemalloc peak) of streaming `count` synthetic histories through run_pmcc."""
+    config = PmccConfig()
+    started = time.perf_counter()
+    tracemalloc.start()
+    trades = 0
+    for history in synthetic_histories(market, count, sessions=SESSIONS):
+        trades += summarize(run_pmcc(history, config))["trades"]
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    assert trades > 0
+    return time.perf_counter() - started, peak
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--paths", type=int, default=10_000)
+    parser.add_argument("--block-days", type=int, default=21)
+    args = parser.parse_args()
+
+    market = load_market_data()
+    print("checks")
+    for kind in KINDS:
+        check(market, market_resampler(market, args.block_days, kind))
+
+    print(f"{args.paths:,} paths x {SESSIONS:,} sessions, all six columns")
+    for kind in KINDS:
+        resampler = market_resampler(market, args.block_days, kind)
+        started = time.perf_counter()
+        for _ in resampler.stream(args.paths, SESSIONS):
+            pass
+        gather = time.perf_counter() - started
+        sample_paths = max(1, args.paths // 50)
+        started = time.perf_counter()
+        copy_loop(resampler.table, np.random.default_rng(0), sample_paths, SESSIONS, args.block_days)
+        loop = (time.perf_counter() - started) * args.paths / sample_paths
+        print(f"  {kind:>10}: gather {gather:6.2f}s, copy loop ~{loop:6.1f}s ({loop / gather:.0f}x)")
+
+    print("synthetic histories through run_pmcc")
+    for count in (200, 1_000):
+        elapsed, peak = replay(market, count)
+        print(f"  {count:>5,} histories: {elapsed:5.1f}s ({count / elapsed:,.0f}/s), tracemalloc peak {peak / 1e6:5.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+Per-minute chain filtering: contract lists versus the columnar store.
+
+Builds one synthetic 400-strike SPXW 0DTE day, then for every minute picks
+the puts expiring today within 3% below spot two ways:
+
+    lists    materialize the chain and filter it with a comprehension, as
+             ZeroDTEBullPutSpreadSPX.OnData does
+    store    ChainSnapshot.select, two binary searches and a slice
+
+and reports time and bytes allocated per minute (tracemalloc).
+
+    python3 -m benchmarks.chain_store
+"""
+import time
+import tracemalloc
+from datetime import date
+
+import numpy as np
+
+from lib.market_data import day_number
+from lib.option_math import black_scholes
+from local_engine.api import OptionRight
+from local_engine.chain_store import ChainStore
+
+STRIKES = 400
+MINUTES = np.arange(9 * 60 + 31, 16 * 60 + 1)
+DAY = date(2025, 3, 3)
+
+
+def synthetic_day(rng):
+    spot_path = 5800 * np.exp(np.cumsum(rng.normal(0, 0.0005, len(MINUTES))))
+    grid = 5800 + 5.0 * (np.arange(STRIKES) - STRIKES // 2)
+    minute, right, strike = (a.ravel() for a in np.meshgrid(MINUTES, np.array([0, 1]), grid, indexing="ij"))
+    spot = spot_path[np.searchsorted(MINUTES, minute)]
+    t = np.maximum(16 * 60 - minute, 1) / (390 * 252)
+    values = black_scholes(spot, strike, t, 0.0, 0.16)
+    price = np.where(right == 0, values.call, values.put)
+    store = ChainStore.from_unsorted(
+        minute=minute, expiry=np.full(len(minute), day_number(DAY)), right=right, strike=strike,
+        bid=np.maximum(price - 0.05, 0.0), ask=price + 0.05,
+    )
+    return store, spot_path
+
+
+def by_lists(store, minute, spot):
+    first, end = store.minute_offsets[minute], store.minute_offsets[minute + 1]
+    chain = [
+        (expiry, right, strike, bid, ask)
+        for expiry, right, strike, bid, ask in zip(
+            store.expiry[first:end].tolist(), store.right[first:end].tolist(), store.strike[first:end].tolist(),
+            store.bid[first:end].tolist(), store.ask[first:end].tolist(),
+        )
+    ]
+    today = day_number(DAY)
+    return [c for c in chain if c[1] == OptionRight.PUT and c[0] == today and spot * 0.97 <= c[2] <= spot]
+
+
+def by_store(store, minute, spot):
+    return store.strike_range(minute, day_number(DAY), OptionRight.PUT, spot * 0.97, spot)
+
+
+def measure(label, pick, store, spots):
+    start = time.perf_counter()
+    for minute, spot in zip(MINUTES.tolist(), spots.tolist()):
+        pick(store, minute, spot)
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    for minute, spot in zip(MINUTES.tolist(), spots.tolist()):
+        pick(store, minute, spot)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{label}: {elapsed / len(MINUTES) * 1e6:8.1f} us/minute | peak {peak / 1024:8.1f} KiB")
+
+
+def main():
+    store, spots = synthetic_day(np.random.default_rng(3))
+    print(f"{len(store):,} quotes, {store.nbytes / 2**20:.1f} MiB for the day")
+    counts = {len(by_lists(store, m, s)) - (lambda r: r[1] - r[0])(by_store(store, m, s))
+              for m, s in zip(MINUTES.tolist(), spots.tolist())}
+    assert counts == {0}, "both paths must select the same puts"
+    measure("lists", by_lists, store, spots)
+    measure("store", by_store, store, spots)
+
+
+if __name__ == "__main__":
+    main()
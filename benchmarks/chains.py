@@ -0,0 +1,113 @@
+"""
+Synthetic option chains shaped like the ones each strategy is handed.
+
+Every contract answers to both the Lean PascalCase names (c.Strike,
+c.Greeks.Delta) and the Pep8 ones (c.strike, c.greeks.delta), with
+`right` from local_engine.api.OptionRight, so strategy methods run on them
+unchanged. Prices are Black-Scholes at a skewed volatility, quoted on a
+nickel grid; deltas come from the same model.
+
+    spxw_0dte      400 strikes a side, expiring at today's close
+    qqq_monthly    120 strikes on every Friday 7-63 days out (28-42 DTE window)
+    tsla_leaps     monthly and January expiries out to 30 months
+    spy_dailies    11 strikes around the money on the next 10 daily expiries
+"""
+from datetime import datetime, time, timedelta
+
+import numpy as np
+
+from lib.option_math import black_scholes
+from local_engine.api import Greeks, OptionRight
+from local_engine.pep8 import Pep8
+
+CLOSE = time(16, 0)
+
+
+class Contract(Pep8):
+    __slots__ = ("symbol", "strike", "expiry", "right", "bid_price", "ask_price", "greeks")
+
+    def __init__(self, symbol, strike, expiry, right, bid_price, ask_price, greeks):
+        self.symbol = symbol
+        self.strike = strike
+        self.expiry = expiry
+        self.right = right
+        self.bid_price = bid_price
+        self.ask_price = ask_price
+        self.greeks = greeks
+
+    def __repr__(self):
+        return self.symbol
+
+
+def quote_chain(ticker, now, spot, strikes, expiries, base_vol, rights=(OptionRight.CALL, OptionRight.PUT),
+                rng=None):
+    """Every (expiry, strike, right) contract, shuffled when `rng` is given."""
+    expiry, strike = (a.ravel() for a in np.meshgrid(np.array(expiries, dtype=object), strikes, indexing="ij"))
+    seconds = np.array([(e - now).total_seconds() for e in expiry])
+    years = np.maximum(seconds, 60.0) / (365.0 * 86400.0)
+    moneyness = np.log(strike / spot) / np.sqrt(np.maximum(years, 1 / 365))
+    sigma = np.clip(base_vol - 0.08 * moneyness + 0.05 * moneyness ** 2, 0.05, 2.0)
+    model = black_scholes(spot, strike, years, 0.04, sigma)
+
+    contracts = []
+    for right in rights:
+        call = right == OptionRight.CALL
+        price = model.call if call else model.put
+        delta = model.call_delta if call else model.put_delta
+        half = np.maximum(0.025, price * 0.02)
+        bid = np.maximum(np.round((price - half) / 0.05) * 0.05, 0.0)
+        ask = np.maximum(np.round((price + half) / 0.05) * 0.05, 0.05)
+        letter = "C" if call else "P"
+        for i in range(len(strike)):
+            contracts.append(Contract(
+                f"{ticker} {expiry[i]:%y%m%d}{letter}{strike[i]:08.2f}", float(strike[i]), expiry[i], right,
+                round(float(bid[i]), 2), round(float(ask[i]), 2), Greeks(delta=float(delta[i])),
+            ))
+    if rng is not None:
+        rng.shuffle(contracts)
+    return contracts
+
+
+def fridays(start, first, last):
+    """Fridays `first`..`last` days after `start`, at the close."""
+    days = [start + timedelta(days=n) for n in range(first, last + 1)]
+    return [datetime.combine(d, CLOSE) for d in days if d.weekday() == 4]
+
+
+def third_fridays(start, months):
+    expiries = []
+    for offset in range(1, months + 1):
+        year, month = start.year + (start.month - 1 + offset) // 12, (start.month - 1 + offset) % 12 + 1
+        first = datetime(year, month, 1)
+        expiries.append(datetime.combine(first + timedelta(days=(4 - first.weekday()) % 7 + 14), CLOSE))
+    return expiries
+
+
+def spxw_0dte(rng, strikes=400, now=datetime(2025, 3, 12, 10, 0)):
+    """(contracts, spot, now): one 0DTE snapshot, 5-point strikes centred on spot."""
+    spot = float(rng.uniform(5000, 6000))
+    grid = round(spot / 5) * 5 + 5.0 * (np.arange(strikes) - strikes // 2)
+    return quote_chain("SPXW", now, spot, grid, [datetime.combine(now.date(), CLOSE)], 0.16, rng=rng), spot, now
+
+
+def qqq_monthly(rng, strikes=120, now=datetime(2025, 3, 14, 15, 0)):
+    """(contracts, spot, now): weekly expiries around the 28-42 DTE window, $1 strikes."""
+    spot = float(rng.uniform(380, 520))
+    grid = np.floor(spot) - 20 + np.arange(strikes)
+    return quote_chain("QQQ", now, spot, grid, fridays(now.date(), 7, 63), 0.20, rng=rng), spot, now
+
+
+def tsla_leaps(rng, strikes=60, now=datetime(2025, 3, 10, 10, 0)):
+    """(contracts, spot, now): 30 monthly expiries, $5 strikes from half to twice spot."""
+    spot = float(rng.uniform(180, 420))
+    grid = np.round(np.linspace(spot * 0.5, spot * 2.0, strikes) / 5) * 5
+    return quote_chain("TSLA", now, spot, np.unique(grid), third_fridays(now.date(), 30), 0.55, rng=rng), spot, now
+
+
+def spy_dailies(rng, now=datetime(2025, 3, 11, 15, 45)):
+    """(calls, spot, now): the calendar spread's filtered universe, Strikes(-5, 5).Expiration(0, 10)."""
+    spot = float(rng.uniform(480, 600))
+    grid = np.round(spot) + np.arange(-5, 6)
+    days = [now.date() + timedelta(days=n) for n in range(0, 15)]
+    expiries = [datetime.combine(d, CLOSE) for d in days if d.weekday() < 5][:10]
+    return quote_chain("SPY", now, spot, grid, expiries, 0.14, rights=(OptionRight.CALL,), rng=rng), spot, now
@@ -0,0 +1,92 @@
+"""
+Memory and time of lib.export_analytics as an export grows.
+
+Writes synthetic Trades.csv / Daily Settlement.csv exports in the
+backtester's layout (US dates, percent ROI) at several sizes, summarizes
+each with analyze_export and reports the tracemalloc peak, which should
+stay flat while the row count grows a thousandfold. Also checks the
+streamed statistics against a whole-file NumPy computation.
+
+    python3 -m benchmarks.export_analytics [--sizes 500,50000,500000]
+"""
+import argparse
+import os
+import shutil
+import tempfile
+import time
+import tracemalloc
+from datetime import date, timedelta
+
+import numpy as np
+
+from lib.export_analytics import EXACT_MEDIAN_LIMIT, analyze_export
+
+TRADES_HEADER = ("No.,Opened,Closed,Premium,Profit/loss,Underlying Price at Open,Underlying Price at Close,"
+                 "Close reason,Buying power,Fees,ROI\n")
+
+
+def us(d):
+    return f"{d.month}/{d.day}/{d.year}"
+
+
+def write_export(directory, trades, rng):
+    """A synthetic export: `trades` trades closing over a matching span of days; returns (pnl, roi)."""
+    days = max(trades // 4, 30)
+    start = date(2013, 1, 2)
+    calendar = [us(start + timedelta(days=i)) for i in range(days + 40)]
+    premium = rng.uniform(50, 500, trades).round(0)
+    roi = rng.normal(-40, 120, trades).round(2)
+    pnl = (premium * roi / 100).round(2)
+    opened = np.sort(rng.integers(0, days, trades))
+    closed = opened + rng.integers(1, 40, trades)
+    with open(os.path.join(directory, "QQQ synthetic Trades.csv"), "w") as f:
+        f.write(TRADES_HEADER)
+        for start_row in range(0, trades, 100_000):
+            rows = range(start_row, min(start_row + 100_000, trades))
+            f.writelines(
+                f"{i + 1},{calendar[opened[i]]},{calendar[closed[i]]},{-premium[i]},{pnl[i]},100,101,"
+                f"stop loss,{premium[i]},25.38,{roi[i]}\n" for i in rows
+            )
+    equity = 12_330 + np.cumsum(rng.normal(30, 400, days + 40)).round(2)
+    with open(os.path.join(directory, "QQQ synthetic Daily Settlement.csv"), "w") as f:
+        f.write("Date,Total profit/loss,Net liquidity,Drawdown,ROI\n")
+        f.writelines(f"{calendar[i]},0,{equity[i]},0,0\n" for i in range(len(calendar)))
+    return pnl, roi, equity
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", default="500,50000,500000")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(19)
+    print(f"{'trades':>9} | {'seconds':>8} | {'peak KiB':>9} | median")
+    for trades in (int(size) for size in args.sizes.split(",")):
+        directory = tempfile.mkdtemp(prefix="export_")
+        try:
+            pnl, roi, equity = write_export(directory, trades, rng)
+            started = time.perf_counter()
+            summary = analyze_export(directory)
+            elapsed = time.perf_counter() - started
+            tracemalloc.start()  # a second, traced pass: tracing slows the first several times over
+            analyze_export(directory)
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+        finally:
+            shutil.rmtree(directory, ignore_errors=True)
+
+        stats = summary.trades
+        assert stats.count == trades and stats.wins == int((pnl > 0).sum())
+        assert np.isclose(stats.total_pnl, pnl.sum()) and np.isclose(stats.average_roi, roi.mean() / 100)
+        drawdown = 1 - equity / np.maximum.accumulate(equity)
+        assert np.isclose(summary.equity.max_drawdown, drawdown.max())
+        median = stats.median_roi.value
+        exact = np.median(roi) / 100
+        if trades <= EXACT_MEDIAN_LIMIT:
+            assert np.isclose(median, exact)
+        label = "exact" if trades <= EXACT_MEDIAN_LIMIT else f"estimate, off by {abs(median - exact):.4%}"
+        print(f"{trades:>9,} | {elapsed:>8.2f} | {peak / 1024:>9.0f} | {label}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+"""
+Ten years of SPX minute bars through lib.gap_reversal.scan.
+
+Times the batch scan for every bar_minutes and skip_if_gap_closes setting
+on ~2,500 synthetic sessions, then replays the first --check-days of them
+through NickSpxZeroDteV1 on local_engine (SPX bars only, so it never
+trades) and checks that both find the same signal on every day.
+
+    python3 -m benchmarks.gap_reversal [--years 10] [--check-days 250]
+"""
+import argparse
+import shutil
+import tempfile
+import time
+from dataclasses import replace
+from datetime import date, time as clock_time, timedelta
+
+import numpy as np
+
+from benchmarks.local_engine import MINUTE_VOL, MINUTES, weekdays
+from lib.event_calendar import EventCalendar
+from lib.gap_reversal import GapReversalRules, scan
+from lib.market_data import day_number
+from local_engine import data
+from local_engine.api import TradeBarConsolidator
+from local_engine.engine import Engine, load_algorithm
+
+START = date(2016, 1, 4)
+SETTINGS = [GapReversalRules(bar_minutes, skip_if_gap_closes=skip)
+            for bar_minutes in (5, 15, 30) for skip in (False, True)]
+
+
+def synthetic_minutes(days, rng):
+    """Flat (day, minute, open, high, low, close) columns for the given sessions."""
+    n = len(MINUTES)
+    gaps = rng.normal(0.0, 0.004, len(days))
+    steps = rng.normal(0.0, MINUTE_VOL, (len(days), n))
+    steps[:, 0] += gaps
+    close = 5000.0 * np.exp(np.cumsum(steps.ravel()))
+    open_ = np.concatenate(([5000.0], close[:-1]))
+    # The first bar opens at the gapped price, not at the previous close.
+    open_.reshape(len(days), n)[:, 0] = (close.reshape(len(days), n)[:, 0]
+                                         * np.exp(-rng.normal(0.0, MINUTE_VOL, len(days))))
+    wiggle = np.abs(rng.normal(0.0, MINUTE_VOL * 0.5, close.size)) * close
+    return {
+        "day": np.repeat(np.array([day_number(d) for d in days]), n),
+        "minute": np.tile(MINUTES, len(days)).astype(np.int16),
+        "open": open_,
+        "high": np.maximum(open_, close) + wiggle,
+        "low": np.minimum(open_, close) - wiggle,
+        "close": close,
+    }
+
+
+def event_signals(root, start, end, rules):
+    """Each day's first pending_signal from the event-driven strategy, keyed by day number."""
+    base = load_algorithm("Nick_SPX_0DTE.py")
+
+    class Recorder(base):
+        def initialize(self):
+            super().initialize()
+            self.subscription_manager.remove_consolidator(self.spx, self.consolidator)
+            self.bar_minutes = rules.bar_minutes
+            self.last_entry_time = rules.last_entry_time
+            self.skip_if_gap_closes = rules.skip_if_gap_closes
+            self.consolidator = TradeBarConsolidator(timedelta(minutes=self.bar_minutes))
+            self.consolidator.data_consolidated += self.on_signal_bar
+            self.subscription_manager.add_consolidator(self.spx, self.consolidator)
+            self.recorded = {}
+
+        def on_signal_bar(self, sender, bar):
+            pending = self.pending_signal
+            super().on_signal_bar(sender, bar)
+            minute = self.time.hour * 60 + self.time.minute
+            today = day_number(self.time.date())
+            if pending is None and self.pending_signal is not None:
+                self.recorded[today] = (minute, self.signal_spx_price, self.pending_signal,
+                                        rules.last_entry_minute + 1)
+            elif pending is not None and self.pending_signal is None:  # the gap closed
+                self.recorded[today] = self.recorded[today][:3] + (minute,)
+
+    engine = Engine(Recorder, root, start, end)
+    engine.run()
+    return engine.algorithm.recorded
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--years", type=int, default=10)
+    parser.add_argument("--check-days", type=int, default=250)
+    args = parser.parse_args()
+
+    days = weekdays(START, args.years * 252)
+    bars = synthetic_minutes(days, np.random.default_rng(11))
+    calendar = EventCalendar.load(date(2020, 1, 1), date(2030, 12, 31))
+    columns = [bars[name] for name in ("day", "minute", "open", "high", "low", "close")]
+    print(f"{len(days):,} sessions, {len(bars['day']):,} minute bars")
+
+    for rules in SETTINGS:
+        scan(*columns, rules=rules, calendar=calendar)  # warm-up
+        started = time.perf_counter()
+        signals = scan(*columns, rules=rules, calendar=calendar)
+        elapsed = time.perf_counter() - started
+        print(f"{rules.bar_minutes:2d}-minute bars, skip_if_gap_closes={rules.skip_if_gap_closes!s:5}: "
+              f"{len(signals.day):5,} signal days in {elapsed * 1e3:6.1f} ms")
+
+    # The check window sits inside the event calendar so blackout days are exercised.
+    check = [d for d in days if d >= date(2024, 1, 1)][:args.check_days] or days[-args.check_days:]
+    root = tempfile.mkdtemp(prefix="gap_reversal_")
+    try:
+        first = days.index(check[0]) * len(MINUTES)
+        for i, d in enumerate(check):
+            rows = slice(first + i * len(MINUTES), first + (i + 1) * len(MINUTES))
+            data.write_minute_bars(root, "SPX", d, volume=np.zeros(len(MINUTES)),
+                                   **{name: bars[name][rows] for name in ("minute", "open", "high", "low", "close")})
+        history = data.load_minute_history(root, "SPX")
+        columns = [history[name] for name in ("day", "minute", "open", "high", "low", "close")]
+        for rules in SETTINGS + [replace(SETTINGS[0], last_entry_time=clock_time(10, 0))]:
+            signals = scan(*columns, rules=rules, calendar=calendar)
+            batch = {int(d): (int(m), float(p), name, int(u)) for d, m, p, name, u
+                     in zip(signals.day, signals.minute, signals.price, signals.names(), signals.until)}
+            events = event_signals(root, check[0], check[-1], rules)
+            assert batch == events, f"{rules}: batch and event signals differ"
+        print(f"batch and event-driven signals match on {len(check)} days for {len(SETTINGS) + 1} settings")
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
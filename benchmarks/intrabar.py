@@ -0,0 +1,137 @@
+"""
+How late (and how far off) stop/target checks fill, and what lib.intrabar costs.
+
+Simulates QQQ on 15-second steps, holds a 28-42 DTE bull call spread
+like QQQLowDeltaBullCallSpreadWithROIClose (long ~21 delta, short ~7
+delta, exits at 5.2x / 0.16x the entry debit) and prices it with
+Black-Scholes at a flat volatility, so the true first touch of either
+exit is known. Each position is then checked three ways from minute bars:
+
+    daily      CheckExits' once-a-day test at 3:45 PM
+    minute     a test at every minute close
+    intrabar   lib.intrabar's reconstructed path through each bar
+
+and the benchmark reports how many exits each finds, how late it sees
+them and how far its fill is from the exit level, then times the
+intrabar pass per position-day.
+
+    python3 -m benchmarks.intrabar [--positions 100]
+"""
+import argparse
+import time
+
+import numpy as np
+
+from lib.intrabar import MINUTES_PER_YEAR, bar_paths, closing_costs, first_crossing, node_years
+from lib.option_math import black_scholes_call, delta_call
+
+STEPS = 4  # per minute
+MINUTES = 390
+CHECK = 375  # 3:45 PM
+SIGMA = 0.25
+TAKE_PROFIT = 5.20
+STOP_LOSS = 0.16
+
+
+def strike_for_delta(spot, years, delta):
+    strikes = np.arange(np.floor(spot), spot * 1.5)
+    return strikes[np.argmin(np.abs(delta_call(spot, strikes, years, 0.0, SIGMA) - delta))]
+
+
+def position(rng, spot=400.0):
+    """One held spread: fine path, its minute bars and the exit levels as closing costs."""
+    days = int(rng.integers(28, 43) * 5 / 7)  # calendar DTE -> sessions
+    expiry = days * MINUTES
+    years = expiry / MINUTES_PER_YEAR
+    long_strike = strike_for_delta(spot, years, 0.21)
+    short_strike = max(strike_for_delta(spot, years, 0.07), long_strike + 1)
+
+    steps = days * MINUTES * STEPS
+    returns = rng.normal(0, SIGMA / np.sqrt(MINUTES_PER_YEAR * STEPS), steps)
+    returns[::MINUTES * STEPS] += rng.normal(0, SIGMA * 0.3 / np.sqrt(252), days)  # overnight gaps
+    path = spot * np.exp(np.cumsum(returns))
+    step_years = (expiry - (np.arange(steps) + 1) / STEPS) / MINUTES_PER_YEAR
+
+    strikes = np.array([long_strike, short_strike])
+    value = black_scholes_call(path[:, None], strikes, step_years[:, None], 0.0, SIGMA)
+    cost = value[:, 1] - value[:, 0]  # sell the long, buy back the short
+    debit = float(black_scholes_call(spot, strikes, years, 0.0, SIGMA) @ [1, -1])
+    bars = path.reshape(-1, STEPS)
+    return dict(
+        strikes=strikes, expiry=expiry, cost=cost,
+        open=bars[:, 0], high=bars.max(axis=1), low=bars.min(axis=1), close=bars[:, -1],
+        stop=-STOP_LOSS * debit, target=-TAKE_PROFIT * debit,
+    )
+
+
+def exact(p):
+    """(minute, fill) of the true first touch on the 15-second path."""
+    hit = np.flatnonzero((p["cost"] >= p["stop"]) | (p["cost"] <= p["target"]))
+    return (None, None) if not len(hit) else ((hit[0] + 1) / STEPS, p["cost"][hit[0]])
+
+
+def at_closes(p, every, first=0):
+    """(minute, fill) of the first checked minute close past an exit; every `every` minutes from `first`."""
+    closes = p["cost"][STEPS - 1::STEPS]
+    checked = np.arange(len(closes)) % every == first
+    hit = np.flatnonzero(checked & ((closes >= p["stop"]) | (closes <= p["target"])))
+    return (None, None) if not len(hit) else (hit[0] + 1, closes[hit[0]])
+
+
+def intrabar(p):
+    minute = np.arange(1, len(p["close"]) + 1)
+    bars = len(minute)
+    costs = closing_costs(
+        bar_paths(p["open"], p["high"], p["low"], p["close"]),
+        node_years(minute, p["expiry"]), p["strikes"], [True, True], (1, -1),
+        np.full((bars, 2), SIGMA), np.zeros((bars, 2)),
+    )
+    crossing = first_crossing(costs, p["stop"], p["target"])
+    return (None, None) if crossing is None else (crossing.bar + crossing.fraction, crossing.cost)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--positions", type=int, default=100)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(11)
+    positions = [position(rng) for _ in range(args.positions)]
+    truth = [exact(p) for p in positions]
+    methods = {
+        "daily": lambda p: at_closes(p, MINUTES, CHECK - 1),
+        "minute": lambda p: at_closes(p, 1),
+        "intrabar": intrabar,
+    }
+    exits = sum(minute is not None for minute, _ in truth)
+    print(f"{len(positions)} positions, {exits} touch an exit (0.16x stop or 5.2x target)")
+    print(f"{'check':>9} | found | missed | median delay | mean fill error ($/spread)")
+    seen = {}
+    for name, method in methods.items():
+        seen[name] = [method(p) for p in positions]
+        delays, errors = [], []
+        for p, (minute, fill), (got, got_fill) in zip(positions, truth, seen[name]):
+            if minute is None or got is None:
+                continue
+            delays.append(got - minute)
+            level = p["stop"] if fill >= p["stop"] else p["target"]
+            errors.append(abs(got_fill - level) * 100)
+        missed = exits - len(delays)
+        print(f"{name:>9} | {len(delays):>5} | {missed:>6} | {np.median(delays) if delays else 0:>9.1f} min | "
+              f"{np.mean(errors) if errors else 0:>8.2f}")
+
+    # The close is one of a bar's nodes, so the path never sees an exit later than the closes do.
+    for (minute, _), (bar, _) in zip(seen["minute"], seen["intrabar"]):
+        assert minute is None or (bar is not None and bar <= minute)
+
+    started = time.perf_counter()
+    for p in positions:
+        intrabar(p)
+    elapsed = time.perf_counter() - started
+    position_days = sum(len(p["close"]) for p in positions) / MINUTES
+    print(f"intrabar pass: {elapsed / position_days * 1e6:.0f} us per position-day "
+          f"({position_days:.0f} position-days in {elapsed:.2f}s)")
+
+
+if __name__ == "__main__":
+    main()
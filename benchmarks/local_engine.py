@@ -0,0 +1,107 @@
+"""
+A year of SPXW 0DTE minute data through the local replay engine.
+
+Writes synthetic SPX and VIX minute bars and a 400-strike SPXW 0DTE quote
+file for every weekday of a year (about 80 million quote rows), then times
+NickSpxZeroDteV1 over it on one core.
+
+    python3 -m benchmarks.local_engine [--days 252] [--strikes 400] [--data DIR]
+
+With --data the files are kept (and reused on the next run).
+"""
+import argparse
+import shutil
+import tempfile
+import time
+from datetime import date, timedelta
+
+import numpy as np
+
+from lib.market_data import day_number
+from lib.option_math import black_scholes
+from local_engine import data
+from local_engine.engine import load_algorithm, run
+
+MINUTES = np.arange(9 * 60 + 31, 16 * 60 + 1)  # bar end minutes, 9:31-16:00
+MINUTE_VOL = 0.16 / np.sqrt(252 * 390)
+STRIKE_STEP = 5.0
+
+
+def weekdays(start, count):
+    days, day = [], start
+    while len(days) < count:
+        if day.weekday() < 5:
+            days.append(day)
+        day += timedelta(days=1)
+    return days
+
+
+def write_day(root, day, previous_close, strikes, rng):
+    """One session of SPX/VIX bars and SPXW 0DTE quotes; returns the close."""
+    n = len(MINUTES)
+    open_price = previous_close * np.exp(rng.normal(0.0, 0.006))
+    path = open_price * np.exp(np.cumsum(rng.normal(0.0, MINUTE_VOL, n)))
+    opens = np.concatenate(([open_price], path[:-1]))
+    wiggle = np.abs(rng.normal(0.0, MINUTE_VOL * 0.5, n)) * path
+    highs = np.maximum(opens, path) + wiggle
+    lows = np.minimum(opens, path) - wiggle
+    data.write_minute_bars(root, "SPX", day, minute=MINUTES.astype(np.int16), open=opens, high=highs,
+                           low=lows, close=path, volume=np.zeros(n))
+    vix = np.full(n, 16.0) + rng.normal(0.0, 0.05, n).cumsum()
+    data.write_minute_bars(root, "VIX", day, minute=MINUTES.astype(np.int16), open=vix, high=vix + 0.05,
+                           low=vix - 0.05, close=vix, volume=np.zeros(n))
+
+    center = round(open_price / STRIKE_STEP) * STRIKE_STEP
+    grid = center + STRIKE_STEP * (np.arange(strikes) - strikes // 2)
+    minute, right, strike = (a.ravel() for a in np.meshgrid(MINUTES, np.array([0, 1]), grid, indexing="ij"))
+    spot = path[np.searchsorted(MINUTES, minute)]
+    # Session time left, in trading time as 0DTE desks quote it.
+    t = np.maximum(16 * 60 - minute, 1) / (390 * 252)
+    moneyness = np.log(strike / spot)
+    sigma = np.clip(0.16 - 0.8 * moneyness + 4.0 * moneyness ** 2, 0.05, 2.0)
+    values = black_scholes(spot, strike, t, 0.0, sigma)
+    price = np.where(right == 0, values.call, values.put)
+    half_spread = np.maximum(0.05, price * 0.03)
+    bid = np.maximum(np.round((price - half_spread) / 0.05) * 0.05, 0.0)
+    ask = np.maximum(np.round((price + half_spread) / 0.05) * 0.05, 0.05)
+    data.write_option_quotes(root, "SPXW", day, minute=minute.astype(np.int16),
+                             expiry=np.full(len(minute), day_number(day), dtype=np.int32),
+                             right=right.astype(np.int8), strike=strike, bid=bid, ask=ask)
+    return float(path[-1])
+
+
+def write_market(root, days, strikes, seed=9):
+    rng = np.random.default_rng(seed)
+    close = 5800.0
+    for day in days:
+        close = write_day(root, day, close, strikes, rng)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--days", type=int, default=252)
+    parser.add_argument("--strikes", type=int, default=400)
+    parser.add_argument("--data", help="keep the synthetic files here")
+    args = parser.parse_args()
+
+    # Two warm-up sessions give prepare_for_session a previous close.
+    days = weekdays(date(2025, 1, 1), args.days + 2)
+    root = args.data or tempfile.mkdtemp(prefix="local_engine_")
+    try:
+        if len(data.available_days(root, "SPX")) < len(days):
+            start = time.perf_counter()
+            write_market(root, days, args.strikes)
+            print(f"wrote {len(days)} days x {args.strikes} strikes in {time.perf_counter() - start:.1f}s")
+
+        algorithm = load_algorithm("Nick_SPX_0DTE.py")
+        result = run(algorithm, root, start=days[2], end=days[-1])
+        stats = result.statistics
+        print(f"NickSpxZeroDteV1: {stats['Trading Days']} days in {stats['Runtime Seconds']:.2f}s | "
+              f"{stats['Total Orders']} orders | net profit {stats['Net Profit']:.2%}")
+    finally:
+        if args.data is None:
+            shutil.rmtree(root, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+"""
+Throughput of lib.monte_carlo, and checks of its models and runners.
+
+Times simulate() for both strategies under each path model on --paths
+paths of --years, and projects the time for 100,000 paths on this
+machine's cores. Before that it checks that:
+
+- a seed gives the same moments on one worker or two;
+- each model's simulated returns have the annualized mean and vol they
+  should (GBM's parameters, the history's for the resamplers), and the
+  regime model spends about as long in each regime as history did;
+- pmcc_paths books each trade_pnl trade on its exit session;
+- leap_paths matches a plain per-path loop over LeapStrategy's rules.
+
+    python3 -m benchmarks.monte_carlo [--paths 2000] [--years 15]
+"""
+import argparse
+import os
+import time
+from statistics import NormalDist
+
+import numpy as np
+
+from lib.market_data import load_market_data
+from lib.monte_carlo import (DAYS_PER_SESSION, DAYS_PER_YEAR, SESSIONS_PER_YEAR, BlockBootstrap, Gbm, LeapConfig,
+                             VixRegime, history, leap_paths, pmcc_paths, simulate, simulate_paths)
+from lib.option_math import black_scholes_call
+from lib.pmcc import PmccConfig, trade_pnl
+from lib.synthetic_chains import quote, strike_steps, surface
+
+MODELS = (Gbm(), BlockBootstrap(), VixRegime())
+RUNNERS = {"pmcc": pmcc_paths, "leap": leap_paths}
+
+
+def check_models(h, rng):
+    sessions = 252 * 15
+    for model in MODELS:
+        close, vol = simulate_paths(model, h, rng, 400, sessions)
+        returns = np.diff(np.log(close), axis=1)
+        mean, std = returns.mean() * SESSIONS_PER_YEAR, returns.std() * np.sqrt(SESSIONS_PER_YEAR)
+        if isinstance(model, Gbm):
+            expected = (model.drift - 0.5 * model.vol ** 2, model.vol)
+        else:
+            expected = (h.returns.mean() * SESSIONS_PER_YEAR, h.returns.std() * np.sqrt(SESSIONS_PER_YEAR))
+        assert abs(mean - expected[0]) < 0.01 and abs(std / expected[1] - 1) < 0.03, (model, mean, std, expected)
+        if isinstance(model, VixRegime):
+            simulated = np.bincount(np.searchsorted(model.thresholds, vol[:, 1:].ravel(), side="right"), minlength=3)
+            historical = np.bincount(np.searchsorted(model.thresholds, h.vix, side="right"), minlength=3)
+            assert np.allclose(simulated / simulated.sum(), historical / historical.sum(), atol=0.05)
+
+
+def check_pmcc(h, rng):
+    config = PmccConfig()
+    close, vol = simulate_paths(BlockBootstrap(), h, rng, 2, 400)
+    equity, points = pmcc_paths(close, vol, config, capital=1_000.0)
+    hold = round(config.days_to_short / DAYS_PER_SESSION)
+    for path in range(2):
+        booked = np.zeros(close.shape[1])
+        for entry in range(close.shape[1] - hold):
+            pnl = trade_pnl(close[path, entry], close[path, entry + hold], vol[path, entry], config.days_to_short,
+                            config)[3]
+            booked[entry + hold] += pnl
+        assert np.allclose(equity[path], 1_000.0 + np.cumsum(booked))
+    assert np.array_equal(points, np.arange(close.shape[1]))
+
+
+def leap_reference(close, vol, config):
+    """LeapStrategy's rules one path and one position at a time."""
+    chain = config.chain
+    step = max(1, round(config.every_days / DAYS_PER_SESSION))
+    z = NormalDist().inv_cdf(config.target_delta)
+    size = 100.0 * config.contracts
+    r = chain.risk_free_rate
+
+    def mark(s, v, strike, days_left):
+        t = days_left / DAYS_PER_YEAR
+        return float(black_scholes_call(s, strike, t, r, surface(chain, s, v, t, strike)))
+
+    cash, positions, curve = config.cash, [], []
+    for session in range(0, len(close) - 1, step):
+        day, s, v = session * DAYS_PER_SESSION, close[session], vol[session]
+        kept, value = [], 0.0
+        for strike, expiry, entry in positions:
+            price = mark(s, v, strike, expiry - day)
+            if price >= config.take_profit * entry or expiry - day <= config.exit_days:
+                cash += float(quote(chain, price)[0]) * size
+            else:
+                kept.append((strike, expiry, entry))
+                value += price * size
+        positions = kept
+        t = config.days_to_expiry / DAYS_PER_YEAR
+        atm = float(surface(chain, s, v, t, s * np.exp(r * t)))
+        grid = chain.strike_step or float(strike_steps(s, chain.step_fraction))
+        k = max(round(s * np.exp(-z * atm * np.sqrt(t) + (r + 0.5 * atm ** 2) * t) / grid), 1.0) * grid
+        price = mark(s, v, k, config.days_to_expiry)
+        ask = float(quote(chain, price)[1])
+        if ask * size <= config.margin_fraction * (cash + value) - value:
+            positions.append((k, day + config.days_to_expiry, ask))
+            cash -= ask * size
+            value += price * size
+        curve.append(cash + value)
+    day = (len(close) - 1) * DAYS_PER_SESSION
+    for strike, expiry, entry in positions:
+        cash += float(quote(chain, mark(close[-1], vol[-1], strike, expiry - day))[0]) * size
+    return np.array(curve + [cash])
+
+
+def check_leap(h, rng):
+    config = LeapConfig(contracts=2)
+    close, vol = simulate_paths(VixRegime(), h, rng, 6, 252 * 5)
+    equity, _ = leap_paths(close, vol, config)
+    for path in range(len(close)):
+        assert np.allclose(equity[path], leap_reference(close[path], vol[path], config), rtol=1e-9)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--paths", type=int, default=2_000)
+    parser.add_argument("--years", type=float, default=15)
+    args = parser.parse_args()
+
+    market = load_market_data()
+    h = history(market)
+    rng = np.random.default_rng(24)
+    check_models(h, rng)
+    check_pmcc(h, rng)
+    check_leap(h, rng)
+    one = simulate(pmcc_paths, BlockBootstrap(), market, paths=300, years=2, seed=5, workers=1, chunk_paths=64)
+    two = simulate(pmcc_paths, BlockBootstrap(), market, paths=300, years=2, seed=5, workers=2, chunk_paths=64)
+    assert all(np.array_equal(a, b) for a, b in zip(one, two))
+    print("checks passed")
+
+    cores = os.cpu_count() or 1
+    for name, runner in RUNNERS.items():
+        for model in MODELS:
+            started = time.perf_counter()
+            simulate(runner, model, market, paths=args.paths, years=args.years)
+            elapsed = time.perf_counter() - started
+            print(f"{name:>5} {type(model).__name__:>15}: {args.paths:,} paths x {args.years:g} years in "
+                  f"{elapsed:6.1f}s on {cores} cores; 100,000 paths ~ {elapsed * 100_000 / args.paths / 60:5.1f} min")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Batched Black-Scholes throughput and accuracy.
+
+Checks lib.option_math against the scalar formulas from lib/option_math.rb
+(unrounded, with put-call parity and textbook greeks) and times one batched
+call over 10^6 contracts.
+
+    python3 -m benchmarks.option_math
+"""
+import math
+import time
+
+import numpy as np
+
+from lib.option_math import black_scholes
+
+CONTRACTS = 1_000_000
+CHECKED = 20_000
+TOLERANCE = 1e-10
+
+
+def norm_cdf(x):
+    return 0.5 * (1.0 + math.erf(x / math.sqrt(2)))
+
+
+def norm_pdf(x):
+    return math.exp(-0.5 * x * x) / math.sqrt(2 * math.pi)
+
+
+def scalar_greeks(s, k, t, r, sigma):
+    d1 = (math.log(s / k) + (r + 0.5 * sigma ** 2) * t) / (sigma * math.sqrt(t))
+    d2 = d1 - sigma * math.sqrt(t)
+    discounted_k = k * math.exp(-r * t)
+    call = s * norm_cdf(d1) - discounted_k * norm_cdf(d2)
+    put = discounted_k * norm_cdf(-d2) - s * norm_cdf(-d1)
+    decay = -s * norm_pdf(d1) * sigma / (2 * math.sqrt(t))
+    return (
+        call,
+        put,
+        norm_cdf(d1),
+        norm_cdf(d1) - 1.0,
+        norm_pdf(d1) / (s * sigma * math.sqrt(t)),
+        s * norm_pdf(d1) * math.sqrt(t),
+        decay - r * discounted_k * norm_cdf(d2),
+        decay + r * discounted_k * norm_cdf(-d2),
+    )
+
+
+def random_chain(rng, size):
+    s = rng.uniform(50, 6000, size)
+    k = s * rng.uniform(0.5, 1.5, size)
+    t = rng.uniform(1 / 365, 2.5, size)
+    r = rng.uniform(0.0, 0.06, size)
+    sigma = rng.uniform(0.05, 1.2, size)
+    return s, k, t, r, sigma
+
+
+def main():
+    rng = np.random.default_rng(11)
+
+    s, k, t, r, sigma = random_chain(rng, CHECKED)
+    batched = black_scholes(s, k, t, r, sigma)
+    worst = 0.0
+    for i in range(CHECKED):
+        expected = scalar_greeks(s[i], k[i], t[i], r[i], sigma[i])
+        for field, value in zip(batched, expected):
+            worst = max(worst, abs(field[i] - value))
+    print(f"max |batched - scalar| over {CHECKED:,} contracts: {worst:.2e}")
+    if worst > TOLERANCE:
+        raise AssertionError(f"batched greeks differ from scalar formulas by {worst:.2e}")
+
+    s, k, t, r, sigma = random_chain(rng, CONTRACTS)
+    black_scholes(s[:1000], k[:1000], t[:1000], r[:1000], sigma[:1000])
+    start = time.perf_counter()
+    black_scholes(s, k, t, r, sigma)
+    elapsed = time.perf_counter() - start
+    print(f"{CONTRACTS:,} contracts, calls + puts + greeks: {elapsed * 1e3:.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
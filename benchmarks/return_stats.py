@@ -0,0 +1,114 @@
+"""
+Time to score and rank a whole sweep with lib.return_stats.
+
+Builds --configs PMCC-like runs (trade P&L booked on exit days, trade
+counts varying by config) and reduces each to its ReturnMoments the way
+a sweep worker does, then times sweep_stats plus a Sharpe ranking over
+all of them. For scale, a per-run loop computing every statistic from
+the curve, the way cagr.rb handles one return per call, is timed on a
+sample; every sampled run's statistics must match the batch.
+
+    python3 -m benchmarks.return_stats [--configs 10000] [--trades 2000]
+"""
+import argparse
+import math
+import time
+from types import SimpleNamespace
+
+import numpy as np
+
+from lib.return_stats import DAYS_PER_YEAR, cagr, pnl_moments
+from lib.sweep import sweep_stats
+
+CAPITAL = 1_000.0
+
+
+def synthetic_runs(rng, configs, trades):
+    """Entry day, exit days and trade P&L of each synthetic run."""
+    runs = []
+    for _ in range(configs):
+        count = trades - int(rng.integers(0, trades // 10))
+        entries = 14_612 + np.cumsum(rng.integers(1, 4, count))  # from 2010-01-04, a trade most sessions
+        runs.append({
+            "start_date": int(entries[0]),
+            "exit_date": entries + 45,
+            "pnl": rng.normal(rng.uniform(0.5, 4), 25, count).round(2),
+        })
+    return runs
+
+
+def one_run(summary):
+    """Every statistic of one run in plain Python, as a loop over configs would compute it."""
+    equity = [CAPITAL]
+    for pnl in summary["pnl"]:
+        equity.append(equity[-1] + pnl)
+    years = (summary["exit_date"][-1] - summary["start_date"]) / DAYS_PER_YEAR
+    returns = [b / a - 1 for a, b in zip(equity, equity[1:])]
+    per_year = len(returns) / years
+    mean = sum(returns) / len(returns)
+    std = math.sqrt(sum((r - mean) ** 2 for r in returns) / len(returns))
+    downside = math.sqrt(sum(min(r, 0) ** 2 for r in returns) / len(returns))
+    growth = equity[-1] / equity[0]
+    rate = growth ** (1 / years) - 1 if growth > 0 else -1.0
+    peak, max_drawdown = equity[0], 0.0
+    for value in equity:
+        peak = max(peak, value)
+        max_drawdown = max(max_drawdown, 1 - value / peak)
+    return {
+        "cagr": rate,
+        "volatility": std * math.sqrt(per_year),
+        "sharpe": mean / std * math.sqrt(per_year),
+        "sortino": mean / downside * math.sqrt(per_year),
+        "calmar": rate / max_drawdown,
+        "max_drawdown": max_drawdown,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--configs", type=int, default=10_000)
+    parser.add_argument("--trades", type=int, default=2_000)
+    parser.add_argument("--sample", type=int, default=50)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(20)
+    runs = synthetic_runs(rng, args.configs, args.trades)
+
+    started = time.perf_counter()
+    results = [
+        (SimpleNamespace(index=i), {"moments": pnl_moments(run["pnl"], run["exit_date"], CAPITAL,
+                                                           start=run["start_date"]).row(0)})
+        for i, run in enumerate(runs)
+    ]
+    reduce = time.perf_counter() - started
+
+    started = time.perf_counter()
+    stats = sweep_stats(results)
+    ranked = stats.rank("sharpe")
+    batch = time.perf_counter() - started
+
+    sample = rng.choice(args.configs, min(args.sample, args.configs), replace=False)
+    started = time.perf_counter()
+    expected = [one_run(runs[i]) for i in sample]
+    loop = (time.perf_counter() - started) * args.configs / len(sample)
+
+    for i, reference in zip(sample, expected):
+        for name, value in reference.items():
+            assert np.isclose(getattr(stats, name)[i], value, rtol=1e-7), (i, name, getattr(stats, name)[i], value)
+    sharpe = stats.sharpe[ranked]
+    assert np.all(sharpe[:-1] >= sharpe[1:])
+
+    # cagr.rb's own figures, from the comments under its list.
+    rates = cagr([1856.61, 2407.06, 2461.35], "2013-01-02", "2025-06-18")
+    assert [round(r * 100, 2) for r in rates] == [26.94, 29.49, 29.71]
+
+    print(f"{args.configs:,} configs x ~{args.trades:,} trades")
+    print(f"  moments, per run (spread over sweep workers): {reduce * 1000:>9.1f} ms")
+    print(f"  sweep_stats + rank:                           {batch * 1000:>9.1f} ms")
+    print(f"  per-run loop from the curves (estimated):     {loop * 1000:>9.1f} ms")
+    best = ranked[0]
+    print(f"  best by Sharpe: config {best}  " + "  ".join(f"{k} {v:.3f}" for k, v in stats.row(best).items()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""
+Per-minute cost of watching an open 0DTE spread for its stop.
+
+Replays random-walk quotes for a 400-strike SPXW chain, a spread held on
+two of its strikes, and compares the original per-minute recompute from
+NickSpxZeroDteV1.check_three_x_stop (look up both legs' holdings and
+quotes, rebuild the closing debit, test it) with lib.spread_mark, fed the
+same slices. The reference also pays for the engine refreshing the legs'
+securities, which the marks do not need. Both must stop on the same
+minute of every session.
+
+The two cost about the same per minute: the check was already a few
+lookups, and the marks trade them for a quote-bar lookup per leg. The
+change is behaviour-neutral, not a speedup. What it buys is one stop
+test shared by the strategies (and a working one in
+ZeroDTEBullPutSpreadSPX), fired only when a leg's quote moves.
+
+    python3 -m benchmarks.spread_mark [--sessions 200]
+"""
+import argparse
+import random
+import time
+from types import SimpleNamespace
+
+from lib.spread_mark import SpreadMarks
+
+STRIKES = 400
+MINUTES = 390
+
+
+def quote(bid, ask):
+    return SimpleNamespace(bid=SimpleNamespace(close=bid), ask=SimpleNamespace(close=ask))
+
+
+def session(rng, short=150, long=140, strikes=STRIKES, minutes=MINUTES):
+    """Per-minute slices quoting the whole chain; only the two legs' quotes move."""
+    chain = {strike: quote(0.05 * (strike % 7), 0.05 * (strike % 7) + 0.05) for strike in range(strikes)}
+    mids = {short: rng.uniform(0.4, 0.8), long: rng.uniform(0.05, 0.2)}
+    slices = []
+    for _ in range(minutes):
+        drift = rng.gauss(0, 0.05)
+        quote_bars = dict(chain)
+        for strike, mid in mids.items():
+            mid = mids[strike] = max(0.0, mid * (1 + drift) + rng.gauss(0, 0.01))
+            bid = round(max(0.0, mid - 0.025) * 20) / 20
+            if rng.random() < 0.9:  # some minutes carry no quote for the leg
+                quote_bars[strike] = quote(bid, round(bid + 0.05, 2))
+            else:
+                del quote_bars[strike]
+        slices.append(SimpleNamespace(quote_bars=quote_bars))
+    return slices
+
+
+def recompute_stop(slices, short, long, stop_price):
+    """
+    The original check: every minute, look up both legs' holdings and
+    securities and rebuild the closing debit.
+    """
+    portfolio = {short: SimpleNamespace(quantity=-2), long: SimpleNamespace(quantity=2)}
+    securities = {symbol: SimpleNamespace(bid_price=0.0, ask_price=0.0) for symbol in (short, long)}
+    for minute, data in enumerate(slices):
+        for symbol, security in securities.items():  # the engine's quote update; securities keep the last one
+            bar = data.quote_bars.get(symbol)
+            if bar is not None:
+                security.bid_price, security.ask_price = bar.bid.close, bar.ask.close
+        short_qty = portfolio[short].quantity
+        long_qty = portfolio[long].quantity
+        if short_qty == 0 and long_qty == 0:
+            continue
+        short_ask = float(securities[short].ask_price)
+        long_bid = float(securities[long].bid_price)
+        if short_ask <= 0 or long_bid < 0:
+            continue
+        if max(short_ask - long_bid, 0) >= stop_price:
+            return minute
+    return None
+
+
+def marked_stop(slices, short, long, stop_price):
+    fired = []
+    marks = SpreadMarks()
+    marks.track([(short, -1), (long, 1)], stop_price / 3, stop_price=stop_price,
+                on_stop=lambda mark: fired.append(minute))
+    for minute, data in enumerate(slices):
+        marks.update(data)
+        if fired:
+            return fired[0]
+    return None
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sessions", type=int, default=200)
+    args = parser.parse_args()
+
+    rng = random.Random(3)
+    cases = []
+    for _ in range(args.sessions):
+        slices = session(rng)
+        cases.append((slices, 150, 140, round(rng.uniform(0.6, 1.5), 2)))
+
+    timings = {}
+    for name, function in (("recompute", recompute_stop), ("spread mark", marked_stop)):
+        started = time.perf_counter()
+        results = [function(*case) for case in cases]
+        timings[name] = (time.perf_counter() - started, results)
+    expected, got = timings["recompute"][1], timings["spread mark"][1]
+    assert expected == got, [(i, a, b) for i, (a, b) in enumerate(zip(expected, got)) if a != b][:5]
+    stops = sum(minute is not None for minute in got)
+
+    minutes = sum(len(case[0]) for case in cases)
+    print(f"{len(cases)} sessions, {stops} stopped on the same minute both ways")
+    for name, (elapsed, _) in timings.items():
+        print(f"{name:>12}: {elapsed / minutes * 1e6:.2f} us per minute")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+"""
+Per-call latency of the SPXW 0DTE spread search.
+
+Compares the original nested loop from NickSpxZeroDteV1.select_spread with
+lib.spread_search on synthetic 0DTE chains of 400, 800 and 2,000 strikes,
+and checks that both pick the same pair on every chain.
+
+    python3 -m benchmarks.spread_search
+"""
+import math
+import random
+import time
+from types import SimpleNamespace
+
+from lib.spread_search import BEAR_CALL, BULL_PUT, SpreadLimits, SpreadSearch
+
+PUT = "PUT"
+CALL = "CALL"
+STRIKE_COUNTS = (400, 800, 2000)
+CHAINS_PER_SIZE = 20
+
+
+def norm_cdf(x):
+    return 0.5 * (1.0 + math.erf(x / math.sqrt(2)))
+
+
+def black_scholes(s, k, t, r, sigma, right):
+    d1 = (math.log(s / k) + (r + 0.5 * sigma ** 2) * t) / (sigma * math.sqrt(t))
+    d2 = d1 - sigma * math.sqrt(t)
+    call = s * norm_cdf(d1) - k * math.exp(-r * t) * norm_cdf(d2)
+    if right == CALL:
+        return call
+    return call - s + k * math.exp(-r * t)
+
+
+def synthetic_chain(strikes, spot, rng):
+    """One 0DTE snapshot with both rights, nickel quotes and a put skew."""
+    # Session hours left, measured in trading time as 0DTE desks quote it.
+    t = rng.uniform(3.5, 6.0) / (6.5 * 252)
+    width = spot * 0.10
+    step = 2 * width / strikes
+    contracts = []
+    for i in range(strikes):
+        k = round(spot - width + i * step, 2)
+        moneyness = math.log(k / spot)
+        sigma = 0.16 - 0.8 * moneyness + 4.0 * moneyness ** 2
+        for right in (PUT, CALL):
+            mid = max(black_scholes(spot, k, t, 0.04, sigma, right), 0.0)
+            bid = math.floor(mid * 20) / 20
+            ask = bid + 0.05 if mid > 0.01 else 0.0
+            contracts.append(SimpleNamespace(
+                strike=k, right=right, bid_price=round(bid, 2), ask_price=round(ask, 2)
+            ))
+    rng.shuffle(contracts)
+    return contracts
+
+
+def nested_loop(contracts, signal, spot, limits):
+    """The original O(shorts x chain) select_spread, kept as the reference."""
+    if signal == BULL_PUT:
+        short_limit = spot * (1 - limits.minimum_short_otm_percent)
+        hedge_limit = spot * (1 - limits.maximum_hedge_otm_percent)
+        short_candidates = [
+            c for c in contracts
+            if c.right == PUT
+            and hedge_limit < c.strike <= short_limit
+            and limits.minimum_short_price <= c.bid_price <= limits.maximum_short_price
+        ]
+    else:
+        short_limit = spot * (1 + limits.minimum_short_otm_percent)
+        hedge_limit = spot * (1 + limits.maximum_hedge_otm_percent)
+        short_candidates = [
+            c for c in contracts
+            if c.right == CALL
+            and short_limit <= c.strike < hedge_limit
+            and limits.minimum_short_price <= c.bid_price <= limits.maximum_short_price
+        ]
+
+    best = None
+    best_score = float("inf")
+    for short in short_candidates:
+        for long in contracts:
+            if long.right != short.right:
+                continue
+            if long.ask_price <= 0 or long.ask_price > limits.maximum_hedge_price:
+                continue
+
+            if signal == BULL_PUT:
+                valid_strike = hedge_limit <= long.strike < short.strike
+            else:
+                valid_strike = short.strike < long.strike <= hedge_limit
+            if not valid_strike:
+                continue
+
+            credit = short.bid_price - long.ask_price
+            if not limits.minimum_net_credit <= credit <= limits.maximum_net_credit:
+                continue
+
+            score = (
+                abs(short.bid_price - limits.short_target_price)
+                + abs(long.ask_price - limits.hedge_target_price)
+                + abs(credit - limits.credit_target)
+            )
+            if score < best_score:
+                best_score = score
+                best = (short, long, credit)
+    return best
+
+
+def sorted_search(contracts, signal, spot, limits):
+    right = PUT if signal == BULL_PUT else CALL
+    return SpreadSearch(contracts).best(right, signal, spot, limits)
+
+
+def time_per_call(function, cases, limits):
+    start = time.perf_counter()
+    for contracts, signal, spot in cases:
+        function(contracts, signal, spot, limits)
+    return (time.perf_counter() - start) / len(cases)
+
+
+def main():
+    rng = random.Random(7)
+    limits = SpreadLimits()
+    print(f"{'strikes':>8} | {'contracts':>9} | {'nested loop':>12} | {'sorted':>10} | {'speed-up':>8}")
+    for strikes in STRIKE_COUNTS:
+        cases = []
+        for _ in range(CHAINS_PER_SIZE):
+            spot = rng.uniform(4000, 6000)
+            contracts = synthetic_chain(strikes, spot, rng)
+            for signal in (BULL_PUT, BEAR_CALL):
+                cases.append((contracts, signal, spot))
+
+        for contracts, signal, spot in cases:
+            expected = nested_loop(contracts, signal, spot, limits)
+            actual = sorted_search(contracts, signal, spot, limits)
+            if expected != actual:
+                raise AssertionError(f"spread mismatch at {strikes} strikes, {signal} @ {spot:.2f}")
+
+        slow = time_per_call(nested_loop, cases, limits)
+        fast = time_per_call(sorted_search, cases, limits)
+        print(f"{strikes:>8} | {strikes * 2:>9} | {slow * 1e3:>9.2f} ms | "
+              f"{fast * 1e3:>7.2f} ms | {slow / fast:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
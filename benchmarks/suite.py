@@ -0,0 +1,266 @@
+"""
+Hot-path benchmarks for every strategy, with a history to compare commits.
+
+Times each strategy's per-decision method on the chains it is handed in
+production, unchanged from the strategy file and called on a stub holding
+only the attributes it reads:
+
+    select_spread    NickSpxZeroDteV1, 400-strike SPXW 0DTE chain
+    PickContracts    QQQLowDeltaBullCallSpreadWithROIClose, 120 strikes x 28-42 DTE Fridays
+    _best_contract   TslaLeapWheelAlgorithm, TSLA monthly LEAPs
+    FindContract     OvernightCalendarCallSafe, SPY dailies
+    minute loop      one NickSpxZeroDteV1 session through local_engine (390 minutes)
+    pmcc             lib.pmcc.run_pmcc over data/spy_daily_full.csv
+
+and reports p50/p99 latency per call plus the peak memory a call
+allocates (tracemalloc, measured in a separate pass so it does not skew
+the timings). Each run is appended to results/benchmark_history.json with
+the commit it ran on; --compare prints the change against the latest run
+from a different commit.
+
+    python3 -m benchmarks.suite [--only select_spread,pmcc] [--repeat 200] [--compare]
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import shutil
+import subprocess
+import tempfile
+import time
+import tracemalloc
+from dataclasses import asdict
+from datetime import date, timedelta
+from types import SimpleNamespace
+
+import numpy as np
+
+from benchmarks import chains
+from benchmarks.local_engine import weekdays, write_market
+from lib.chain_index import ChainIndex
+from lib.market_data import load_market_data
+from lib.pmcc import PmccConfig, run_pmcc
+from lib.spread_search import BEAR_CALL, BULL_PUT, SpreadLimits
+from local_engine.api import OptionRight
+from local_engine.engine import Engine, load_algorithm
+
+HISTORY = os.path.join("results", "benchmark_history.json")
+INPUTS = 20  # distinct chains per method case
+
+
+class Case:
+    """A named benchmark: `prepare(rng)` returns the zero-argument calls to time."""
+
+    def __init__(self, name, prepare, repeat_scale=1.0):
+        self.name = name
+        self.prepare = prepare
+        self.repeat_scale = repeat_scale  # fraction of --repeat; slow cases run fewer rounds
+
+
+def select_spread_calls(rng):
+    strategy = load_algorithm("Nick_SPX_0DTE.py")
+    stub = SimpleNamespace(**asdict(SpreadLimits()))
+    calls = []
+    for _ in range(INPUTS):
+        contracts, spot, _ = chains.spxw_0dte(rng)
+        for signal in (BULL_PUT, BEAR_CALL):
+            calls.append(lambda c=contracts, s=signal, p=spot: strategy.select_spread(stub, c, s, p))
+    return calls
+
+
+def pick_contracts_calls(rng):
+    strategy = load_algorithm("quant_connect_bull_call_spread.py")
+    calls = []
+    for _ in range(INPUTS):
+        contracts, _, now = chains.qqq_monthly(rng)
+        stub = SimpleNamespace(  # as in Initialize
+            Time=now, min_dte=28, max_dte=42,
+            target_long_delta=0.21, target_short_delta=0.07,
+            long_delta_range=(0.19, 0.22), short_delta_range=(0.06, 0.08),
+        )
+        calls.append(lambda c=contracts, s=stub: strategy.PickContracts(s, c))
+    return calls
+
+
+def best_contract_calls(rng):
+    strategy = load_algorithm("quant_connect_leap_wheel_claude.py")
+    calls = []
+    for _ in range(INPUTS):
+        contracts, spot, now = chains.tsla_leaps(rng)
+        # Each pick indexes its own slice: the wheel sells a put or a call on a given day, not both.
+        stub = SimpleNamespace(Time=now, _get_option_chain=lambda c=contracts: ChainIndex(c, min_bid=0.0))
+        target_expiry = now.date() + timedelta(days=540)
+        for right, strike, below in ((OptionRight.PUT, spot * 0.9, True), (OptionRight.CALL, spot * 1.1, False)):
+            calls.append(lambda s=stub, r=right, k=strike, b=below:
+                         strategy._best_contract(s, r, k, target_expiry, b))
+    return calls
+
+
+def find_contract_calls(rng):
+    strategy = load_algorithm("calendar_call.py")
+    calls = []
+    for _ in range(INPUTS):
+        contracts, spot, now = chains.spy_dailies(rng)
+        expiries = sorted({c.expiry.date() for c in contracts if c.expiry.date() > now.date()})
+        strike = float(round(spot))
+        for expiry in (expiries[0], expiries[min(7, len(expiries) - 1)]):
+            calls.append(lambda c=contracts, e=expiry: strategy.FindContract(None, c, strike, e))
+    return calls
+
+
+class SessionTimer(Engine):
+    """An Engine that records how long each session's minute loop takes."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.sessions = []
+
+    def _run_day(self, day, feeds, trading_days, on_data):
+        started = time.perf_counter_ns()
+        result = super()._run_day(day, feeds, trading_days, on_data)
+        self.sessions.append(time.perf_counter_ns() - started)
+        return result
+
+
+def minute_loop(sessions):
+    """Times whole backtests, so it is measured here rather than through Case calls."""
+    days = weekdays(date(2025, 1, 1), sessions + 2)  # two warm-up sessions for the previous close
+    root = tempfile.mkdtemp(prefix="suite_")
+    try:
+        write_market(root, days, 400)
+        engine = SessionTimer(load_algorithm("Nick_SPX_0DTE.py"), root, start=days[2], end=days[-1])
+        engine.run()
+        tracemalloc.start()
+        SessionTimer(load_algorithm("Nick_SPX_0DTE.py"), root, start=days[2], end=days[3]).run()
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        return engine.sessions, peak
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+def pmcc_calls(rng):
+    market = load_market_data()
+    return [lambda: run_pmcc(market, PmccConfig())]
+
+
+CASES = [
+    Case("select_spread", select_spread_calls),
+    Case("PickContracts", pick_contracts_calls),
+    Case("_best_contract", best_contract_calls),
+    Case("FindContract", find_contract_calls),
+    Case("pmcc", pmcc_calls, repeat_scale=0.1),
+]
+
+
+def measure(calls, rounds):
+    """(per-call nanoseconds, peak bytes of the largest call)."""
+    for call in calls:  # warm-up: imports, caches, first-call allocations
+        call()
+    samples = []
+    for _ in range(rounds):
+        for call in calls:
+            started = time.perf_counter_ns()
+            call()
+            samples.append(time.perf_counter_ns() - started)
+    peak = 0
+    tracemalloc.start()
+    for call in calls:
+        tracemalloc.reset_peak()
+        before = tracemalloc.get_traced_memory()[0]
+        call()
+        peak = max(peak, tracemalloc.get_traced_memory()[1] - before)
+    tracemalloc.stop()
+    return samples, peak
+
+
+def summary(samples, peak):
+    samples = np.asarray(samples, dtype=np.float64) / 1e3
+    return {
+        "calls": len(samples),
+        "p50_us": float(np.percentile(samples, 50)),
+        "p99_us": float(np.percentile(samples, 99)),
+        "peak_kib": peak / 1024,
+    }
+
+
+def git_state():
+    def git(*args):
+        try:
+            return subprocess.run(["git", *args], capture_output=True, text=True, check=True).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            return ""
+    return git("rev-parse", "--short", "HEAD") or "unknown", bool(git("status", "--porcelain", "--untracked-files=no"))
+
+
+def load_history(path):
+    if not os.path.exists(path):
+        return []
+    with open(path) as handle:
+        return json.load(handle)
+
+
+def save_history(path, history):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as handle:
+        json.dump(history, handle, indent=1)
+
+
+def print_table(results, baseline=None):
+    header = f"{'case':>15} | {'calls':>6} | {'p50 us':>10} | {'p99 us':>10} | {'peak KiB':>9}"
+    if baseline is not None:
+        header += f" | vs {baseline['commit']} p50"
+    print(header)
+    for name, row in results.items():
+        line = (f"{name:>15} | {row['calls']:>6} | {row['p50_us']:>10.1f} | {row['p99_us']:>10.1f} | "
+                f"{row['peak_kib']:>9.1f}")
+        before = baseline["results"].get(name) if baseline is not None else None
+        if before is not None:
+            line += f" | {(row['p50_us'] / before['p50_us'] - 1):>+8.1%}"
+        print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--only", help="comma-separated case names (minute loop is 'minute_loop')")
+    parser.add_argument("--repeat", type=int, default=100, help="rounds over each case's inputs")
+    parser.add_argument("--sessions", type=int, default=5, help="sessions for the minute loop")
+    parser.add_argument("--compare", action="store_true", help="compare with the latest run from another commit")
+    parser.add_argument("--history", default=HISTORY)
+    parser.add_argument("--no-save", action="store_true")
+    args = parser.parse_args()
+    only = set(args.only.split(",")) if args.only else None
+
+    rng = random.Random(15)
+    results = {}
+    for case in CASES:
+        if only is None or case.name in only:
+            calls = case.prepare(rng)
+            results[case.name] = summary(*measure(calls, max(1, int(args.repeat * case.repeat_scale))))
+    if only is None or "minute_loop" in only:
+        results["minute_loop"] = summary(*minute_loop(args.sessions))
+
+    commit, dirty = git_state()
+    history = load_history(args.history)
+    baseline = None
+    if args.compare:
+        baseline = next((run for run in reversed(history) if run["commit"] != commit), None)
+        if baseline is None:
+            print("no earlier commit in the history to compare with")
+    print_table(results, baseline)
+
+    if not args.no_save:
+        history.append({
+            "commit": commit,
+            "dirty": dirty,
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "results": results,
+        })
+        save_history(args.history, history)
+
+
+if __name__ == "__main__":
+    main()
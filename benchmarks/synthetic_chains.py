@@ -0,0 +1,79 @@
+"""
+Time to stream fifteen years of synthetic SPY chains with lib.synthetic_chains.
+
+Generates a chain for every session from --start to --end off the SPY
+closes and the VIX, touching each day's columns, and reports sessions,
+contracts, seconds and (in a second, traced pass over one year, since
+tracing slows NumPy down) the tracemalloc peak, which should stay at one
+block's worth however long the span. Every day is checked as it goes by:
+rows sorted by (expiry, right, strike), expiries after the day, 0 <= bid
+< ask on the tick, deltas within bounds, and call and put mids within a
+spread of put-call parity. A sample of days must come out the same when
+priced one day per block.
+
+    python3 -m benchmarks.synthetic_chains [--start 2010-01-01] [--end 2024-12-31]
+"""
+import argparse
+import time
+import tracemalloc
+
+import numpy as np
+
+from lib.market_data import load_market_data
+from lib.synthetic_chains import CALL, DAYS_PER_YEAR, PUT, ChainModel, market_chains
+
+
+def check(chain, model):
+    key = (chain.expiry.astype(np.int64) * 2 + chain.right) * 1e7 + chain.strike
+    assert np.all(np.diff(key) > 0)
+    assert chain.expiry.min() > chain.day
+    assert np.all((chain.bid >= 0) & (chain.bid < chain.ask))
+    assert np.allclose(np.round(chain.ask / model.tick) * model.tick, chain.ask)
+    assert np.all((chain.delta >= -1) & (chain.delta <= 1)
+                  & np.where(chain.right == CALL, chain.delta >= 0, chain.delta <= 0))
+
+    calls, puts = chain.right == CALL, chain.right == PUT
+    t = (chain.expiry[calls] - chain.day) / DAYS_PER_YEAR
+    parity = chain.spot - chain.strike[calls] * np.exp(-model.risk_free_rate * t)
+    mid = (chain.bid + chain.ask) / 2
+    spread = (chain.ask - chain.bid)[calls] + (chain.ask - chain.bid)[puts]
+    assert np.all(np.abs(mid[calls] - mid[puts] - parity) <= spread)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--start", default="2010-01-01")
+    parser.add_argument("--end", default="2024-12-31")
+    args = parser.parse_args()
+
+    market = load_market_data()
+    model = ChainModel()
+
+    started = time.perf_counter()
+    sessions = contracts = 0
+    for chain in market_chains(market, model, args.start, args.end):
+        sessions += 1
+        contracts += len(chain.strike)
+    elapsed = time.perf_counter() - started
+    print(f"{sessions:,} sessions, {contracts:,} contracts ({contracts // sessions:,} a day) in {elapsed:.2f}s, "
+          f"{contracts / elapsed / 1e6:.1f}M contracts/s")
+
+    tracemalloc.start()
+    for chain in market_chains(market, model, args.start, f"{int(args.start[:4]) + 1}{args.start[4:]}"):
+        pass
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    print(f"tracemalloc peak over one year: {peak / 1e6:.1f} MB")
+
+    started = time.perf_counter()
+    for i, chain in enumerate(market_chains(market, model, args.start, args.end)):
+        check(chain, model)
+        if i % 97 == 0:
+            single = next(market_chains(market, model, start=str(np.datetime64(chain.day, "D")), block_days=1))
+            assert single.day == chain.day
+            assert all(np.array_equal(a, b) for a, b in zip(single[3:], chain[3:]))
+    print(f"checked every session in {time.perf_counter() - started:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
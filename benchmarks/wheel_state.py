@@ -0,0 +1,127 @@
+"""
+TslaLeapWheelAlgorithm through local_engine, with and without lib.wheel_state.
+
+Writes synthetic TSLA bars and option quotes (one daily bar with monthly
+LEAPs), then runs the strategy twice: as written, and with its
+WheelState never allowed to sleep, which is the old every-bar behaviour.
+Both runs must place the same orders, plot the same chart points and log
+the same lines; the report is how many bars got the full pass.
+
+WheelStrategyTSLA is not wired to WheelState. On minute bars its OnData
+is a small share of the replay, so skipping held minutes saved no time,
+and the minutes it spends waiting for a sellable call cannot be slept
+through: its strike filter follows spot, so such a call can list at any
+minute.
+
+    python3 -m benchmarks.wheel_state [--years 5] [--data DIR]
+
+With --data the files are kept (and reused on the next run).
+"""
+import argparse
+import os
+import shutil
+import tempfile
+import time
+from datetime import date, timedelta
+
+import numpy as np
+
+from benchmarks.local_engine import weekdays
+from lib.market_data import day_number
+from lib.option_math import black_scholes
+from local_engine import data
+from local_engine.engine import load_algorithm, run
+
+CLOSE_MINUTE = 16 * 60
+DAILY_VOL = 0.55 / np.sqrt(252)
+
+
+def third_friday(year, month):
+    first = date(year, month, 1)
+    return first + timedelta(days=(4 - first.weekday()) % 7 + 14)
+
+
+def write_quotes(root, day, minutes, spot, expiries, grid):
+    minute, expiry, right, strike = (a.ravel() for a in np.meshgrid(
+        minutes, np.array([day_number(e) for e in expiries]), np.array([0, 1]), grid, indexing="ij"))
+    spot = spot[np.searchsorted(minutes, minute)]
+    t = np.maximum(expiry - day_number(day), 1) / 365.0
+    values = black_scholes(spot, strike, t, 0.03, 0.55)
+    price = np.where(right == 0, values.call, values.put)
+    half_spread = np.maximum(0.05, price * 0.02)
+    data.write_option_quotes(root, "TSLA", day, minute=minute.astype(np.int16), expiry=expiry.astype(np.int32),
+                             right=right.astype(np.int8), strike=strike,
+                             bid=np.maximum(np.round(price - half_spread, 2), 0.0), ask=np.round(price + half_spread, 2))
+
+
+def write_bars(root, day, minutes, path):
+    opens = np.concatenate(([path[0]], path[:-1]))
+    data.write_minute_bars(root, "TSLA", day, minute=minutes.astype(np.int16), open=opens,
+                           high=np.maximum(opens, path), low=np.minimum(opens, path), close=path,
+                           volume=np.zeros(len(path)))
+
+
+def write_leap_market(root, days, rng):
+    """One bar a day at the close; monthly expiries out to 26 months, $10 strikes around spot."""
+    close = 250.0
+    for day in days:
+        close *= np.exp(rng.normal(0.0, DAILY_VOL))
+        minutes = np.array([CLOSE_MINUTE])
+        spot = np.array([close])
+        write_bars(root, day, minutes, spot)
+        months = [(day.year + (day.month - 1 + k) // 12, (day.month - 1 + k) % 12 + 1) for k in range(1, 27)]
+        grid = round(close / 10) * 10 + 10.0 * np.arange(-30, 31)
+        write_quotes(root, day, minutes, spot, [third_friday(*m) for m in months], grid[grid > 0])
+
+
+def never_sleeping(algorithm_class):
+    """The strategy with its wheel kept awake: every bar gets the full pass, as before lib.wheel_state."""
+    class EveryBar(algorithm_class):
+        def Initialize(self):
+            super().Initialize()
+            self.wheel.sleep = lambda *args, **kwargs: None
+    EveryBar.__name__ = algorithm_class.__name__
+    return EveryBar
+
+
+def replay(path, root, start, end):
+    algorithm_class = load_algorithm(path)
+    results = {}
+    for label, cls in (("every bar", never_sleeping(algorithm_class)), ("wheel_state", algorithm_class)):
+        started = time.perf_counter()
+        result = run(cls, root, start=start, end=end)
+        elapsed = time.perf_counter() - started
+        wheel = result.algorithm.wheel
+        results[label] = result
+        print(f"  {label:>11}: {wheel.handled:>8,} full passes, {wheel.skipped:>8,} bars skipped, "
+              f"{len(result.orders):>3} orders, {elapsed:6.1f} s")
+    before, after = results["every bar"], results["wheel_state"]
+    assert before.orders == after.orders
+    assert before.charts == after.charts
+    # The closing line counts skipped bars, so it differs by design.
+    assert [l for l in before.logs if "Days handled" not in l] == [l for l in after.logs if "Days handled" not in l]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--years", type=int, default=5)
+    parser.add_argument("--data")
+    args = parser.parse_args()
+
+    root = args.data or tempfile.mkdtemp(prefix="wheel_")
+    try:
+        rng = np.random.default_rng(22)
+        leap_days = weekdays(date(2020, 1, 2), 252 * args.years)
+        leap_root = os.path.join(root, "leap")
+        if not os.path.isdir(leap_root):
+            write_leap_market(leap_root, leap_days, rng)
+
+        print(f"TslaLeapWheelAlgorithm, {len(leap_days)} daily bars")
+        replay("quant_connect_leap_wheel_claude.py", leap_root, leap_days[0], leap_days[-1])
+    finally:
+        if not args.data:
+            shutil.rmtree(root, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
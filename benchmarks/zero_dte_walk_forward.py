@@ -0,0 +1,140 @@
+"""
+Batch 0DTE replays for the walk-forward optimizer, checked against the engine.
+
+Writes --days synthetic SPX/SPXW sessions (benchmarks.local_engine), builds
+lib.zero_dte_sessions.SessionSnapshots from them, and:
+
+  * checks best_spread_arrays against SpreadSearch on random chains;
+  * checks that evaluate() gives NickSpxZeroDteV1's daily P&L on
+    local_engine, for the default limits, a tight stop and near-the-money
+    shorts (so every exit path is exercised), and shows what intrabar
+    stop fills (fills=INTRABAR) change for each;
+  * times a parameter grid through evaluate_grid.
+
+    python3 -m benchmarks.zero_dte_walk_forward [--days 40] [--configs 256] [--data DIR]
+"""
+import argparse
+import random
+import shutil
+import tempfile
+import time
+from datetime import date
+
+import numpy as np
+
+from benchmarks.local_engine import weekdays, write_market
+from lib.event_calendar import EventCalendar
+from lib.market_data import day_number
+from lib.spread_search import BEAR_CALL, BULL_PUT, SpreadSearch, best_spread_arrays
+from lib.sweep import parameter_grid
+from lib.zero_dte_sessions import (
+    EXIT_NAMES, INTRABAR, STOPPED, SessionSnapshots, ZeroDteParameters, evaluate, evaluate_grid,
+)
+from local_engine import data
+from local_engine.api import OptionRight
+from local_engine.engine import Engine, load_algorithm
+
+
+class Quote:
+    __slots__ = ("right", "strike", "bid_price", "ask_price")
+
+    def __init__(self, right, strike, bid, ask):
+        self.right, self.strike, self.bid_price, self.ask_price = right, strike, bid, ask
+
+
+def check_spread_arrays(rng, chains=300):
+    for _ in range(chains):
+        spot = rng.uniform(4000, 6000)
+        strike = np.round(np.arange(spot * 0.9, spot * 1.1, 5.0) / 5) * 5
+        bid = np.round(rng.uniform(0, 1.2, len(strike)) / 0.05) * 0.05
+        ask = bid + 0.05
+        ask[rng.random(len(strike)) < 0.1] = np.nan
+        signal = BULL_PUT if rng.random() < 0.5 else BEAR_CALL
+        limits = ZeroDteParameters(minimum_short_price=rng.choice([0.2, 0.35]), minimum_net_credit=0.2)
+        quoted = ~np.isnan(ask)
+        contracts = [Quote(OptionRight.PUT, k, b, a) for k, b, a in zip(strike[quoted], bid[quoted], ask[quoted])]
+        expected = SpreadSearch(contracts).best(OptionRight.PUT, signal, spot, limits)
+        got = best_spread_arrays(strike, np.where(quoted, bid, np.nan), ask, signal, spot, limits)
+        if expected is None:
+            assert got is None
+        else:
+            short, long, credit = got
+            assert (strike[short], strike[long], credit) == (expected[0].strike, expected[1].strike, expected[2])
+
+
+def engine_daily_pnl(root, start, end, params):
+    """NickSpxZeroDteV1's P&L per day on local_engine, with `params` applied."""
+    base = load_algorithm("Nick_SPX_0DTE.py")
+
+    class Configured(base):
+        def initialize(self):
+            super().initialize()
+            for name, value in vars(params).items():
+                setattr(self, name, value)
+
+    result = Engine(Configured, root, start, end).run()
+    values = [50_000.0] + [value for _, value in result.equity]
+    return {day_number(day): values[i + 1] - values[i] for i, (day, _) in enumerate(result.equity)}
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--days", type=int, default=40)
+    parser.add_argument("--configs", type=int, default=256)
+    parser.add_argument("--data", help="keep the synthetic files here")
+    args = parser.parse_args()
+
+    check_spread_arrays(np.random.default_rng(5))
+    print("best_spread_arrays matches SpreadSearch on 300 random chains")
+
+    days = weekdays(date(2025, 1, 1), args.days + 1)
+    root = args.data or tempfile.mkdtemp(prefix="zero_dte_")
+    try:
+        if len(data.available_days(root, "SPX")) < len(days):
+            write_market(root, days, 400)
+        calendar = EventCalendar.load(date(2020, 1, 1), date(2030, 12, 31))
+        started = time.perf_counter()
+        snapshots = SessionSnapshots.build(root, days[1], days[-1], calendar=calendar, intrabar=True)
+        sessions = snapshots.sessions()
+        print(f"{len(snapshots)} signal days snapshotted in {time.perf_counter() - started:.2f}s "
+              f"({snapshots.nbytes / 2**20:.1f} MiB)")
+
+        # The default limits, a tight stop, and near-the-money shorts that
+        # are often still ITM at 3:45 PM.
+        near_the_money = ZeroDteParameters(minimum_short_otm_percent=0.001, maximum_short_price=20.0,
+                                           maximum_net_credit=20.0, short_target_price=8.0, credit_target=8.0)
+        for params in (ZeroDteParameters(), ZeroDteParameters(stop_loss_multiple=1.5), near_the_money):
+            outcomes = evaluate(sessions, params)
+            engine = engine_daily_pnl(root, days[1], days[-1], params)
+            batch = dict(zip(snapshots.days.tolist(), outcomes.pnl.tolist()))
+            for day, pnl in engine.items():
+                assert abs(batch.get(day, 0.0) - pnl) < 1e-6, (day, batch.get(day), pnl)
+            exits = {EXIT_NAMES[code]: int((outcomes.exit == code).sum()) for code in EXIT_NAMES}
+            print(f"matches the engine on {len(engine)} days | {exits}")
+            intrabar = evaluate(sessions, params, fills=INTRABAR)
+            print(f"  intrabar fills: stopped {int((intrabar.exit == STOPPED).sum())} days, "
+                  f"P&L {intrabar.pnl.sum():,.0f} vs {outcomes.pnl.sum():,.0f} at minute closes")
+
+        grid = parameter_grid(
+            ZeroDteParameters(),
+            minimum_short_price=[0.25, 0.35, 0.45, 0.55],
+            maximum_hedge_price=[0.15, 0.25],
+            minimum_net_credit=[0.25, 0.35],
+            credit_target=[0.4, 0.5, 0.6, 0.7],
+            stop_loss_multiple=[1.5, 2.0, 3.0, 100.0],
+        )
+        grid = random.Random(1).sample(grid, min(args.configs, len(grid)))
+        started = time.perf_counter()
+        results = list(evaluate_grid(snapshots, grid))
+        elapsed = time.perf_counter() - started
+        per_day = elapsed / (len(results) * max(len(snapshots), 1))
+        print(f"{len(results)} configs x {len(snapshots)} signal days in {elapsed:.2f}s "
+              f"({per_day * 1e6:.0f} us per config-day; 10,000 configs over 900 signal days "
+              f"~ {per_day * 10_000 * 900 / 60:.0f} min per core)")
+    finally:
+        if args.data is None:
+            shutil.rmtree(root, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
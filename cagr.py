@@ -0,0 +1,20 @@
+import argparse
+
+from lib.return_stats import cagr
+
+# The QQQ variants cagr.rb lists, as total percent returns.
+RETURNS = [
+    1856.61, 1894.27, 2034.03, 2117.74, 2185.43, 2204.77, 2209.12,
+    2290.59, 2374.95, 2383.05, 2407.06, 2402.09, 2423.57, 2461.35,
+]
+
+# python3 cagr.py                                      the list above, like cagr.rb
+# python3 cagr.py 2121.06 2292.12 --end 2025-06-27     any returns over any span
+parser = argparse.ArgumentParser(description="CAGR of total percent returns over one span, in one batch.")
+parser.add_argument("returns", nargs="*", type=float, default=RETURNS)
+parser.add_argument("--start", default="2013-01-02")
+parser.add_argument("--end", default="2025-06-18")
+args = parser.parse_args()
+
+for percent, rate in zip(args.returns, cagr(args.returns, args.start, args.end)):
+    print(f"CAGR for {percent}% return from {args.start} to {args.end}: {round(rate * 100, 2)}%")
@@ -0,0 +1,153 @@
+"""
+Block-bootstrap resampling of the SPY/VIX history.
+
+Stress tests need histories that could have happened without assuming a
+return distribution. BlockResampler draws whole blocks of consecutive
+sessions, so each draw keeps the day's SPY return and VIX together and
+keeps their short-run dependence (volatility clustering, the VIX
+following the selloff). Two schemes:
+
+    circular    blocks of exactly block_days, wrapping at the end
+    stationary  block lengths geometric with mean block_days (Politis &
+                Romano), so the resampled series stays stationary
+
+Every column lives in one (columns x sessions) table and, for the
+circular scheme, the rows of the block starting at each session are
+indexed once when the resampler is built. A batch of paths is then a
+few integer draws and one gather, with no per-path loop or copy:
+
+    resampler = market_resampler(load_market_data(), block_days=21)
+    sample = resampler.sample(rng, paths=1_000, sessions=3_780)    # {"return": paths x sessions, "vix": ...}
+    for chunk in resampler.stream(paths=100_000, sessions=3_780):  # CHUNK_PATHS paths at a time
+        ...
+
+    for market in synthetic_histories(load_market_data(), 1_000, sessions=252 * 15):
+        trades = run_pmcc(market, config)                          # or any strategy over MarketData
+
+stream() and synthetic_histories() are generators, so memory stays at
+one chunk however many paths are drawn. Chunk i draws from
+default_rng([seed, i]), as lib.monte_carlo does, so a seed gives the
+same paths whatever the chunking downstream.
+"""
+import numpy as np
+
+from lib.market_data import MarketData
+from lib.trading_calendar import TradingCalendar
+
+CIRCULAR = "circular"
+STATIONARY = "stationary"
+KINDS = (CIRCULAR, STATIONARY)
+CHUNK_PATHS = 256  # paths per gather: ~8 MB per column over 15 years
+HISTORY_CHUNK_PATHS = 64  # synthetic_histories gathers six columns, so a smaller chunk
+
+
+class BlockResampler:
+    """Equal-length columns resampled in blocks of consecutive rows."""
+
+    def __init__(self, columns, block_days=21, kind=STATIONARY):
+        if kind not in KINDS:
+            raise ValueError(f"unknown bootstrap kind {kind!r}; expected one of {KINDS}")
+        if block_days < 1:
+            raise ValueError("block_days must be at least 1")
+        self.names = tuple(columns)
+        self.table = np.vstack([np.asarray(columns[name], dtype=np.float64) for name in self.names])
+        self.count = self.table.shape[1]
+        self.block_days = block_days
+        self.kind = kind
+        # Row i: the rows of the circular block starting at row i.
+        self.block_rows = (np.arange(self.count)[:, None] + np.arange(block_days)) % self.count
+
+    def rows(self, rng, paths, sessions):
+        """(paths x sessions) history rows of freshly drawn block-bootstrap paths."""
+        if self.kind == CIRCULAR:
+            starts = rng.integers(0, self.count, (paths, -(-sessions // self.block_days)))
+            return self.block_rows[starts].reshape(paths, -1)[:, :sessions]
+        # Stationary: each session opens a new block with probability 1 / block_days.
+        opens = rng.random((paths, sessions)) < 1.0 / self.block_days
+        opens[:, 0] = True
+        starts = rng.integers(0, self.count, (paths, sessions))  # read only where a block opens
+        session = np.arange(sessions)
+        opened = np.maximum.accumulate(np.where(opens, session, 0), axis=1)
+        return (np.take_along_axis(starts, opened, axis=1) + (session - opened)) % self.count
+
+    def gather(self, rows):
+        """{column: values at `rows`}, one gather for every column."""
+        return dict(zip(self.names, self.table[:, rows]))
+
+    def sample(self, rng, paths, sessions):
+        return self.gather(self.rows(rng, paths, sessions))
+
+    def stream(self, paths, sessions, seed=0, chunk_paths=CHUNK_PATHS):
+        """Yield sample()s of up to chunk_paths paths until `paths` have been drawn."""
+        for chunk, start in enumerate(range(0, paths, chunk_paths)):
+            rng = np.random.default_rng([seed, chunk])
+            yield self.sample(rng, min(chunk_paths, paths - start), sessions)
+
+
+def market_rows(market):
+    """Rows of `market` (after the first) with a VIX print, and the log adjusted-close return into each."""
+    returns = np.log(market.adj_close[1:] / market.adj_close[:-1])
+    rows = np.flatnonzero(np.isfinite(market.vix[1:]) & np.isfinite(returns)) + 1
+    return rows, returns[rows - 1]
+
+
+def market_resampler(market, block_days=21, kind=STATIONARY):
+    """
+    BlockResampler over the sessions of `market` with a VIX print. Each
+    row is a whole session: the log return of the adjusted close, the VIX,
+    open / high / low as ratios to the close, and the volume, so one draw
+    rebuilds a consistent bar.
+    """
+    rows, returns = market_rows(market)
+    close = market.close[rows]
+    return BlockResampler({
+        "return": returns,
+        "vix": market.vix[rows],
+        "open": market.open[rows] / close,
+        "high": market.high[rows] / close,
+        "low": market.low[rows] / close,
+        "volume": market.volume[rows],
+    }, block_days, kind)
+
+
+def synthetic_histories(market, count, sessions=None, block_days=21, kind=STATIONARY, seed=0,
+                        chunk_paths=HISTORY_CHUNK_PATHS):
+    """
+    Yield `count` resampled MarketData histories, one at a time, dated on
+    the last `sessions` + 1 real sessions of `market` (all of them if
+    None) and starting from the real bar on the first of those dates, so
+    calendar rules (run_pmcc's start_date and exit offsets) apply as they
+    do to the real history. close and adj_close are the same series.
+    """
+    resampler = market_resampler(market, block_days, kind)
+    sessions = len(market) - 1 if sessions is None else sessions
+    if not 0 < sessions < len(market):
+        raise ValueError(f"sessions must be between 1 and {len(market) - 1}")
+    first = len(market) - sessions - 1
+    dates = market.dates[first:]
+    calendar = TradingCalendar(dates)
+    # The opening bar is the real one, on the adjusted scale like the rest.
+    scale = market.adj_close[first] / market.close[first]
+    opening = {name: getattr(market, name)[first] * scale for name in ("open", "high", "low")}
+    opening.update({name: getattr(market, name)[first] for name in ("adj_close", "volume", "vix")})
+
+    def series(name, values):
+        return np.concatenate(([opening[name]], values))
+
+    for sample in resampler.stream(count, sessions, seed, chunk_paths):
+        close = np.empty((len(sample["return"]), sessions + 1))
+        close[:, 0] = opening["adj_close"]
+        close[:, 1:] = opening["adj_close"] * np.exp(np.cumsum(sample["return"], axis=1))
+        for i, path in enumerate(close):
+            history = MarketData(
+                dates=dates,
+                open=series("open", sample["open"][i] * path[1:]),
+                high=series("high", sample["high"][i] * path[1:]),
+                low=series("low", sample["low"][i] * path[1:]),
+                close=path,
+                volume=series("volume", sample["volume"][i]),
+                adj_close=path,
+                vix=series("vix", sample["vix"][i]),
+            )
+            history.__dict__["calendar"] = calendar  # the same dates every time: index them once
+            yield history
@@ -0,0 +1,112 @@
+"""
+Option chain index keyed by (right, expiry), for nearest-contract picks.
+
+TslaLeapWheelAlgorithm._best_contract used to copy the chain into a
+list, filter every contract with timedelta arithmetic, build a set of
+expiries and run min() over expiries and then strikes on every pick.
+ChainIndex walks the chain once, grouping contracts by (right, expiry);
+each right's expiries and each group's strikes are sorted on first use,
+so the nearest expiry in a window and the nearest strike in it are
+binary searches:
+
+    index = ChainIndex(chain, min_bid=0.0)           # once per slice
+    contract = index.nearest(OptionRight.PUT, spot * 0.9, today + timedelta(days=540),
+                             earliest=today + timedelta(days=365), latest=today + timedelta(days=730))
+
+Ties go the way the old min() calls went: between two equally distant
+strikes, the contract earlier in the chain; between two equally distant
+expiries, the earlier one. Contracts only need `right`, `expiry` (a
+datetime), `strike` and `bid_price`.
+"""
+from bisect import bisect_left, bisect_right
+
+
+class ChainIndex:
+    """One chain snapshot grouped by (right, expiry)."""
+
+    def __init__(self, contracts, min_bid=None):
+        # One pass, no per-contract records: most groups are never looked at.
+        self._groups = {}  # (right, expiry) -> [contract], in chain order
+        for c in contracts:
+            if min_bid is not None and not c.bid_price > min_bid:
+                continue
+            key = (c.right, c.expiry)
+            group = self._groups.get(key)
+            if group is None:
+                self._groups[key] = [c]
+            else:
+                group.append(c)
+        self._strikes = {}  # (right, expiry) -> see _sorted
+        self._expiries = {}  # right -> ([expiry date ordinals], [expiries]), sorted
+
+    def __len__(self):
+        return sum(len(group) for group in self._groups.values())
+
+    def __bool__(self):
+        return bool(self._groups)
+
+    def expiries(self, right):
+        """Sorted expiries (datetimes) with at least one contract of `right`."""
+        return self._by_right(right)[1]
+
+    def _by_right(self, right):
+        entry = self._expiries.get(right)
+        if entry is None:
+            expiries = sorted(expiry for r, expiry in self._groups if r == right)
+            entry = self._expiries[right] = ([e.toordinal() for e in expiries], expiries)
+        return entry
+
+    def nearest_expiry(self, right, target, earliest=None, latest=None):
+        """
+        The expiry of `right` whose date is closest to the `target` date,
+        among those dated within [earliest, latest]; None if there is none.
+        """
+        ordinals, expiries = self._by_right(right)
+        low = 0 if earliest is None else bisect_left(ordinals, earliest.toordinal())
+        high = len(ordinals) if latest is None else bisect_right(ordinals, latest.toordinal())
+        if low >= high:
+            return None
+        target = target.toordinal()
+        # The first expiry dated on or after the target, unless the last one before it is as close.
+        i = bisect_left(ordinals, target, low, high)
+        if i == high or (i > low and target - ordinals[i - 1] <= ordinals[i] - target):
+            i = bisect_left(ordinals, ordinals[i - 1], low, i)  # the earliest expiry on that date
+        return expiries[i]
+
+    def _sorted(self, key):
+        """(strikes ascending, chain-order positions in the group for each), built on first use."""
+        entry = self._strikes.get(key)
+        if entry is None:
+            group = self._groups.get(key, ())
+            order = sorted(range(len(group)), key=lambda i: group[i].strike)  # stable: chain order per strike
+            entry = self._strikes[key] = ([group[i].strike for i in order], order)
+        return entry
+
+    def strikes(self, right, expiry):
+        """([strikes], [contracts]) of one expiry, by strike then chain order."""
+        key = (right, expiry)
+        strikes, order = self._sorted(key)
+        group = self._groups.get(key, ())
+        return strikes, [group[i] for i in order]
+
+    def nearest_strike(self, right, expiry, target):
+        """The contract of (right, expiry) with the strike closest to `target`; None if there is none."""
+        key = (right, expiry)
+        group = self._groups.get(key)
+        if not group:
+            return None
+        strikes, order = self._sorted(key)
+        # Only the strikes either side of the target can be nearest; each may list several contracts.
+        i = bisect_left(strikes, target)
+        low = bisect_left(strikes, strikes[i - 1], 0, i) if i > 0 else i
+        high = bisect_right(strikes, strikes[i], i) if i < len(strikes) else i
+        # Equally near: the contract earlier in the chain, as min() over the chain picked.
+        best = min(range(low, high), key=lambda k: (abs(strikes[k] - target), order[k]))
+        return group[order[best]]
+
+    def nearest(self, right, target_strike, target_expiry, earliest=None, latest=None):
+        """nearest_strike within nearest_expiry: the contract a "~X% OTM, ~N days out" rule picks."""
+        expiry = self.nearest_expiry(right, target_expiry, earliest, latest)
+        if expiry is None:
+            return None
+        return self.nearest_strike(right, expiry, target_strike)
@@ -0,0 +1,143 @@
+"""
+Memory-mapped columnar cache for the daily CSVs.
+
+The first load of a CSV parses it and writes a binary file under
+data/.cache/, named after the CSV and a hash of its resolved path: a small
+JSON header followed by 64-byte aligned columns (int64 day numbers,
+float64 values). Later loads map that file and hand out read-only NumPy
+views of it, with no parsing and no copy.
+
+The cache is rebuilt when the source's size or mtime changes, or, with
+verify_hash=True, when its SHA-256 does. The file is written to a temporary
+name and renamed into place, so sweep workers starting together never see a
+half-written cache.
+"""
+import hashlib
+import json
+import os
+import struct
+import tempfile
+
+import numpy as np
+
+MAGIC = b"PMCCCOL1"
+ALIGNMENT = 64
+CACHE_DIR = "data/.cache"
+
+
+def _sha256(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _padded(n):
+    return -(-n // ALIGNMENT) * ALIGNMENT
+
+
+def cache_path(source, cache_dir=CACHE_DIR):
+    """
+    The cache file for `source`: its basename plus a short hash of its
+    resolved path, so same-named CSVs in different directories (or one CSV
+    reached through a symlink and directly) never share or fight over a cache.
+    """
+    name = os.path.splitext(os.path.basename(source))[0]
+    key = hashlib.sha256(os.path.realpath(source).encode()).hexdigest()[:12]
+    return os.path.join(cache_dir, f"{name}-{key}.cols")
+
+
+def write_columns(path, columns, source=None):
+    """Write {name: 1-D array} to `path` in the cache format."""
+    names = list(columns)
+    arrays = [np.ascontiguousarray(columns[name]) for name in names]
+    rows = len(arrays[0]) if arrays else 0
+    if any(len(a) != rows for a in arrays):
+        raise ValueError("all cached columns must have the same length")
+
+    header = {"rows": rows, "columns": []}
+    if source is not None:
+        stat = os.stat(source)
+        header["source"] = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "sha256": _sha256(source)}
+
+    # Column offsets depend on the header's length and vice versa; repeat
+    # until the padded header size stops moving (one or two passes).
+    data_start = 0
+    while True:
+        offset = data_start
+        header["columns"] = []
+        for name, array in zip(names, arrays):
+            header["columns"].append({"name": name, "dtype": array.dtype.str, "offset": offset})
+            offset = _padded(offset + array.nbytes)
+        encoded = json.dumps(header).encode()
+        needed = _padded(len(MAGIC) + 8 + len(encoded))
+        if needed == data_start:
+            break
+        data_start = needed
+
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(MAGIC + struct.pack("<Q", len(encoded)) + encoded)
+            for column, array in zip(header["columns"], arrays):
+                f.seek(column["offset"])
+                f.write(array.tobytes())
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+
+def read_header(path):
+    with open(path, "rb") as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{path} is not a column cache file")
+        (length,) = struct.unpack("<Q", f.read(8))
+        return json.loads(f.read(length))
+
+
+def map_columns(path):
+    """Map a cache file and return ({name: read-only view}, header)."""
+    header = read_header(path)
+    rows = header["rows"]
+    if rows == 0:
+        return {c["name"]: np.empty(0, dtype=np.dtype(c["dtype"])) for c in header["columns"]}, header
+    mapped = np.memmap(path, dtype=np.uint8, mode="r")
+    columns = {
+        c["name"]: np.ndarray((rows,), dtype=np.dtype(c["dtype"]), buffer=mapped, offset=c["offset"])
+        for c in header["columns"]
+    }
+    return columns, header
+
+
+def is_fresh(header, source, verify_hash=False):
+    recorded = header.get("source")
+    if recorded is None:
+        return False
+    stat = os.stat(source)
+    if stat.st_size != recorded["size"] or stat.st_mtime_ns != recorded["mtime_ns"]:
+        return False
+    return not verify_hash or _sha256(source) == recorded["sha256"]
+
+
+def cached_columns(source, build, required=(), cache_dir=CACHE_DIR, verify_hash=False):
+    """
+    Columns for `source`, from the cache when it is fresh.
+
+    `build()` parses the source and returns {name: array}; it only runs
+    when the cache is missing, stale, or lacks one of the `required` names.
+    """
+    path = cache_path(source, cache_dir)
+    if os.path.exists(path):
+        try:
+            columns, header = map_columns(path)
+            if set(required) <= set(columns) and is_fresh(header, source, verify_hash):
+                return columns
+        except (ValueError, OSError, KeyError):
+            pass  # unreadable or old-format cache; rebuild it below
+    write_columns(path, build(), source=source)
+    columns, _ = map_columns(path)
+    return columns
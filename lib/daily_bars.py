@@ -0,0 +1,100 @@
+"""
+Rolling cache of completed sessions' OHLC, kept from the strategy's own bars.
+
+NickSpxZeroDteV1 used to request five daily bars every morning for one
+number, yesterday's close. DailyBars is seeded once from a history
+request and then rolled forward by the minute bars the strategy already
+receives: each bar is merged into its session's open/high/low/close,
+and a session is complete once a bar from a later date arrives or a
+query asks for sessions before a later date. Previous-close and N-session
+lookbacks are then answered from memory. Feed it from its own hook (the
+minute data handler) rather than from a signal consolidator, so swapping
+or re-timing that consolidator cannot leave the sessions stale.
+
+    daily_bars = DailyBars()
+    ...
+    def on_data(self, data):
+        bar = data.bars.get(symbol)
+        if bar is not None:
+            daily_bars.update(bar)
+    ...
+    if not daily_bars.seeded:
+        daily_bars.seed(history[TradeBar](symbol, 5, Resolution.DAILY))
+    previous_close = daily_bars.previous_close(today)
+
+Bars only need `time`, `open`, `high`, `low`, `close` and `volume`; a bar
+belongs to the session of its start time's date.
+"""
+from collections import deque
+from typing import NamedTuple
+
+
+class DailyBar(NamedTuple):
+    day: object  # datetime.date of the session
+    open: float
+    high: float
+    low: float
+    close: float
+    volume: float
+
+
+class DailyBars:
+    """The last `size` completed sessions plus the session being built."""
+
+    def __init__(self, size=20):
+        self.size = size
+        self.seeded = False
+        self._completed = deque(maxlen=size)
+        self._session = None  # DailyBar of the latest date seen, still open
+
+    def seed(self, bars):
+        """
+        Load completed sessions from daily (or intraday) history bars. Sessions
+        already built from live bars win over seeded ones for the same date.
+        """
+        seeded = DailyBars(self.size)
+        for bar in sorted(bars, key=lambda bar: bar.time):
+            seeded.update(bar)
+        sessions = {bar.day: bar for bar in seeded._sessions()}
+        sessions.update((bar.day, bar) for bar in self._sessions())
+        ordered = [sessions[day] for day in sorted(sessions)]
+        if self._session is not None:
+            ordered.remove(self._session)
+        self._completed = deque(ordered, maxlen=self.size)
+        self.seeded = True
+
+    def update(self, bar):
+        day = bar.time.date()
+        session = self._session
+        if session is None or day > session.day:
+            if session is not None:
+                self._completed.append(session)
+            self._session = DailyBar(day, float(bar.open), float(bar.high), float(bar.low), float(bar.close),
+                                     float(bar.volume))
+        elif day == session.day:
+            self._session = DailyBar(day, session.open, max(session.high, float(bar.high)),
+                                     min(session.low, float(bar.low)), float(bar.close),
+                                     session.volume + float(bar.volume))
+        # bars from an earlier session than the one being built are late; ignored
+
+    def on_bar(self, sender, bar):
+        """Consolidator handler: `consolidator.data_consolidated += daily_bars.on_bar`."""
+        self.update(bar)
+
+    def previous(self, before, count=1):
+        """The last `count` sessions dated before `before`, oldest first."""
+        sessions = [bar for bar in self._sessions() if bar.day < before]
+        return sessions[-count:] if count > 0 else []
+
+    def previous_close(self, before):
+        """Close of the last session before `before`, or None if none is cached."""
+        sessions = self.previous(before)
+        return sessions[-1].close if sessions else None
+
+    def __len__(self):
+        return len(self._completed) + (self._session is not None)
+
+    def _sessions(self):
+        if self._session is None:
+            return list(self._completed)
+        return [*self._completed, self._session]
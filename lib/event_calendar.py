@@ -0,0 +1,189 @@
+"""
+Scheduled high-impact event days (FOMC decisions, ISM PMI releases).
+
+The day sets used to be rebuilt in every NickSpxZeroDteV1.initialize. Here
+they are built once, stored as one flag byte per calendar day (bit 0 FOMC,
+bit 1 ISM PMI) in data/.cache/event_calendar.bin, and looked up with a
+single index: is_blackout(day) is O(1) for any strategy.
+
+The cache file records a digest of the inputs below, so editing the FOMC
+list or the January exceptions rebuilds it automatically. The holiday and
+business-day rules in ism_pmi_dates are code, not data: bump
+CALENDAR_VERSION when changing them, and the digest changes with it.
+"""
+import hashlib
+import os
+import struct
+import tempfile
+from datetime import date, datetime, timedelta
+
+import numpy as np
+
+FOMC = 1
+ISM_PMI = 2
+
+CACHE_PATH = "data/.cache/event_calendar.bin"
+MAGIC = b"PMCCEVT1"
+HEADER = struct.Struct("<8s16sqq")  # magic, inputs digest, first ordinal, days
+DEFAULT_START = date(2020, 1, 1)
+DEFAULT_END = date(2030, 12, 31)
+CALENDAR_VERSION = 1  # bump whenever ism_pmi_dates' rules change
+
+# Scheduled FOMC decision dates (not minutes-release dates).
+FOMC_DATES = """
+2020-01-29 2020-03-03 2020-03-15 2020-04-29 2020-06-10 2020-07-29 2020-09-16 2020-11-05 2020-12-16
+2021-01-27 2021-03-17 2021-04-28 2021-06-16 2021-07-28 2021-09-22 2021-11-03 2021-12-15
+2022-01-26 2022-03-16 2022-05-04 2022-06-15 2022-07-27 2022-09-21 2022-11-02 2022-12-14
+2023-02-01 2023-03-22 2023-05-03 2023-06-14 2023-07-26 2023-09-20 2023-11-01 2023-12-13
+2024-01-31 2024-03-20 2024-05-01 2024-06-12 2024-07-31 2024-09-18 2024-11-07 2024-12-18
+2025-01-29 2025-03-19 2025-05-07 2025-06-18 2025-07-30 2025-09-17 2025-10-29 2025-12-10
+2026-01-28 2026-03-18 2026-04-29 2026-06-17 2026-07-29 2026-09-16 2026-10-28 2026-12-09
+"""
+
+# Verified ISM January exceptions/schedules.
+ISM_JANUARY = {
+    2020: (date(2020, 1, 3), date(2020, 1, 7)),
+    2021: (date(2021, 1, 5), date(2021, 1, 7)),
+    2022: (date(2022, 1, 4), date(2022, 1, 6)),
+    2023: (date(2023, 1, 4), date(2023, 1, 6)),
+    2024: (date(2024, 1, 3), date(2024, 1, 5)),
+    2025: (date(2025, 1, 3), date(2025, 1, 7)),
+    2026: (date(2026, 1, 5), date(2026, 1, 7)),
+}
+
+
+def fomc_dates():
+    return {datetime.strptime(x, "%Y-%m-%d").date() for x in FOMC_DATES.split()}
+
+
+def ism_pmi_dates(start, end):
+    """
+    ISM Manufacturing and Services PMI days.
+
+    ISM normally releases them on the first and third business days. For
+    trading purposes a business day is represented by a weekday, with the
+    observed New-Year, Independence-Day, Thanksgiving and Christmas shifts
+    below. January has historically had special ISM scheduling, so verified
+    January dates for 2020-2026 replace the general calculation.
+    """
+    fixed_holidays = set()
+    for year in range(start.year, end.year + 1):
+        # New Year's Day, Independence Day and Christmas (observed).
+        for month, day_number in ((1, 1), (7, 4), (12, 25)):
+            d = date(year, month, day_number)
+            if d.weekday() == 5:
+                d -= timedelta(days=1)
+            elif d.weekday() == 6:
+                d += timedelta(days=1)
+            fixed_holidays.add(d)
+        # Thanksgiving.
+        d = date(year, 11, 1)
+        while d.weekday() != 3:
+            d += timedelta(days=1)
+        fixed_holidays.add(d + timedelta(days=21))
+
+        # Labor Day: the first Monday in September. This commonly moves
+        # September Manufacturing PMI from Monday to Tuesday.
+        d = date(year, 9, 1)
+        while d.weekday() != 0:
+            d += timedelta(days=1)
+        fixed_holidays.add(d)
+
+    dates = set()
+    for year in range(start.year, end.year + 1):
+        for month in range(1, 13):
+            business_days = []
+            d = date(year, month, 1)
+            while d.month == month and len(business_days) < 3:
+                if d.weekday() < 5 and d not in fixed_holidays:
+                    business_days.append(d)
+                d += timedelta(days=1)
+            dates.add(business_days[0])
+            dates.add(business_days[2])
+
+    for year, pair in ISM_JANUARY.items():
+        dates = {d for d in dates if not (d.year == year and d.month == 1)}
+        dates.update(pair)
+    return {d for d in dates if start <= d <= end}
+
+
+def _inputs_digest(start, end):
+    source = repr((CALENDAR_VERSION, FOMC_DATES, sorted(ISM_JANUARY.items()), start, end)).encode()
+    return hashlib.sha256(source).digest()[:16]
+
+
+class EventCalendar:
+    """Per-day event flags between `start` and `end`, inclusive."""
+
+    def __init__(self, first_ordinal, flags):
+        self.first_ordinal = first_ordinal
+        self.flags = flags
+        self._flags = flags.tobytes()  # bytes indexing beats numpy for scalars
+
+    @classmethod
+    def build(cls, start=DEFAULT_START, end=DEFAULT_END):
+        first = start.toordinal()
+        flags = np.zeros(end.toordinal() - first + 1, dtype=np.uint8)
+        for kind, days in ((FOMC, fomc_dates()), (ISM_PMI, ism_pmi_dates(start, end))):
+            for d in days:
+                if start <= d <= end:
+                    flags[d.toordinal() - first] |= kind
+        return cls(first, flags)
+
+    @classmethod
+    def load(cls, start=DEFAULT_START, end=DEFAULT_END, path=CACHE_PATH):
+        """The calendar from `path` if it matches these inputs, else build and save it."""
+        digest = _inputs_digest(start, end)
+        try:
+            with open(path, "rb") as f:
+                magic, stored, first, days = HEADER.unpack(f.read(HEADER.size))
+                if magic == MAGIC and stored == digest:
+                    flags = np.frombuffer(f.read(days), dtype=np.uint8)
+                    if len(flags) == days:
+                        return cls(first, flags)
+        except (OSError, struct.error):
+            pass
+
+        calendar = cls.build(start, end)
+        try:
+            calendar.save(path, digest)
+        except OSError:
+            pass  # read-only deployment: keep the in-memory calendar
+        return calendar
+
+    def save(self, path, digest):
+        directory = os.path.dirname(path) or "."
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(HEADER.pack(MAGIC, digest, self.first_ordinal, len(self.flags)))
+                f.write(self._flags)
+            os.replace(tmp, path)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+
+    def events_on(self, day):
+        """Flag bits for `day` (a date or datetime); 0 outside the range."""
+        i = day.toordinal() - self.first_ordinal
+        if 0 <= i < len(self._flags):
+            return self._flags[i]
+        return 0
+
+    def is_blackout(self, day, kinds=FOMC | ISM_PMI):
+        return bool(self.events_on(day) & kinds)
+
+    def is_fomc(self, day):
+        return self.is_blackout(day, FOMC)
+
+    def is_ism_pmi(self, day):
+        return self.is_blackout(day, ISM_PMI)
+
+    def blackout_mask(self, day_numbers, kinds=FOMC | ISM_PMI):
+        """Vectorized is_blackout over lib.market_data day numbers."""
+        ordinals = np.asarray(day_numbers, dtype=np.int64) + date(1970, 1, 1).toordinal()
+        i = ordinals - self.first_ordinal
+        inside = (i >= 0) & (i < len(self.flags))
+        values = self.flags[np.where(inside, i, 0)]
+        return inside & ((values & kinds) != 0)
@@ -0,0 +1,336 @@
+"""
+One-pass statistics over backtest exports, in constant memory.
+
+The option backtester's exports (data/QQQ_21_7_35_28_84/) are CSVs with
+US dates ("1/4/2013"): Trades.csv, one row per closed trade, and
+Daily Settlement.csv, the account's net liquidity each day. They are read
+CHUNK_ROWS rows at a time into NumPy columns and folded into running
+accumulators, so the memory a run needs is the same for 500 trades or 5
+million:
+
+    trades           count, win rate, total/average P&L, average and
+                     median ROI, P&L by year of the close
+    daily settlement equity curve (streamed to an optional sink), max
+                     drawdown, CAGR from the first to the last day
+
+The median is exact up to EXACT_MEDIAN_LIMIT trades and a P-squared
+estimate (Jain & Chlamtac, 1985) beyond that. Yearly P&L sums each
+trade's Profit/loss into the year it closed, which reproduces the
+hand-made Yearly_Profit_Loss_Summary.csv.
+
+results/trades.csv from pmcc_backtest.py has ISO dates, per-share P&L and
+ROI as a fraction; PMCC_TRADES reads it the same way.
+"""
+import bisect
+import csv
+import glob
+import os
+from dataclasses import dataclass, field
+from datetime import date
+from itertools import islice
+from operator import itemgetter
+from typing import Callable
+
+import numpy as np
+
+from lib.market_data import to_day_numbers
+
+CHUNK_ROWS = 8_192
+EXACT_MEDIAN_LIMIT = 100_000
+DAYS_PER_YEAR = 365.25
+EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
+_us_dates = {}  # "M/D/YYYY" -> day number; exports repeat the same few thousand dates
+
+
+def us_day_numbers(texts):
+    """'M/D/YYYY' strings -> int64 day numbers."""
+    if len(_us_dates) > 10_000:
+        _us_dates.clear()
+    days = np.empty(len(texts), dtype=np.int64)
+    for i, text in enumerate(texts):
+        day = _us_dates.get(text)
+        if day is None:
+            month, day_of_month, year = text.strip().split("/")
+            day = _us_dates[text] = date(int(year), int(month), int(day_of_month)).toordinal() - EPOCH_ORDINAL
+        days[i] = day
+    return days
+
+
+def numbers(texts):
+    """Numeric CSV cells -> float64, NaN for blanks; tolerates $ and thousands commas."""
+    try:
+        return np.array(texts, dtype=np.float64)
+    except ValueError:
+        cleaned = [text.replace("$", "").replace(",", "").strip() or "nan" for text in texts]
+        return np.array(cleaned, dtype=np.float64)
+
+
+def read_chunks(path, columns, chunk_rows=CHUNK_ROWS):
+    """Yield {column: list of cell strings} for up to `chunk_rows` rows at a time."""
+    with open(path, newline="") as f:
+        reader = csv.reader(f)
+        header = [name.strip() for name in next(reader)]
+        missing = [name for name in columns if name not in header]
+        if missing:
+            raise ValueError(f"{path} has no column(s) {', '.join(missing)}")
+        # Keep only the wanted cells of each row, so a chunk never holds whole rows.
+        pick = itemgetter(*[header.index(name) for name in columns])
+        while True:
+            rows = [pick(row) for row in islice(reader, chunk_rows) if row]
+            if not rows:
+                return
+            if len(columns) == 1:
+                yield {columns[0]: rows}
+            else:
+                yield {name: list(cells) for name, cells in zip(columns, zip(*rows))}
+
+
+class StreamingMedian:
+    """Exact median of the first `limit` values, then the P-squared estimate."""
+
+    def __init__(self, limit=EXACT_MEDIAN_LIMIT):
+        self.limit = limit
+        self.count = 0
+        self._exact = np.empty(1024)  # grows to limit + 1 values, then is dropped
+        self._kept = 0
+        self._heights = None  # the five P-squared markers, once past the limit
+        self._positions = self._desired = None
+        self._increments = (0.0, 0.25, 0.5, 0.75, 1.0)
+
+    def update(self, values):
+        for value in np.asarray(values, dtype=np.float64).tolist():
+            if value != value:  # NaN
+                continue
+            self.count += 1
+            if self._exact is None:
+                self._add(value)
+                continue
+            if self._kept == len(self._exact):
+                self._exact = np.concatenate([self._exact, np.empty(min(len(self._exact), self.limit + 1))])
+            self._exact[self._kept] = value
+            self._kept += 1
+            if self._kept > self.limit:
+                self._seed(np.sort(self._exact[:self._kept]))
+                self._exact = None
+
+    @property
+    def value(self):
+        if self.count == 0:
+            return float("nan")
+        if self._exact is not None:
+            return float(np.median(self._exact[:self._kept]))
+        return float(self._heights[2])
+
+    def _seed(self, ordered):
+        """Start the markers from the exact sample's quartiles instead of its first five values."""
+        n = len(ordered)
+        self._desired = [1.0 + (n - 1) * increment for increment in self._increments]
+        self._positions = [float(round(desired)) for desired in self._desired]
+        self._heights = [float(ordered[int(p) - 1]) for p in self._positions]
+
+    def _add(self, x):
+        heights = self._heights
+        if x < heights[0]:
+            heights[0] = x
+            k = 0
+        elif x >= heights[4]:
+            heights[4] = x
+            k = 3
+        else:
+            k = bisect.bisect_right(heights, x) - 1
+        n, desired = self._positions, self._desired
+        for i in range(k + 1, 5):
+            n[i] += 1
+        for i in range(5):
+            desired[i] += self._increments[i]
+        for i in (1, 2, 3):
+            d = desired[i] - n[i]
+            if (d >= 1 and n[i + 1] - n[i] > 1) or (d <= -1 and n[i - 1] - n[i] < -1):
+                step = 1.0 if d > 0 else -1.0
+                candidate = heights[i] + step / (n[i + 1] - n[i - 1]) * (
+                    (n[i] - n[i - 1] + step) * (heights[i + 1] - heights[i]) / (n[i + 1] - n[i])
+                    + (n[i + 1] - n[i] - step) * (heights[i] - heights[i - 1]) / (n[i] - n[i - 1])
+                )
+                if not heights[i - 1] < candidate < heights[i + 1]:  # parabolic step overshot: go linear
+                    j = i + int(step)
+                    candidate = heights[i] + step * (heights[j] - heights[i]) / (n[j] - n[i])
+                heights[i] = candidate
+                n[i] += step
+
+
+@dataclass(frozen=True)
+class TradeColumns:
+    """Where a trade file keeps its close date, P&L and ROI, and how to read them."""
+
+    date: str
+    pnl: str
+    roi: str
+    parse_dates: Callable = us_day_numbers
+    roi_scale: float = 1.0  # multiplier that turns the file's ROI into a fraction
+
+
+EXPORT_TRADES = TradeColumns(date="Closed", pnl="Profit/loss", roi="ROI", roi_scale=0.01)
+PMCC_TRADES = TradeColumns(date="date", pnl="pnl", roi="roi", parse_dates=to_day_numbers)
+
+
+class TradeStats:
+    def __init__(self):
+        self.count = 0
+        self.wins = 0
+        self.total_pnl = 0.0
+        self.roi_sum = 0.0
+        self.roi_count = 0
+        self.median_roi = StreamingMedian()
+        self.yearly_pnl = {}  # year -> P&L of the trades closed in it
+
+    def update(self, days, pnl, roi):
+        self.count += len(pnl)
+        self.wins += int(np.count_nonzero(pnl > 0))
+        self.total_pnl += float(np.nansum(pnl))
+        known = roi[~np.isnan(roi)]
+        self.roi_sum += float(known.sum())
+        self.roi_count += len(known)
+        self.median_roi.update(known)
+        years = days.astype("datetime64[D]").astype("datetime64[Y]").astype(np.int64) + 1970
+        for year in np.unique(years):
+            self.yearly_pnl[int(year)] = self.yearly_pnl.get(int(year), 0.0) + float(np.nansum(pnl[years == year]))
+
+    @property
+    def win_rate(self):
+        return self.wins / self.count if self.count else float("nan")
+
+    @property
+    def average_pnl(self):
+        return self.total_pnl / self.count if self.count else float("nan")
+
+    @property
+    def average_roi(self):
+        return self.roi_sum / self.roi_count if self.roi_count else float("nan")
+
+
+class EquityStats:
+    """Running peak, drawdown and end points of an equity series fed in date order."""
+
+    def __init__(self, sink=None):
+        self.sink = sink  # called with (days, equity, drawdown) per chunk
+        self.first_day = self.last_day = None
+        self.first_equity = self.last_equity = float("nan")
+        self.peak = -np.inf
+        self.max_drawdown = 0.0
+        self.max_drawdown_day = None
+
+    def update(self, days, equity):
+        if not len(days):
+            return
+        if self.first_day is None:
+            self.first_day, self.first_equity = int(days[0]), float(equity[0])
+        peaks = np.maximum.accumulate(np.maximum(equity, self.peak))
+        drawdown = np.where(peaks > 0, 1.0 - equity / peaks, 0.0)
+        worst = int(np.argmax(drawdown))
+        if drawdown[worst] > self.max_drawdown:
+            self.max_drawdown = float(drawdown[worst])
+            self.max_drawdown_day = int(days[worst])
+        self.peak = float(peaks[-1])
+        self.last_day, self.last_equity = int(days[-1]), float(equity[-1])
+        if self.sink is not None:
+            self.sink(days, equity, drawdown)
+
+    @property
+    def cagr(self):
+        if self.first_day is None or self.last_day == self.first_day or self.first_equity <= 0:
+            return float("nan")
+        years = (self.last_day - self.first_day) / DAYS_PER_YEAR
+        return (self.last_equity / self.first_equity) ** (1.0 / years) - 1.0
+
+
+@dataclass
+class ExportSummary:
+    trades: TradeStats
+    equity: EquityStats = field(default_factory=EquityStats)
+
+    def lines(self):
+        t, e = self.trades, self.equity
+        lines = [
+            f"Total Trades: {t.count}",
+            f"Win Rate: {t.win_rate:.1%}",
+            f"Total P&L: ${t.total_pnl:,.2f}",
+            f"Avg P&L: ${t.average_pnl:,.2f}",
+            f"Avg ROI: {t.average_roi:.2%}",
+            f"Median ROI: {t.median_roi.value:.2%}"
+            + ("" if t.median_roi.count <= t.median_roi.limit else " (estimated)"),
+        ]
+        if e.first_day is not None:
+            first, last = np.array([e.first_day, e.last_day]).astype("datetime64[D]")
+            lines += [
+                f"Equity: ${e.first_equity:,.2f} on {first} -> ${e.last_equity:,.2f} on {last}",
+                f"Max Drawdown: {e.max_drawdown:.2%} (on {np.datetime64(e.max_drawdown_day, 'D')})",
+                f"CAGR: {e.cagr:.2%}",
+            ]
+        lines.append("P&L by year:")
+        lines += [f"  {year}: ${pnl:,.2f}" for year, pnl in sorted(t.yearly_pnl.items())]
+        return lines
+
+
+def analyze_trades(path, columns=EXPORT_TRADES, stats=None, chunk_rows=CHUNK_ROWS):
+    stats = TradeStats() if stats is None else stats
+    for chunk in read_chunks(path, (columns.date, columns.pnl, columns.roi), chunk_rows):
+        stats.update(columns.parse_dates(chunk[columns.date]), numbers(chunk[columns.pnl]),
+                     numbers(chunk[columns.roi]) * columns.roi_scale)
+    return stats
+
+
+def analyze_settlement(path, sink=None, chunk_rows=CHUNK_ROWS):
+    """Equity statistics from a Daily Settlement export (Date, Net liquidity)."""
+    stats = EquityStats(sink)
+    for chunk in read_chunks(path, ("Date", "Net liquidity"), chunk_rows):
+        stats.update(us_day_numbers(chunk["Date"]), numbers(chunk["Net liquidity"]))
+    return stats
+
+
+def export_file(directory, name):
+    """The export file ending in `name` (e.g. "Trades.csv") in `directory`, or None."""
+    matches = sorted(glob.glob(os.path.join(glob.escape(directory), f"* {name}")))
+    return matches[0] if matches else None
+
+
+def analyze_export(directory, equity_sink=None, chunk_rows=CHUNK_ROWS):
+    trades_path = export_file(directory, "Trades.csv")
+    if trades_path is None:
+        raise FileNotFoundError(f"no '* Trades.csv' export in {directory}")
+    summary = ExportSummary(analyze_trades(trades_path, EXPORT_TRADES, chunk_rows=chunk_rows))
+    settlement_path = export_file(directory, "Daily Settlement.csv")
+    if settlement_path is not None:
+        summary.equity = analyze_settlement(settlement_path, equity_sink, chunk_rows)
+    return summary
+
+
+def write_yearly_csv(stats, path):
+    """Year,Profit/Loss rows in the layout of Yearly_Profit_Loss_Summary.csv."""
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["Year", "Profit/Loss"])
+        for year, pnl in sorted(stats.yearly_pnl.items()):
+            writer.writerow([year, round(pnl, 2)])
+
+
+class EquityCurveWriter:
+    """Equity sink that streams date,equity,drawdown rows to a CSV."""
+
+    def __init__(self, path):
+        self._file = open(path, "w", newline="")
+        self._writer = csv.writer(self._file)
+        self._writer.writerow(["date", "equity", "drawdown"])
+
+    def __call__(self, days, equity, drawdown):
+        dates = np.asarray(days).astype("datetime64[D]").astype(str)
+        self._writer.writerows(zip(dates, equity.round(2), drawdown.round(6)))
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
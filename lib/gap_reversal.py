@@ -0,0 +1,165 @@
+"""
+Batch gap-reversal signals for the SPXW 0DTE strategy.
+
+NickSpxZeroDteV1.on_signal_bar finds its entry signal one consolidated bar
+at a time, through per-day instance state. scan() applies the same rules
+to years of SPX minute bars at once:
+
+    1. minute bars are resampled into bar_minutes candles aligned to
+       midnight (9:30-9:35, ...), stamped with their end minute;
+    2. a day is scanned only if it is not a blackout day and has a
+       previous session, whose last close is the gap reference;
+    3. the first candle ending at or after 9:30 + bar_minutes sets the gap
+       direction from its open, and must close in that direction;
+    4. a later candle signals BULL_PUT after a down gap if it is green and
+       closes above the previous candle's high, BEAR_CALL after an up gap
+       if it is red and closes below the previous candle's low;
+    5. with skip_if_gap_closes, a candle touching the previous close ends
+       the day before it can signal;
+    6. candles ending after last_entry_time are ignored.
+
+The result is each day's first signal: the candle's end minute and close,
+the signal_time and signal_spx_price the strategy records when its
+pending_signal is set, and the minute the signal lapses (the end of the
+candle that closes the gap, or the minute after last_entry_time). Bars
+must be sorted by (day, minute) and, as in local_engine.data, `minute` is
+the minute of day of each bar's end.
+"""
+from dataclasses import dataclass
+from datetime import time
+from typing import NamedTuple
+
+import numpy as np
+
+from lib.spread_search import BEAR_CALL, BULL_PUT
+
+SESSION_OPEN = 9 * 60 + 30
+BULL_PUT_CODE = 1  # after a down gap
+BEAR_CALL_CODE = -1  # after an up gap
+SIGNAL_NAMES = {BULL_PUT_CODE: BULL_PUT, BEAR_CALL_CODE: BEAR_CALL}
+
+
+@dataclass(frozen=True)
+class GapReversalRules:
+    """The signal settings of NickSpxZeroDteV1."""
+
+    bar_minutes: int = 5
+    last_entry_time: time = time(12, 30)
+    skip_if_gap_closes: bool = False
+
+    @classmethod
+    def from_algorithm(cls, algorithm):
+        """Read the rules from an algorithm exposing the same attribute names."""
+        return cls(**{name: getattr(algorithm, name) for name in cls.__dataclass_fields__})
+
+    @property
+    def first_bar_end(self):
+        return SESSION_OPEN + self.bar_minutes
+
+    @property
+    def last_entry_minute(self):
+        return self.last_entry_time.hour * 60 + self.last_entry_time.minute
+
+
+class Bars(NamedTuple):
+    day: np.ndarray
+    minute: np.ndarray  # end minute of each bar
+    open: np.ndarray
+    high: np.ndarray
+    low: np.ndarray
+    close: np.ndarray
+
+
+class Signals(NamedTuple):
+    """One row per day with a signal."""
+
+    day: np.ndarray
+    minute: np.ndarray  # end minute of the signal candle
+    price: np.ndarray  # its close
+    direction: np.ndarray  # BULL_PUT_CODE or BEAR_CALL_CODE
+    until: np.ndarray  # first minute the signal no longer stands
+
+    def names(self):
+        return [SIGNAL_NAMES[int(d)] for d in self.direction]
+
+
+def resample(day, minute, open, high, low, close, bar_minutes):
+    """Minute bars into bar_minutes bars aligned to midnight, as TradeBarConsolidator builds them."""
+    day = np.asarray(day)
+    minute = np.asarray(minute, dtype=np.int64)
+    end = ((minute - 1) // bar_minutes + 1) * bar_minutes
+    if not len(day):
+        return Bars(day, end, *(np.empty(0) for _ in range(4)))
+    starts = np.flatnonzero((day[1:] != day[:-1]) | (end[1:] != end[:-1])) + 1
+    starts = np.concatenate(([0], starts))
+    lasts = np.append(starts[1:], len(day)) - 1
+    return Bars(
+        day[starts], end[starts], np.asarray(open)[starts],
+        np.maximum.reduceat(np.asarray(high), starts), np.minimum.reduceat(np.asarray(low), starts),
+        np.asarray(close)[lasts],
+    )
+
+
+def previous_closes(day, close):
+    """(days, last close of the session before each day); NaN for the first day."""
+    days, first = np.unique(np.asarray(day), return_index=True)
+    last = np.append(first[1:], len(day)) - 1
+    previous = np.full(len(days), np.nan)
+    previous[1:] = np.asarray(close)[last[:-1]]
+    return days, previous
+
+
+def scan(day, minute, open, high, low, close, rules=GapReversalRules(), calendar=None):
+    """
+    Each day's first gap-reversal signal. `calendar` is an
+    lib.event_calendar.EventCalendar whose blackout days are skipped.
+    """
+    days, previous_close = previous_closes(day, close)
+    scanned = ~np.isnan(previous_close)
+    if calendar is not None:
+        scanned &= ~calendar.blackout_mask(days)
+
+    bars = resample(day, minute, open, high, low, close, rules.bar_minutes)
+    day_index = np.searchsorted(days, bars.day)
+    keep = ((bars.minute >= rules.first_bar_end) & (bars.minute <= rules.last_entry_minute)
+            & scanned[day_index])
+    bars = Bars(*(column[keep] for column in bars))
+    day_index = day_index[keep]
+    n = len(bars.day)
+    if not n:
+        return Signals(np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64), np.empty(0),
+                       np.empty(0, dtype=np.int8), np.empty(0, dtype=np.int64))
+
+    # One group per scanned day; its first bar is the opening candle.
+    first = np.flatnonzero(np.concatenate(([True], bars.day[1:] != bars.day[:-1])))
+    group = np.repeat(np.arange(len(first)), np.diff(np.append(first, n)))
+    reference = previous_close[day_index]
+    gap = np.sign(bars.open[first] - reference[first])[group]
+    green = bars.close > bars.open
+    red = bars.close < bars.open
+    opening_valid = ((gap > 0) & green) | ((gap < 0) & red)
+
+    if rules.skip_if_gap_closes:
+        closed = ((gap < 0) & (bars.high >= reference)) | ((gap > 0) & (bars.low <= reference))
+    else:
+        closed = np.zeros(n, dtype=bool)
+
+    previous_high = np.concatenate(([np.nan], bars.high[:-1]))
+    previous_low = np.concatenate(([np.nan], bars.low[:-1]))
+    reversal = (
+        ((gap < 0) & green & (bars.close > previous_high))
+        | ((gap > 0) & red & (bars.close < previous_low))
+    )
+    reversal[first] = False
+
+    position = np.arange(n)
+    first_reversal = np.minimum.reduceat(np.where(reversal, position, n), first)
+    first_closed = np.minimum.reduceat(np.where(closed, position, n), first)
+    hit = opening_valid[first] & (first_reversal < first_closed)
+    rows = first_reversal[hit]
+    lapse = first_closed[hit]
+    until = np.where(lapse < n, bars.minute[np.minimum(lapse, n - 1)], rules.last_entry_minute + 1)
+    return Signals(
+        bars.day[rows], bars.minute[rows], bars.close[rows],
+        np.where(gap[rows] < 0, BULL_PUT_CODE, BEAR_CALL_CODE).astype(np.int8), until,
+    )
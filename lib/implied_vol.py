@@ -0,0 +1,133 @@
+"""
+Batched implied-volatility solver for option chain snapshots.
+
+Backs Black-Scholes volatility out of whole arrays of quotes at once, so the
+delta-based pickers can compute greeks locally instead of waiting on a
+per-contract price model. Each iteration takes a Newton step where it stays
+inside the contract's bracket and bisects where it does not; contracts drop
+out of the working set as soon as they converge.
+
+Quotes outside the no-arbitrage bounds (or with t <= 0) come back as NaN
+with converged=False.
+"""
+import numpy as np
+
+from lib.option_math import norm_cdf, norm_pdf
+
+MINIMUM_VOL = 1e-4
+MAXIMUM_VOL = 5.0
+
+
+def _price_and_vega(s, k, t, r, sigma, is_call):
+    sqrt_t = np.sqrt(t)
+    vol_t = sigma * sqrt_t
+    d1 = (np.log(s / k) + (r + 0.5 * sigma ** 2) * t) / vol_t
+    d2 = d1 - vol_t
+    discounted_k = k * np.exp(-r * t)
+    call = s * norm_cdf(d1) - discounted_k * norm_cdf(d2)
+    price = np.where(is_call, call, call - s + discounted_k)
+    return price, s * norm_pdf(d1) * sqrt_t
+
+
+def implied_vol(price, s, k, t, r, is_call, initial=None,
+                tolerance=1e-8, max_iterations=100):
+    """
+    Solve sigma for every quote; returns (iv, converged) arrays.
+
+    `initial` seeds the Newton iteration, typically last bar's IVs; NaN or
+    missing entries start from the Brenner-Subrahmanyam estimate instead.
+    """
+    price, s, k, t, r, is_call = np.broadcast_arrays(
+        np.asarray(price, dtype=np.float64),
+        np.asarray(s, dtype=np.float64),
+        np.asarray(k, dtype=np.float64),
+        np.asarray(t, dtype=np.float64),
+        np.asarray(r, dtype=np.float64),
+        np.asarray(is_call, dtype=bool),
+    )
+    shape = price.shape
+    price, s, k, t, r, is_call = (a.ravel() for a in (price, s, k, t, r, is_call))
+    size = price.size
+
+    iv = np.full(size, np.nan)
+    converged = np.zeros(size, dtype=bool)
+
+    with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+        discounted_k = k * np.exp(-r * t)
+        lower = np.where(is_call, np.maximum(s - discounted_k, 0.0), np.maximum(discounted_k - s, 0.0))
+        upper = np.where(is_call, s, discounted_k)
+        solvable = (t > 0) & (s > 0) & (k > 0) & (price > lower) & (price < upper)
+
+        guess = np.sqrt(2.0 * np.pi / t) * price / s
+        if initial is not None:
+            seed = np.broadcast_to(np.asarray(initial, dtype=np.float64), shape).ravel()
+            guess = np.where(np.isfinite(seed) & (seed > 0), seed, guess)
+    guess = np.clip(np.nan_to_num(guess, nan=0.2), MINIMUM_VOL, MAXIMUM_VOL)
+
+    active = np.flatnonzero(solvable)
+    sigma = guess[active]
+    low = np.full(active.size, MINIMUM_VOL)
+    high = np.full(active.size, MAXIMUM_VOL)
+
+    for _ in range(max_iterations):
+        if active.size == 0:
+            break
+        with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+            model, vega = _price_and_vega(
+                s[active], k[active], t[active], r[active], sigma, is_call[active]
+            )
+            error = model - price[active]
+
+            # Price is increasing in sigma, so the sign of the error tells
+            # which side of the root sigma sits on.
+            low = np.where(error < 0, sigma, low)
+            high = np.where(error > 0, sigma, high)
+
+            done = (np.abs(error) <= tolerance) | (high - low <= tolerance * sigma)
+            newton = sigma - error / vega
+            inside = np.isfinite(newton) & (newton > low) & (newton < high)
+            step = np.where(inside, newton, 0.5 * (low + high))
+
+        finished = active[done]
+        iv[finished] = sigma[done]
+        converged[finished] = True
+
+        keep = ~done
+        active = active[keep]
+        sigma = step[keep]
+        low = low[keep]
+        high = high[keep]
+
+    # Whatever is left hit max_iterations; report the best estimate unconverged.
+    iv[active] = sigma
+    return iv.reshape(shape), converged.reshape(shape)
+
+
+class WarmStart:
+    """Last solved IV per contract key, used to seed the next bar's solve."""
+
+    def __init__(self):
+        self._last = {}
+
+    def guesses(self, keys):
+        last = self._last
+        return np.fromiter((last.get(key, np.nan) for key in keys), dtype=np.float64, count=len(keys))
+
+    def update(self, keys, iv, converged):
+        last = self._last
+        for key, value, ok in zip(keys, iv.tolist(), converged.tolist()):
+            if ok:
+                last[key] = value
+
+    def solve(self, keys, price, s, k, t, r, is_call, **options):
+        """Solve one snapshot seeded from, and then updating, the cache."""
+        iv, converged = implied_vol(
+            price, s, k, t, r, is_call, initial=self.guesses(keys), **options
+        )
+        self.update(keys, iv, converged)
+        return iv, converged
+
+    def forget(self, keys):
+        """Drop expired contracts so the cache does not grow without bound."""
+        for key in keys:
+            self._last.pop(key, None)
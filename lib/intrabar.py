@@ -0,0 +1,122 @@
+"""
+Intrabar paths for stop and target fills.
+
+A minute-close check sees a spread's price once per bar: a stop touched
+and recovered inside the minute is missed, and one crossed mid-bar fills
+at the close instead of at the stop. A once-a-day check (the QQQ bull
+call spread's 3:45 PM CheckExits) is the same bias, 390 times coarser.
+
+This module rebuilds each underlying bar as a path through four nodes,
+open -> first extreme -> second extreme -> close (low first on an up bar,
+high first on a down bar), reprices the held legs at every node with
+Black-Scholes at the volatility implied by the quote the bar started from,
+and finds the first point where the spread's closing cost crosses a stop
+or a target. Everything is computed for a whole day of bars at once.
+
+Closing cost follows lib.spread_mark: what it costs to close one unit, per
+share, with shorts bought back at the ask and longs sold at the bid
+(model price plus or minus the bar's starting half spread). It is negative
+for a debit spread, so "cost >= stop" and "cost <= target" cover both a
+credit spread's loss and a debit spread's falling value.
+"""
+from typing import NamedTuple
+
+import numpy as np
+
+from lib.implied_vol import implied_vol
+from lib.option_math import black_scholes_call
+
+NODES = 4  # open, first extreme, second extreme, close
+MINUTES_PER_YEAR = 252 * 390  # trading time, as the 0DTE desks quote it
+
+STOP = "stop"
+TARGET = "target"
+
+
+class Crossing(NamedTuple):
+    bar: int  # row of the bar the threshold was crossed in
+    fraction: float  # how far through the bar, 0 (open) to 1 (close)
+    cost: float  # fill: the threshold itself, or the node it gapped to
+    kind: str  # STOP or TARGET
+
+
+def bar_paths(open, high, low, close):
+    """(bars, 4) underlying price at each bar's path nodes; NaN bars give NaN rows."""
+    open, high, low, close = (np.asarray(a, dtype=np.float64) for a in (open, high, low, close))
+    up = close >= open
+    return np.stack([open, np.where(up, low, high), np.where(up, high, low), close], axis=1)
+
+
+def node_years(minute, expiry_minute, bar_minutes=1, nodes=NODES):
+    """
+    (bars, nodes) years to expiry at each node of the bars ending at
+    `minute` (minutes of the session), spreading the nodes evenly over
+    the bar.
+    """
+    minute = np.asarray(minute, dtype=np.float64)
+    offsets = np.linspace(-bar_minutes, 0, nodes)
+    return np.maximum(expiry_minute - (minute[:, None] + offsets), 0.0) / MINUTES_PER_YEAR
+
+
+def quote_vols(bid, ask, spot, strike, is_call, years, rate=0.0):
+    """Implied volatility of each quote's mid; NaN where the mid is missing or outside the bounds."""
+    bid, ask = np.asarray(bid, dtype=np.float64), np.asarray(ask, dtype=np.float64)
+    mid = np.where((bid >= 0) & (ask > 0), (bid + ask) / 2, np.nan)
+    iv, _ = implied_vol(mid, spot, strike, years, rate, is_call)
+    return iv
+
+
+def closing_costs(path, years, strike, is_call, quantity, iv, half_spread, rate=0.0):
+    """
+    (bars, nodes) cost to close one unit of the legs at every node.
+
+    path and years are (bars, nodes); strike, is_call and quantity are per
+    leg; iv and half_spread are (bars, legs), taken from each bar's
+    starting quote. Nodes where a leg has no volatility come back NaN.
+    """
+    s = np.asarray(path, dtype=np.float64)[:, :, None]
+    t = np.asarray(years, dtype=np.float64)[:, :, None]
+    k = np.asarray(strike, dtype=np.float64)[None, None, :]
+    calls = np.asarray(is_call, dtype=bool)[None, None, :]
+    quantity = np.asarray(quantity, dtype=np.float64)
+    call = black_scholes_call(s, k, t, rate, np.asarray(iv, dtype=np.float64)[:, None, :])
+    put = call - s + k * np.exp(-rate * t)  # parity
+    intrinsic = np.where(calls, np.maximum(s - k, 0.0), np.maximum(k - s, 0.0))
+    model = np.where(t > 0, np.where(calls, call, put), intrinsic)
+    half = np.asarray(half_spread, dtype=np.float64)[:, None, :]
+    side = np.where(quantity < 0, model + half, np.maximum(model - half, 0.0))
+    return (-quantity * side).sum(axis=2)
+
+
+def first_crossing(costs, stop=None, target=None):
+    """
+    The first Crossing of `costs` ((bars, nodes), NaN = unknown) above
+    `stop` or below `target`, or None.
+
+    Between two known nodes the cost is taken as linear, so a threshold
+    crossed inside a segment fills at the threshold; one first seen at a
+    bar's open, or after an unknown node, gapped and fills at that node.
+    """
+    costs = np.asarray(costs, dtype=np.float64)
+    nodes = costs.shape[1]
+    flat = costs.ravel()
+    hits = []
+    with np.errstate(invalid="ignore"):
+        if stop is not None:
+            hit = np.flatnonzero(flat >= stop)
+            if len(hit):
+                hits.append((int(hit[0]), stop, STOP))
+        if target is not None:
+            hit = np.flatnonzero(flat <= target)
+            if len(hit):
+                hits.append((int(hit[0]), target, TARGET))
+    if not hits:
+        return None
+    index, level, kind = min(hits)
+    bar, node = divmod(index, nodes)
+    value = float(flat[index])
+    previous = float(flat[index - 1]) if node else np.nan
+    if np.isnan(previous) or value == previous:
+        return Crossing(bar, node / (nodes - 1), value, kind)
+    segment = (level - previous) / (value - previous)
+    return Crossing(bar, (node - 1 + segment) / (nodes - 1), float(level), kind)
@@ -0,0 +1,110 @@
+"""
+Daily SPY and VIX history as aligned NumPy columns.
+
+Dates are int64 day numbers (days since 1970-01-01), the same values
+numpy's datetime64[D] uses, so "entry + 45 days" is plain integer math.
+Like the Ruby scripts, only the date part of timestamps such as
+"1993-01-29 14:30:00" is kept and a repeated date keeps its last row.
+
+Parsed CSVs are kept in lib.column_cache, so after the first run loading
+is a memory map rather than a text parse.
+"""
+import csv
+from dataclasses import dataclass
+from functools import cached_property
+
+import numpy as np
+
+from lib.column_cache import cached_columns
+from lib.trading_calendar import SKIP, TradingCalendar
+
+SPY_PATH = "data/spy_daily_full.csv"
+VIX_PATH = "data/vix_daily.csv"
+SPY_COLUMNS = ("open", "high", "low", "close", "volume", "adj_close")
+VIX_COLUMNS = ("vix",)
+
+
+def to_day_numbers(dates):
+    """'YYYY-MM-DD[ HH:MM:SS]' strings (or date objects) -> int64 day numbers."""
+    return np.array([str(d)[:10] for d in dates], dtype="datetime64[D]").astype(np.int64)
+
+
+def day_number(d):
+    """A single date (or 'YYYY-MM-DD' string) as a day number."""
+    return int(np.datetime64(str(d)[:10], "D").astype(np.int64))
+
+
+def to_dates(day_numbers):
+    """int64 day numbers -> datetime64[D], for formatting and display."""
+    return np.asarray(day_numbers, dtype=np.int64).astype("datetime64[D]")
+
+
+def parse_daily_csv(path, columns):
+    """Parse a dated CSV into (dates, {column: float64 array}), sorted by date."""
+    with open(path, newline="") as f:
+        rows = list(csv.DictReader(f))
+    dates = to_day_numbers(row["date"] for row in rows)
+    values = {name: np.array([float(row[name]) for row in rows]) for name in columns}
+
+    # Sort by date and keep the last row of any repeated date, as Ruby's
+    # to_h does.
+    order = np.argsort(dates, kind="stable")
+    dates = dates[order]
+    last = np.append(dates[1:] != dates[:-1], True)
+    return dates[last], {name: column[order][last] for name, column in values.items()}
+
+
+def read_daily_csv(path, columns, cache=True):
+    """parse_daily_csv, served from the binary column cache when fresh."""
+    if not cache:
+        return parse_daily_csv(path, columns)
+
+    def build():
+        dates, values = parse_daily_csv(path, columns)
+        return {"date": dates, **values}
+
+    cached = cached_columns(path, build, required=("date", *columns))
+    return cached["date"], {name: cached[name] for name in columns}
+
+
+@dataclass(frozen=True)
+class MarketData:
+    """SPY daily bars with the VIX close (as a decimal) on the same rows."""
+
+    dates: np.ndarray
+    open: np.ndarray
+    high: np.ndarray
+    low: np.ndarray
+    close: np.ndarray
+    volume: np.ndarray
+    adj_close: np.ndarray
+    vix: np.ndarray  # NaN where VIX has no print for that SPY date
+
+    def __len__(self):
+        return len(self.dates)
+
+    @cached_property
+    def calendar(self):
+        """Trading-calendar index over the SPY dates, built on first use."""
+        return TradingCalendar(self.dates)
+
+    def index_of(self, day_numbers, policy=SKIP):
+        """Row of each day number, or -1 when SPY did not trade that day."""
+        return self.calendar.rows(day_numbers, policy)
+
+
+def align(dates, source_dates, source_values):
+    """Values of a second series on `dates`, NaN where it has no row."""
+    rows = np.searchsorted(source_dates, dates)
+    rows = np.minimum(rows, len(source_dates) - 1)
+    return np.where(source_dates[rows] == dates, source_values[rows], np.nan)
+
+
+def load_market_data(spy_path=SPY_PATH, vix_path=VIX_PATH, cache=True):
+    spy_dates, spy = read_daily_csv(spy_path, SPY_COLUMNS, cache)
+    vix_dates, vix = read_daily_csv(vix_path, VIX_COLUMNS, cache)
+    return MarketData(
+        dates=spy_dates,
+        vix=align(spy_dates, vix_dates, vix["vix"] / 100.0),
+        **spy,
+    )
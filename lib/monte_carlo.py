@@ -0,0 +1,298 @@
+"""
+Monte Carlo risk distributions for the PMCC and LEAP strategies.
+
+run_pmcc and LeapStrategy each trade the one path history took, which
+says little about the tails that sizing (contracts_to_buy = 10, the
+wheel's max contracts) has to survive. Here a path model simulates many
+underlying and vol-index paths, a runner applies the strategy's entry and
+exit rules to all of them as array operations, and each path's equity
+curve is reduced to lib.return_stats ReturnMoments:
+
+    market = load_market_data()
+    moments = simulate(pmcc_paths, BlockBootstrap(), market, paths=100_000, years=15)
+    table = risk_table(moments)                       # percentiles of P&L, CAGR, drawdown, Sharpe
+
+    runner = partial(leap_paths, config=LeapConfig(contracts=20))
+    moments = simulate(runner, VixRegime(), market, paths=10_000)
+
+Path models, each giving daily log returns and the vol index (a decimal)
+on every session:
+
+    Gbm             constant drift and vol; the vol index is that vol
+    BlockBootstrap  blocks of consecutive SPY returns with their VIX,
+                    circular or stationary (lib.bootstrap); the block
+                    index is built once per worker
+    VixRegime       calm / normal / stressed regimes split by VIX level,
+                    switching as the history's daily transitions did;
+                    each session draws a historical (return, VIX) day
+                    from its regime
+
+Paths start from the last SPY adjusted close and VIX. A simulated year
+is 252 sessions of 365 / 252 calendar days, so calendar-day rules
+(days_to_short, 14 days between LEAP entries) map to the nearest whole
+number of sessions.
+
+Paths are simulated and run CHUNK_PATHS at a time in a process pool
+that shares the market data the way lib.sweep does; each chunk draws
+from its own seeded generator, so a seed gives the same distribution on
+any number of workers.
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from functools import partial
+from statistics import NormalDist
+
+import numpy as np
+
+from lib.bootstrap import CIRCULAR, BlockResampler, market_rows
+from lib.option_math import black_scholes_call
+from lib.pmcc import PmccConfig, trade_pnl
+from lib.return_stats import ReturnMoments, curve_moments, moment_stats
+from lib.sweep import SharedMarketData
+from lib.synthetic_chains import ChainModel, quote, strike_steps, surface
+
+SESSIONS_PER_YEAR = 252
+DAYS_PER_YEAR = 365.0
+DAYS_PER_SESSION = DAYS_PER_YEAR / SESSIONS_PER_YEAR
+CHUNK_PATHS = 128  # paths per task: ~90 MB of PMCC temporaries over 15 years
+PMCC_CAPITAL_SPOTS = 10.0
+PERCENTILES = (1, 5, 25, 50, 75, 95, 99)
+
+_worker_history = None
+_worker_block = None
+
+
+@dataclass(frozen=True)
+class History:
+    """Daily log returns of the SPY adjusted close and the VIX (decimal) at each return's close."""
+
+    returns: np.ndarray
+    vix: np.ndarray
+    last_close: float
+    last_vix: float
+    resamplers: dict = field(default_factory=dict, repr=False, compare=False)  # (block_days, kind) -> resampler
+
+    def resampler(self, block_days, kind):
+        """The BlockResampler over (returns, vix), built on first use and kept with the history."""
+        key = (block_days, kind)
+        if key not in self.resamplers:
+            self.resamplers[key] = BlockResampler({"return": self.returns, "vix": self.vix}, block_days, kind)
+        return self.resamplers[key]
+
+
+def history(market):
+    """The sessions of `market` with a VIX print, as History."""
+    rows, returns = market_rows(market)
+    last_vix = market.vix[np.isfinite(market.vix)][-1]
+    return History(returns, market.vix[rows], float(market.adj_close[-1]), float(last_vix))
+
+
+@dataclass(frozen=True)
+class Gbm:
+    drift: float = 0.07
+    vol: float = 0.18
+
+    def paths(self, history, rng, paths, sessions):
+        """(log returns, vol index) per session: paths x sessions, and paths x sessions + 1 from the start."""
+        step = 1.0 / SESSIONS_PER_YEAR
+        returns = rng.normal((self.drift - 0.5 * self.vol ** 2) * step, self.vol * np.sqrt(step), (paths, sessions))
+        return returns, np.full((paths, sessions + 1), self.vol)
+
+
+@dataclass(frozen=True)
+class BlockBootstrap:
+    block_days: int = 21
+    kind: str = CIRCULAR
+
+    def paths(self, history, rng, paths, sessions):
+        sample = history.resampler(self.block_days, self.kind).sample(rng, paths, sessions)
+        return sample["return"], _with_start(sample["vix"], history.last_vix)
+
+
+@dataclass(frozen=True)
+class VixRegime:
+    thresholds: tuple = (0.15, 0.25)  # VIX levels between calm, normal and stressed
+
+    def paths(self, history, rng, paths, sessions):
+        labels = np.searchsorted(self.thresholds, history.vix, side="right")
+        regimes = len(self.thresholds) + 1
+        transitions = np.zeros((regimes, regimes))
+        np.add.at(transitions, (labels[:-1], labels[1:]), 1.0)
+        transitions += np.eye(regimes) * (transitions.sum(axis=1, keepdims=True) == 0)  # never left: stay
+        cumulative = np.cumsum(transitions / transitions.sum(axis=1, keepdims=True), axis=1)
+
+        state = np.full(paths, np.searchsorted(self.thresholds, history.last_vix, side="right"))
+        switch = rng.random((paths, sessions))
+        regime = np.empty((paths, sessions), dtype=np.int64)
+        for i in range(sessions):
+            state = np.minimum((switch[:, i, None] > cumulative[state]).sum(axis=1), regimes - 1)
+            regime[:, i] = state
+
+        # The historical days of each regime, contiguous in `order`.
+        order = np.argsort(labels, kind="stable")
+        counts = np.bincount(labels, minlength=regimes)
+        offsets = np.concatenate(([0], np.cumsum(counts)[:-1]))
+        pick = (rng.random((paths, sessions)) * counts[regime]).astype(np.int64)
+        rows = order[offsets[regime] + pick]
+        return history.returns[rows], _with_start(history.vix[rows], history.last_vix)
+
+
+def _with_start(vol, start):
+    return np.hstack([np.full((len(vol), 1), start), vol])
+
+
+def simulate_paths(model, history, rng, paths, sessions, spot=None):
+    """(close, vol) of `paths` simulated paths, each paths x sessions + 1 from the start."""
+    returns, vol = model.paths(history, rng, paths, sessions)
+    spot = history.last_close if spot is None else spot
+    close = np.empty((paths, sessions + 1))
+    close[:, 0] = spot
+    close[:, 1:] = spot * np.exp(np.cumsum(returns, axis=1))
+    return close, vol
+
+
+def pmcc_paths(close, vol, config=PmccConfig(), capital=None):
+    """
+    run_pmcc's rules on simulated sessions: a PMCC opens every session and
+    closes days_to_short later, its P&L booked that day. Returns (equity
+    curves, sessions of their points); per share, like run_pmcc. Capital
+    defaults to ten times the starting spot, about what pmcc_sweep's 1,000
+    is to SPY in 2010.
+    """
+    if capital is None:
+        capital = PMCC_CAPITAL_SPOTS * close[:, :1]
+    hold = max(1, round(config.days_to_short / DAYS_PER_SESSION))
+    # Exits are taken as exactly days_to_short later, so the short has expired as in run_pmcc.
+    _, _, _, pnl = trade_pnl(close[:, :-hold], close[:, hold:], vol[:, :-hold], config.days_to_short, config)
+    equity = np.broadcast_to(np.asarray(capital, dtype=np.float64), close.shape).copy()
+    equity[:, hold:] += np.cumsum(pnl, axis=1)
+    return equity, np.arange(close.shape[1])
+
+
+@dataclass(frozen=True)
+class LeapConfig:
+    """LeapStrategy's rules; marks and fills come from a lib.synthetic_chains surface and spread."""
+
+    contracts: int = 10
+    cash: float = 100_000.0
+    every_days: int = 14
+    target_delta: float = 0.70
+    days_to_expiry: int = 375  # the middle of its 360-391 day window
+    take_profit: float = 1.5  # times the entry ask
+    exit_days: int = 30
+    margin_fraction: float = 0.99
+    chain: ChainModel = field(default_factory=ChainModel)
+
+
+def _leap_marks(config, s, index_vol, strike, days_left):
+    t = days_left / DAYS_PER_YEAR
+    iv = surface(config.chain, s, index_vol, t, strike)
+    return black_scholes_call(s, strike, t, config.chain.risk_free_rate, iv)
+
+
+def leap_paths(close, vol, config=LeapConfig()):
+    """
+    LeapStrategy's rules on simulated sessions. Every every_days it sells
+    open calls that reached take_profit times their entry ask or are
+    within exit_days of expiry (at the bid), then buys `contracts` calls
+    nearest target_delta, days_to_expiry out, at the ask if the cash
+    allows. Returns (equity curves at each decision, marked at model
+    prices, and at the last session after selling everything; their
+    sessions), in dollars.
+    """
+    paths, width = close.shape
+    step = max(1, round(config.every_days / DAYS_PER_SESSION))
+    decisions = np.arange(0, width - 1, step)
+    slots = -(-(config.days_to_expiry - config.exit_days) // config.every_days) + 1
+    size = 100.0 * config.contracts
+    r = config.chain.risk_free_rate
+    z = NormalDist().inv_cdf(config.target_delta)
+
+    strike = np.ones((paths, slots))
+    expiry = np.zeros((paths, slots))  # calendar day of expiry from the start
+    entry = np.zeros((paths, slots))
+    held = np.zeros((paths, slots), dtype=bool)
+    cash = np.full(paths, config.cash)
+    equity = np.empty((paths, len(decisions) + 1))
+
+    for j, session in enumerate(decisions):
+        day = session * DAYS_PER_SESSION
+        s, v = close[:, session], vol[:, session]
+
+        rows, cols = np.nonzero(held)
+        value = np.zeros(paths)
+        if len(rows):
+            days_left = expiry[rows, cols] - day
+            mark = _leap_marks(config, s[rows], v[rows], strike[rows, cols], days_left)
+            sell = (mark >= config.take_profit * entry[rows, cols]) | (days_left <= config.exit_days)
+            bid = quote(config.chain, mark)[0]
+            cash += np.bincount(rows[sell], weights=bid[sell] * size, minlength=paths)
+            held[rows[sell], cols[sell]] = False
+            value = np.bincount(rows[~sell], weights=mark[~sell] * size, minlength=paths)
+
+        # The call nearest target_delta at the at-the-money vol, on the chain's strike grid.
+        t = config.days_to_expiry / DAYS_PER_YEAR
+        atm = surface(config.chain, s, v, t, s * np.exp(r * t))
+        grid = config.chain.strike_step or strike_steps(s, config.chain.step_fraction)
+        k = np.maximum(np.round(s * np.exp(-z * atm * np.sqrt(t) + (r + 0.5 * atm ** 2) * t) / grid), 1.0) * grid
+        price = _leap_marks(config, s, v, k, float(config.days_to_expiry))
+        ask = quote(config.chain, price)[1]
+        buy = ask * size <= config.margin_fraction * (cash + value) - value
+        slot = j % slots
+        strike[buy, slot], expiry[buy, slot], entry[buy, slot] = k[buy], day + config.days_to_expiry, ask[buy]
+        held[buy, slot] = True
+        cash -= np.where(buy, ask * size, 0.0)
+        equity[:, j] = cash + value + np.where(buy, price * size, 0.0)
+
+    # Sell what is left at the last session's bid.
+    day = (width - 1) * DAYS_PER_SESSION
+    rows, cols = np.nonzero(held)
+    if len(rows):
+        mark = _leap_marks(config, close[rows, -1], vol[rows, -1], strike[rows, cols], expiry[rows, cols] - day)
+        cash += np.bincount(rows, weights=quote(config.chain, mark)[0] * size, minlength=paths)
+    equity[:, -1] = cash
+    return equity, np.append(decisions, width - 1)
+
+
+def _attach_worker(handle):
+    global _worker_block, _worker_history
+    _worker_block, market = SharedMarketData.attach(handle)
+    _worker_history = history(market)
+
+
+def _run_chunk(task, runner, model, sessions, spot, seed):
+    chunk, paths = task
+    rng = np.random.default_rng([seed, chunk])
+    close, vol = simulate_paths(model, _worker_history, rng, paths, sessions, spot)
+    equity, points = runner(close, vol)
+    return curve_moments(equity, points * DAYS_PER_SESSION)
+
+
+def simulate(runner, model, market, paths=10_000, years=15, seed=0, spot=None, workers=None,
+             chunk_paths=CHUNK_PATHS):
+    """
+    ReturnMoments of `runner` (pmcc_paths, leap_paths or a partial of
+    either) over `paths` paths of `years` simulated by `model`, one entry
+    per path, computed chunk by chunk on every core.
+    """
+    sessions = int(round(years * SESSIONS_PER_YEAR))
+    tasks = [(chunk, min(chunk_paths, paths - start)) for chunk, start in enumerate(range(0, paths, chunk_paths))]
+    workers = workers or os.cpu_count() or 1
+    run = partial(_run_chunk, runner=runner, model=model, sessions=sessions, spot=spot, seed=seed)
+    with SharedMarketData(market) as shared:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_attach_worker,
+                                 initargs=(shared.handle,)) as pool:
+            chunks = list(pool.map(run, tasks))
+    return ReturnMoments(*(np.concatenate(columns) for columns in zip(*chunks)))
+
+
+def risk_table(moments, percentiles=PERCENTILES):
+    """Percentiles across paths of P&L, CAGR, max drawdown and Sharpe, plus the share of losing paths."""
+    stats = moment_stats(moments)
+    pnl = moments.last_equity - moments.first_equity
+    table = {name: np.nanpercentile(values, percentiles)
+             for name, values in (("pnl", pnl), ("cagr", stats.cagr), ("max_drawdown", stats.max_drawdown),
+                                  ("sharpe", stats.sharpe))}
+    table["loss_probability"] = float(np.mean(pnl < 0))
+    return table
@@ -0,0 +1,164 @@
+"""
+Vectorized PMCC backtest over the SPY/VIX daily history.
+
+Same rules as pmcc_backtest.rb: every trading day from the start date buys
+a ~60 DTE call at 0.95x spot, sells a ~45 DTE call at 1.03x spot, and
+closes both when the short expires. When that expiry is not a trading day
+the trade is dropped (exit_policy="skip", the Ruby behavior) or the exit
+rolls to the next or previous session ("forward" / "back"). Instead of
+walking the rows one by one, every entry/exit pair and both legs' prices
+are computed as array operations, and prices are rounded the way Ruby's
+Float#round does, so write_trades_csv reproduces results/trades.csv
+byte for byte.
+"""
+import csv
+from dataclasses import dataclass
+
+import numpy as np
+
+from lib.market_data import day_number, to_dates
+from lib.option_math import black_scholes_call
+from lib.trading_calendar import SKIP
+
+TRADE_COLUMNS = ("date", "spy_price", "long_strike", "short_strike", "debit", "pnl", "roi", "win")
+
+
+@dataclass(frozen=True)
+class PmccConfig:
+    days_to_long: int = 60
+    days_to_short: int = 45
+    risk_free_rate: float = 0.01
+    start_date: str = "2010-01-01"
+    long_strike_multiplier: float = 0.95
+    short_strike_multiplier: float = 1.03
+    slippage: float = 0.10
+    commission: float = 2.00
+    fallback_iv: float = 0.20
+    long_iv_premium: float = 0.02
+    exit_policy: str = SKIP
+
+
+def round_half_up(x, digits=0):
+    """
+    Ruby's Float#round(digits) on arrays: half away from zero, plus Ruby's
+    correction for values whose decimal form sits just above the half.
+    Small negatives keep their sign (-0.0) unless they are below Ruby's
+    underflow cut-off, which returns 0.0.
+    """
+    x = np.asarray(x, dtype=np.float64)
+    scale = 10.0 ** digits
+    scaled = x * scale
+    f = np.trunc(scaled)
+    f = f + np.where(np.abs(scaled - f) >= 0.5, np.sign(scaled), 0.0)
+    if digits == 0:
+        return f
+    f = np.where(
+        x > 0,
+        np.where((f + 0.5) / scale <= x, f + 1, f),
+        np.where((f - 0.5) / scale >= x, f - 1, f),
+    )
+    rounded = np.copysign(f / scale, x)
+
+    # float_round_overflow / float_round_underflow from Ruby's float.c.
+    _, binexp = np.frexp(x)
+    overflow = digits >= 17 - np.where(binexp > 0, binexp // 4, -((-binexp) // 3) - 1)
+    underflow = digits < np.where(binexp > 0, -(binexp // 3 + 1), (-binexp) // 4)
+    rounded = np.where(underflow, 0.0, rounded)
+    return np.where(overflow | (x == 0), x, rounded)
+
+
+def _call(s, k, t, r, sigma):
+    """OptionMath.black_scholes_call, including its rounding to cents."""
+    return round_half_up(black_scholes_call(s, k, t, r, sigma), 2)
+
+
+def trade_pnl(s, s_exit, iv, held, config=PmccConfig()):
+    """
+    (long strike, short strike, debit, P&L) of PMCCs opened at spot `s`
+    with vol `iv` and closed `held` calendar days later at `s_exit`; any
+    broadcastable shapes, e.g. runs x trades for lib.monte_carlo.
+    """
+    r = config.risk_free_rate
+    iv_long = iv + config.long_iv_premium
+    iv_short = iv
+
+    k_long = round_half_up(s * config.long_strike_multiplier)
+    k_short = round_half_up(s * config.short_strike_multiplier)
+
+    long_price = _call(s, k_long, config.days_to_long / 365.0, r, iv_long) + config.slippage
+    short_price = _call(s, k_short, config.days_to_short / 365.0, r, iv_short) - config.slippage
+
+    long_close = _call(s_exit, k_long, (config.days_to_long - held) / 365.0, r, iv_long) - config.slippage
+    short_close = _call(s_exit, k_short, (config.days_to_short - held) / 365.0, r, iv_short) + config.slippage
+
+    total_pnl = (long_close - long_price) + (short_price - short_close) - config.commission
+    return k_long, k_short, long_price - short_price, total_pnl
+
+
+def run_pmcc(market, config=PmccConfig()):
+    """Every trade of one configuration, as a dict of equal-length columns."""
+    dates = market.dates
+    prices = market.adj_close
+
+    entry_rows = np.flatnonzero(dates >= day_number(config.start_date))
+    exit_rows = market.calendar.offset_rows(entry_rows, config.days_to_short, config.exit_policy)
+    traded = exit_rows >= 0
+    entry_rows = entry_rows[traded]
+    exit_rows = exit_rows[traded]
+
+    iv = market.vix[entry_rows]
+    iv = np.where(np.isnan(iv), config.fallback_iv, iv)
+    s = prices[entry_rows]
+    # Rolled exits hold a day or two more or less than days_to_short; with
+    # the default skip policy held == days_to_short and the short is expired.
+    held = dates[exit_rows] - dates[entry_rows]
+    k_long, k_short, debit_paid, total_pnl = trade_pnl(s, prices[exit_rows], iv, held, config)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        roi = total_pnl / debit_paid
+
+    return {
+        "date": dates[entry_rows],
+        "exit_date": dates[exit_rows],
+        "spy_price": round_half_up(s, 2),
+        "long_strike": k_long.astype(np.int64),
+        "short_strike": k_short.astype(np.int64),
+        "debit": round_half_up(debit_paid, 2),
+        "pnl": round_half_up(total_pnl, 2),
+        "roi": round_half_up(roi, 2),
+        "win": total_pnl > 0,
+    }
+
+
+def write_trades_csv(trades, path="results/trades.csv"):
+    """Write trades in the exact format pmcc_backtest.rb uses."""
+    columns = [
+        [str(d) for d in to_dates(trades["date"])],
+        trades["spy_price"].tolist(),
+        trades["long_strike"].tolist(),
+        trades["short_strike"].tolist(),
+        trades["debit"].tolist(),
+        trades["pnl"].tolist(),
+        trades["roi"].tolist(),
+        ["true" if w else "false" for w in trades["win"].tolist()],
+    ]
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f, lineterminator="\n")
+        writer.writerow(TRADE_COLUMNS)
+        writer.writerows(zip(*columns))
+
+
+def summarize(trades):
+    """The numbers analyze_results.rb prints, unrounded."""
+    pnl = trades["pnl"]
+    roi = trades["roi"]
+    count = len(pnl)
+    if count == 0:
+        return {"trades": 0, "win_rate": 0.0, "avg_pnl": 0.0, "avg_roi": 0.0, "median_roi": 0.0}
+    return {
+        "trades": count,
+        "win_rate": float(np.count_nonzero(trades["win"]) * 100.0 / count),
+        "avg_pnl": float(pnl.sum() / count),
+        "avg_roi": float(roi.sum() / count),
+        # analyze_results.rb takes roi.sort[size / 2], the upper median.
+        "median_roi": float(np.sort(roi)[count // 2]),
+    }
@@ -0,0 +1,167 @@
+"""
+Opt-in timing of an algorithm's callbacks, reported as a ranked call tree.
+
+A CallbackProfiler wraps callables so that each call records its wall
+time, its call count and, when allocations=True, the change in memory
+traced by tracemalloc across the call (net bytes still held when it
+returns). Calls are keyed by the path of wrapped callers above them, so
+the `history` call made from `prepare_for_session` made from a scheduled
+event is counted apart from one made from on_data, and each path's own
+time excludes the wrapped calls below it:
+
+    profiler = CallbackProfiler(methods=("select_spread",))
+    profiler.instrument(algorithm)
+    ...
+    profiler.emit(algorithm.log)
+
+instrument() wraps the algorithm's on_data, order event and end-of-day
+handlers, the calls a slow backtest usually spends its time in (history,
+logging and order placement) and any `methods` named, under one
+snake_case name whichever spelling the strategy uses. Scheduled events
+and consolidator handlers are registered with Lean, not on the
+algorithm, so they are wrapped where they are registered: local_engine
+does that for every event and handler when given a profiler, and a
+strategy on QuantConnect can pass `profiler.wrap(name, callback)` to
+Schedule.On.
+
+emit() writes the summary: paths ranked by their own time, then the call
+tree with each node's share of the profiled time. folded() returns the
+same tree as "a;b;c microseconds" lines for flamegraph tools.
+
+Each wrapped call costs two clock reads and a dict update, about a
+microsecond; tracemalloc slows everything it traces several times over,
+so allocations are off by default.
+"""
+import functools
+import time
+import tracemalloc
+
+CALLBACKS = ("on_data", "on_order_event", "on_assignment_order_event", "on_end_of_day",
+             "on_securities_changed")
+HELPERS = ("history", "log", "debug", "market_order", "limit_order", "combo_market_order",
+           "buy", "sell", "liquidate", "set_holdings")
+
+
+def pascal(name):
+    return "".join(part.capitalize() for part in name.split("_"))
+
+
+class _TimedIndexer:
+    """Wraps history-style callables that are also indexed: history[TradeBar](...)."""
+
+    def __init__(self, profiler, name, target):
+        self._profiler = profiler
+        self._name = name
+        self._target = target
+
+    def __getitem__(self, key):
+        return self._profiler.wrap(self._name, self._target[key])
+
+    def __call__(self, *args, **kwargs):
+        return self._profiler.wrap(self._name, self._target)(*args, **kwargs)
+
+
+class CallbackProfiler:
+    def __init__(self, allocations=False, methods=(), clock=time.perf_counter_ns):
+        self.allocations = allocations
+        self.methods = tuple(methods)  # extra strategy methods instrument() wraps
+        self._clock = clock
+        self._stats = {}  # path tuple -> [calls, total ns, ns in wrapped children, net bytes]
+        self._stack = []  # open calls: [path, ns in wrapped children]
+
+    def wrap(self, name, function):
+        """`function` timed under `name`; wrapping a wrapped function is a no-op."""
+        if getattr(function, "_profiled_by", None) is self:
+            return function
+        stats, stack, clock = self._stats, self._stack, self._clock
+        traced = tracemalloc.get_traced_memory if self.allocations else None
+
+        @functools.wraps(function)
+        def timed(*args, **kwargs):
+            path = stack[-1][0] + (name,) if stack else (name,)
+            frame = [path, 0]
+            stack.append(frame)
+            before = traced()[0] if traced is not None else 0
+            started = clock()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                elapsed = clock() - started
+                stack.pop()
+                if stack:
+                    stack[-1][1] += elapsed
+                entry = stats.get(path)
+                if entry is None:
+                    entry = stats[path] = [0, 0, 0, 0]
+                entry[0] += 1
+                entry[1] += elapsed
+                entry[2] += frame[1]
+                if traced is not None:
+                    entry[3] += traced()[0] - before
+
+        timed._profiled_by = self
+        return timed
+
+    def instrument(self, algorithm, methods=()):
+        """Wrap the algorithm's callbacks, helpers and methods in place; returns self."""
+        if self.allocations and not tracemalloc.is_tracing():
+            tracemalloc.start()
+        for name in dict.fromkeys((*CALLBACKS, *HELPERS, *self.methods, *methods)):
+            for attribute in dict.fromkeys((name, pascal(name))):
+                # Only spellings the class really defines: local_engine answers
+                # PascalCase names by forwarding to the snake_case ones.
+                if not hasattr(type(algorithm), attribute) and attribute not in vars(algorithm):
+                    continue
+                target = getattr(algorithm, attribute)
+                if not callable(target) and not hasattr(target, "__getitem__"):
+                    continue
+                if hasattr(target, "__getitem__"):
+                    setattr(algorithm, attribute, _TimedIndexer(self, name, target))
+                else:
+                    setattr(algorithm, attribute, self.wrap(name, target))
+        return self
+
+    def ranked(self):
+        """[(path, calls, total ns, own ns, net bytes)], most own time first."""
+        rows = [(path, calls, total, total - children, allocated)
+                for path, (calls, total, children, allocated) in self._stats.items()]
+        return sorted(rows, key=lambda row: row[3], reverse=True)
+
+    def folded(self):
+        """Flamegraph input: one "a;b;c own-microseconds" line per path."""
+        return [f"{';'.join(path)} {own // 1000}" for path, _, _, own, _ in self.ranked() if own >= 1000]
+
+    def summary(self, top=20, width=30):
+        rows = self.ranked()
+        if not rows:
+            return ["callback profile: no wrapped calls"]
+        profiled = sum(total for path, _, total, _, _ in rows if len(path) == 1) or 1
+        calls = sum(row[1] for row in rows)
+        lines = [f"callback profile: {profiled / 1e9:.3f} s in {calls:,} wrapped calls"
+                 + (" (net allocations)" if self.allocations else ""),
+                 f"{'own ms':>10} | {'total ms':>10} | {'calls':>9} | {'mean us':>9} | "
+                 + (f"{'net KiB':>9} | " if self.allocations else "") + "path"]
+        for path, count, total, own, allocated in rows[:top]:
+            line = f"{own / 1e6:>10.1f} | {total / 1e6:>10.1f} | {count:>9,} | {total / count / 1e3:>9.1f} | "
+            if self.allocations:
+                line += f"{allocated / 1024:>9.1f} | "
+            lines.append(line + " > ".join(path))
+
+        lines.append("call tree (share of profiled time):")
+        children = {}
+        for path, count, total, own, _ in rows:
+            children.setdefault(path[:-1], []).append((total, path, count))
+
+        def walk(parent, depth):
+            for total, path, count in sorted(children.get(parent, ()), reverse=True):
+                share = total / profiled
+                bar = "#" * max(1, round(share * width))
+                lines.append(f"{share:>7.1%} {bar:<{width}} {'  ' * depth}{path[-1]} ({count:,} calls)")
+                walk(path, depth + 1)
+
+        walk((), 0)
+        return lines
+
+    def emit(self, write=print, top=20):
+        for line in self.summary(top):
+            write(line)
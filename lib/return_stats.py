@@ -0,0 +1,198 @@
+"""
+Return statistics for many runs at once.
+
+cagr.rb turns one percent return into a CAGR per call. Here every input
+is an array with one entry (or one row) per run, so a whole sweep is
+scored in a handful of NumPy passes:
+
+    cagr([1856.61, 2407.06], "2013-01-02", "2025-06-18")      # fractions, as cagr.rb
+    stats = equity_stats(equity, days)                          # runs x points curves
+    stats = pnl_stats(pnl, days, capital=1_000)                 # runs x trades P&L
+    best = stats.rank("sharpe")[:10]
+
+Each curve is first reduced to its ReturnMoments (end points, span,
+sums of period returns and their squares, max drawdown), and the
+statistics come from the moments alone. Sweep workers reduce their own
+run, so ranking thousands of configs in the parent only touches a few
+numbers per config.
+
+Curves of different lengths are NaN-padded at the end (pad_rows). A
+run's periods are the gaps between its points, whether those are
+sessions or trades; unless periods_per_year is given it is inferred per
+run as periods over years, so daily curves come out near 252. Years are
+calendar days / 365, as in cagr.rb. Volatility, Sharpe and Sortino
+(against a zero target) are annualized from population moments of the
+period returns; the max drawdown is a positive fraction of the running
+peak, like export_analytics. Undefined ratios (a flat run, no drawdown)
+are NaN and rank last.
+"""
+from typing import NamedTuple
+
+import numpy as np
+
+from lib.market_data import to_day_numbers
+
+DAYS_PER_YEAR = 365.0
+CHUNK_RUNS = 1024  # runs scored per pass, bounding the temporaries to a few MB per thousand points
+
+
+class ReturnStats(NamedTuple):
+    cagr: np.ndarray
+    volatility: np.ndarray
+    sharpe: np.ndarray
+    sortino: np.ndarray
+    calmar: np.ndarray
+    max_drawdown: np.ndarray
+
+    def rank(self, by="sharpe", descending=True):
+        """Run indices ordered best first by one statistic (max_drawdown: least first); NaN last."""
+        values = getattr(self, by)
+        if by == "max_drawdown":
+            descending = not descending
+        return np.argsort(-values if descending else values, kind="stable")
+
+    def row(self, i):
+        return {name: float(values[i]) for name, values in zip(self._fields, self)}
+
+
+def _days(dates):
+    """Day numbers (float, so NaN padding passes through) from numbers, 'YYYY-MM-DD' strings or dates."""
+    array = np.asarray(dates)
+    if array.dtype.kind in "iuf":
+        return array.astype(np.float64)
+    if array.dtype.kind == "M":
+        return array.astype("datetime64[D]").astype(np.float64)
+    return to_day_numbers(array.ravel()).reshape(array.shape).astype(np.float64)
+
+
+def _growth_rate(growth, years):
+    with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+        rate = np.where(growth > 0, np.abs(growth) ** (1.0 / years) - 1.0, -1.0)
+    return np.where(years > 0, rate, np.nan)
+
+
+def cagr(percent_return, start, end):
+    """CAGR (a fraction) of total percent returns over start..end, broadcast together."""
+    percent_return = np.asarray(percent_return, dtype=np.float64)
+    years = (_days(end) - _days(start)) / DAYS_PER_YEAR
+    return _growth_rate(1.0 + percent_return / 100.0, years)
+
+
+def pad_rows(rows, fill=np.nan):
+    """Equal-width matrix of 1-D rows of different lengths, padded at the end."""
+    rows = [np.asarray(row) for row in rows]
+    width = max((len(row) for row in rows), default=0)
+    dtype = np.result_type(*(row.dtype for row in rows), np.asarray(fill).dtype) if rows else np.float64
+    matrix = np.full((len(rows), width), fill, dtype=dtype)
+    for i, row in enumerate(rows):
+        matrix[i, :len(row)] = row
+    return matrix
+
+
+class ReturnMoments(NamedTuple):
+    """What the statistics need from each run's curve, one entry per run."""
+
+    first_equity: np.ndarray
+    last_equity: np.ndarray
+    years: np.ndarray
+    periods: np.ndarray
+    return_sum: np.ndarray
+    return_squares: np.ndarray
+    downside_squares: np.ndarray  # squares of the negative period returns
+    max_drawdown: np.ndarray
+
+    def row(self, i):
+        """Run `i`'s moments as a tuple of floats, cheap to pickle back from a worker."""
+        return tuple(float(column[i]) for column in self)
+
+    @classmethod
+    def from_rows(cls, rows):
+        """ReturnMoments of many runs from their row() tuples."""
+        return cls(*np.array(rows, dtype=np.float64).reshape(-1, len(cls._fields)).T)
+
+
+def _block_moments(equity, days):
+    runs = np.arange(len(equity))
+    last = np.maximum(np.count_nonzero(~np.isnan(equity), axis=1) - 1, 0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        returns = equity[:, 1:] / equity[:, :-1] - 1.0
+        returns = np.where(np.isnan(returns), 0.0, returns)
+        downside = np.minimum(returns, 0.0)
+        peak = np.fmax.accumulate(equity, axis=1)
+        drawdown = np.where(np.isnan(equity) | (peak <= 0), 0.0, 1.0 - equity / peak)
+    return (
+        equity[:, 0],
+        equity[runs, last],
+        (days[runs, last] - days[:, 0]) / DAYS_PER_YEAR,
+        last.astype(np.float64),
+        returns.sum(axis=1),
+        np.einsum("ij,ij->i", returns, returns),
+        np.einsum("ij,ij->i", downside, downside),
+        drawdown.max(axis=1),
+    )
+
+
+def curve_moments(equity, days, chunk_runs=CHUNK_RUNS):
+    """
+    ReturnMoments of every row of `equity` (runs x points, NaN-padded at
+    the end). `days` dates the points: one row shared by every run or a
+    matrix like `equity`; day numbers, ISO strings or dates.
+    """
+    equity = np.atleast_2d(np.asarray(equity, dtype=np.float64))
+    days = _days(days)
+    if days.ndim == 1:
+        days = np.broadcast_to(days, equity.shape)
+    if days.shape != equity.shape:
+        raise ValueError(f"days shape {days.shape} does not match equity shape {equity.shape}")
+
+    columns = [np.empty(len(equity)) for _ in ReturnMoments._fields]
+    for start in range(0, len(equity), chunk_runs):
+        block = slice(start, start + chunk_runs)
+        for column, values in zip(columns, _block_moments(equity[block], days[block])):
+            column[block] = values
+    return ReturnMoments(*columns)
+
+
+def pnl_moments(pnl, days, capital, start=None, chunk_runs=CHUNK_RUNS):
+    """
+    curve_moments of `capital` plus the cumulative P&L of each row of `pnl`
+    (runs x trades, NaN-padded), dated by `days`. The curve opens at
+    `capital` on `start` (per run or shared; the first P&L day if None).
+    """
+    pnl = np.atleast_2d(np.asarray(pnl, dtype=np.float64))
+    days = _days(days)
+    if days.ndim == 1:
+        days = np.broadcast_to(days, pnl.shape)
+    opening = days[:, :1] if start is None else np.broadcast_to(_days(start), (len(pnl),))[:, None]
+    capital = np.broadcast_to(np.asarray(capital, dtype=np.float64), (len(pnl),))[:, None]
+    equity = np.hstack([capital, capital + np.cumsum(pnl, axis=1)])
+    # Padded days are never read (the last point is found from the equity), so any value will do.
+    return curve_moments(equity, np.hstack([opening, days]), chunk_runs)
+
+
+def moment_stats(moments, risk_free_rate=0.0, periods_per_year=None):
+    """ReturnStats from ReturnMoments, for every run at once."""
+    m = moments
+    with np.errstate(divide="ignore", invalid="ignore"):
+        growth = np.where(m.first_equity > 0, m.last_equity / m.first_equity, np.nan)
+        rate = np.where(np.isnan(growth), np.nan, _growth_rate(growth, m.years))
+        per_year = m.periods / m.years if periods_per_year is None else np.full(len(m.periods), periods_per_year)
+        mean = m.return_sum / m.periods
+        std = np.sqrt(np.maximum(m.return_squares / m.periods - mean * mean, 0.0))
+        downside = np.sqrt(m.downside_squares / m.periods)
+        scale = np.sqrt(per_year)
+        excess = mean - risk_free_rate / per_year
+        sharpe = np.where(std > 0, excess / std * scale, np.nan)
+        sortino = np.where(downside > 0, excess / downside * scale, np.nan)
+        calmar = np.where(m.max_drawdown > 0, rate / m.max_drawdown, np.nan)
+    return ReturnStats(rate, std * scale, sharpe, sortino, calmar, m.max_drawdown)
+
+
+def equity_stats(equity, days, risk_free_rate=0.0, periods_per_year=None):
+    """ReturnStats of every row of `equity`; see curve_moments for the shapes."""
+    return moment_stats(curve_moments(equity, days), risk_free_rate, periods_per_year)
+
+
+def pnl_stats(pnl, days, capital, start=None, risk_free_rate=0.0, periods_per_year=None):
+    """ReturnStats of `capital` plus each row's cumulative P&L; see pnl_moments."""
+    return moment_stats(pnl_moments(pnl, days, capital, start), risk_free_rate, periods_per_year)
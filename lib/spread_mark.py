@@ -0,0 +1,198 @@
+"""
+Incremental marks for open option spreads.
+
+The 0DTE strategies used to re-derive their exit test every minute: look
+up both legs' holdings and securities, re-read the quotes, recompute the
+spread's price. SpreadMarks instead caches each leg's term of the
+spread's price. A quote for a held leg replaces that leg's term, re-sums
+the spread's few terms (in leg order, so the float matches the old
+formula), re-tests the thresholds, and fires a callback only when one is
+crossed. Quotes for anything else are never looked at: update(slice) asks
+the slice for the tracked legs' quote bars only.
+
+A spread's price is what it costs to close one unit, per share:
+
+    close   shorts bought back at the ask, longs sold at the bid
+            (NickSpxZeroDteV1's "closing debit")
+    mid     every leg at its bid/ask midpoint (what HoldingsValue uses)
+
+and its P&L per share is entry_credit - price. A spread fires stop once
+price >= stop_price, target once price <= target_price; until every leg
+has a usable quote (ask > 0 for shorts, bid >= 0 for longs) it does not
+fire at all. A spread seeded from its entry quotes is first tested on
+the next update(), whether or not new quotes arrive. After firing a
+spread stays quiet unless rearm() is called, e.g. when the closing order
+was rejected; it is then re-tested on the next update() too, so the exit
+is retried on the next bar as the old per-minute check did, not only once
+a leg's quote changes. Untracked spreads never fire.
+"""
+
+CLOSE = "close"
+MID = "mid"
+
+
+class SpreadMark:
+    """One tracked spread. Read `price`, `pnl` and `ready`; do not construct directly."""
+
+    __slots__ = ("legs", "quantities", "entry_credit", "stop_price", "target_price", "on_stop", "on_target",
+                 "mode", "tag", "price", "armed", "_terms", "_missing")
+
+    def __init__(self, legs, entry_credit, stop_price, target_price, on_stop, on_target, mode, tag):
+        self.legs = [symbol for symbol, _ in legs]
+        self.quantities = [quantity for _, quantity in legs]
+        self.entry_credit = entry_credit
+        self.stop_price = stop_price
+        self.target_price = target_price
+        self.on_stop = on_stop
+        self.on_target = on_target
+        self.mode = mode
+        self.tag = tag
+        self.price = 0.0
+        self.armed = True
+        self._terms = [None] * len(legs)  # None until the leg has a usable quote
+        self._missing = len(legs)
+
+    @property
+    def ready(self):
+        return self._missing == 0
+
+    @property
+    def pnl(self):
+        """Per-share P&L of one unit at the current price."""
+        return self.entry_credit - self.price
+
+    def _term(self, quantity, bid, ask):
+        """This leg's share of the closing price, or None if the quote cannot price it."""
+        if self.mode == MID:
+            if bid > 0 and ask > 0:
+                value = (bid + ask) / 2
+            else:
+                value = max(bid, ask, 0.0)
+            return -quantity * value
+        if quantity < 0:
+            return None if ask <= 0 else -quantity * ask
+        return None if bid < 0 else -quantity * bid
+
+    def _quote(self, position, bid, ask):
+        """Replace one leg's term; True when the spread's price may have moved."""
+        term = self._term(self.quantities[position], bid, ask)
+        terms = self._terms
+        old = terms[position]
+        if term == old:
+            return False
+        terms[position] = term
+        if old is None or term is None:
+            self._missing += 1 if term is None else -1
+        if self._missing == 0:
+            price = 0.0
+            for value in terms:
+                price += value
+            self.price = price
+        return True
+
+
+class SpreadMarks:
+    """The strategy's open spreads, indexed by leg symbol."""
+
+    def __init__(self):
+        self._by_symbol = {}  # leg symbol -> [(SpreadMark, leg position)]
+        self.spreads = []
+        self._retest = []  # tested on the next update(): seeded or re-armed
+
+    def track(self, legs, entry_credit, stop_price=None, target_price=None, on_stop=None, on_target=None,
+              mode=CLOSE, tag=None, quotes=None):
+        """
+        Start marking a spread. `legs` is [(symbol, quantity per unit)]
+        (negative for shorts); `quotes`, optional, is [(bid, ask)] per leg
+        to seed the mark with. Seeding never fires a callback; the next
+        update() tests the seeded price.
+        """
+        mark = SpreadMark(legs, float(entry_credit), stop_price, target_price, on_stop, on_target, mode, tag)
+        for position, symbol in enumerate(mark.legs):
+            self._by_symbol.setdefault(symbol, []).append((mark, position))
+            if quotes is not None:
+                mark._quote(position, *quotes[position])
+        self.spreads.append(mark)
+        if quotes is not None:
+            self._retest.append(mark)
+        return mark
+
+    def rearm(self, mark):
+        """Let a fired spread fire again, starting with a test on the next update()."""
+        if mark not in self.spreads:
+            return
+        mark.armed = True
+        if mark not in self._retest:
+            self._retest.append(mark)
+
+    def untrack(self, mark):
+        if mark not in self.spreads:
+            return
+        self.spreads.remove(mark)
+        mark.armed = False
+        if mark in self._retest:
+            self._retest.remove(mark)
+        for symbol in mark.legs:
+            entries = [entry for entry in self._by_symbol.get(symbol, ()) if entry[0] is not mark]
+            if entries:
+                self._by_symbol[symbol] = entries
+            else:
+                self._by_symbol.pop(symbol, None)
+
+    def clear(self):
+        for mark in self.spreads:
+            mark.armed = False
+        self._by_symbol.clear()
+        self.spreads.clear()
+        self._retest.clear()
+
+    def __len__(self):
+        return len(self.spreads)
+
+    def on_quote(self, symbol, bid, ask):
+        """Apply one leg quote; fires at most one callback per affected spread."""
+        for mark in self._apply(symbol, bid, ask):
+            if mark.armed and mark._missing == 0:
+                self._check(mark)
+
+    def update(self, data):
+        """
+        Feed the tracked legs' quote bars from a slice; other symbols are not
+        touched. All of the slice's quotes are applied before any spread is
+        tested, so a spread never fires on a half-updated price.
+        """
+        if not self._by_symbol:
+            return
+        get = data.quote_bars.get
+        touched, self._retest = self._retest, []
+        for symbol, entries in self._by_symbol.items():
+            bar = get(symbol)
+            if bar is None or bar.bid is None or bar.ask is None:
+                continue
+            bid, ask = float(bar.bid.close), float(bar.ask.close)
+            for mark, position in entries:
+                if mark._quote(position, bid, ask) and mark not in touched:
+                    touched.append(mark)
+        for mark in touched:
+            # armed is cleared by firing and by untrack(), so a callback that
+            # closes another spread keeps it from firing too
+            if mark.armed and mark._missing == 0:
+                self._check(mark)
+
+    def _apply(self, symbol, bid, ask):
+        changed = []
+        for mark, position in self._by_symbol.get(symbol, ()):
+            if mark._quote(position, float(bid), float(ask)):
+                changed.append(mark)
+        return changed
+
+    @staticmethod
+    def _check(mark):
+        if mark.stop_price is not None and mark.price >= mark.stop_price:
+            mark.armed = False
+            if mark.on_stop is not None:
+                mark.on_stop(mark)
+        elif mark.target_price is not None and mark.price <= mark.target_price:
+            mark.armed = False
+            if mark.on_target is not None:
+                mark.on_target(mark)
@@ -0,0 +1,211 @@
+"""
+Sorted credit-spread search for the SPXW 0DTE strategies.
+
+NickSpxZeroDteV1.select_spread used to score every contract in the chain
+against every short candidate. SpreadSearch groups the chain by right,
+sorts only the strikes between the short and hedge OTM limits, keeps the
+quotes cheap enough to be hedges, and sweeps them with a two-pointer
+window, so each short is only scored against the hedges between it and
+the OTM limit.
+
+The result is the same pair the nested loop returns, ties included: the
+winner is the lowest score, then the earliest short, then the earliest
+hedge in the original chain order.
+
+best_spread_arrays is the same search over one right's quotes held as
+strike-sorted arrays, for batch replays that never build contract objects.
+"""
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass
+
+import numpy as np
+
+BULL_PUT = "BULL_PUT"
+BEAR_CALL = "BEAR_CALL"
+
+
+@dataclass(frozen=True)
+class SpreadLimits:
+    """Premium and distance limits used to pick a 0DTE credit spread."""
+
+    minimum_short_otm_percent: float = 0.01
+    maximum_hedge_otm_percent: float = 0.03
+    minimum_short_price: float = 0.35
+    maximum_short_price: float = 1.00
+    maximum_hedge_price: float = 0.25
+    minimum_net_credit: float = 0.35
+    maximum_net_credit: float = 0.75
+    short_target_price: float = 0.60
+    hedge_target_price: float = 0.10
+    credit_target: float = 0.50
+
+    @classmethod
+    def from_algorithm(cls, algorithm):
+        """Read the limits from an algorithm exposing the same attribute names."""
+        return cls(**{name: getattr(algorithm, name) for name in cls.__dataclass_fields__})
+
+
+class SpreadSearch:
+    """
+    One chain snapshot, grouped by right.
+
+    Contracts only need `right`, `strike`, `bid_price` and `ask_price`.
+    Build it once per slice and call `best` for each signal; each call
+    sorts only the strikes between the short and hedge OTM limits.
+    """
+
+    def __init__(self, contracts):
+        self._by_right = {}
+        for position, c in enumerate(contracts):
+            self._by_right.setdefault(c.right, []).append((position, c))
+
+    def best(self, right, signal, spot, limits):
+        """Return (short, long, credit) with the lowest score, or None."""
+        bull_put = signal == BULL_PUT
+        if bull_put:
+            short_limit = spot * (1 - limits.minimum_short_otm_percent)
+            hedge_limit = spot * (1 - limits.maximum_hedge_otm_percent)
+            low_strike, high_strike = hedge_limit, short_limit
+        else:
+            short_limit = spot * (1 + limits.minimum_short_otm_percent)
+            hedge_limit = spot * (1 + limits.maximum_hedge_otm_percent)
+            low_strike, high_strike = short_limit, hedge_limit
+
+        # Every short and every hedge lies inside [low_strike, high_strike].
+        rows = sorted(
+            (c.strike, position, c)
+            for position, c in self._by_right.get(right, ())
+            if low_strike <= c.strike <= high_strike
+        )
+        hedges = [
+            (strike, position, c.ask_price, c)
+            for strike, position, c in rows
+            if 0 < c.ask_price <= limits.maximum_hedge_price
+        ]
+        if not hedges:
+            return None
+        strikes = [h[0] for h in hedges]
+
+        minimum_short_price = limits.minimum_short_price
+        maximum_short_price = limits.maximum_short_price
+        minimum_net_credit = limits.minimum_net_credit
+        maximum_net_credit = limits.maximum_net_credit
+        short_target_price = limits.short_target_price
+        hedge_target_price = limits.hedge_target_price
+        credit_target = limits.credit_target
+
+        best = None
+        best_key = None
+
+        if bull_put:
+            # Hedges sit in [hedge_limit, short.strike); the lower edge is
+            # fixed and the upper edge only moves up as the shorts do.
+            low = bisect_left(strikes, hedge_limit)
+            high = low
+            for strike, short_position, short in rows:
+                if not hedge_limit < strike <= short_limit:
+                    continue
+                short_bid = short.bid_price
+                if not minimum_short_price <= short_bid <= maximum_short_price:
+                    continue
+                while high < len(strikes) and strikes[high] < strike:
+                    high += 1
+                best, best_key = self._scan(
+                    hedges, low, high, short, short_position, short_bid,
+                    minimum_net_credit, maximum_net_credit,
+                    short_target_price, hedge_target_price, credit_target,
+                    best, best_key,
+                )
+        else:
+            # Hedges sit in (short.strike, hedge_limit]; the upper edge is
+            # fixed and the lower edge only moves up as the shorts do.
+            high = bisect_right(strikes, hedge_limit)
+            low = 0
+            for strike, short_position, short in rows:
+                if not short_limit <= strike < hedge_limit:
+                    continue
+                short_bid = short.bid_price
+                if not minimum_short_price <= short_bid <= maximum_short_price:
+                    continue
+                while low < high and strikes[low] <= strike:
+                    low += 1
+                best, best_key = self._scan(
+                    hedges, low, high, short, short_position, short_bid,
+                    minimum_net_credit, maximum_net_credit,
+                    short_target_price, hedge_target_price, credit_target,
+                    best, best_key,
+                )
+        return best
+
+    @staticmethod
+    def _scan(hedges, low, high, short, short_position, short_bid,
+              minimum_net_credit, maximum_net_credit,
+              short_target_price, hedge_target_price, credit_target,
+              best, best_key):
+        short_score = abs(short_bid - short_target_price)
+        for i in range(low, high):
+            _, long_position, long_ask, long = hedges[i]
+            credit = short_bid - long_ask
+            if not minimum_net_credit <= credit <= maximum_net_credit:
+                continue
+            # Same operand order as the original scoring so floats agree.
+            score = (
+                short_score
+                + abs(long_ask - hedge_target_price)
+                + abs(credit - credit_target)
+            )
+            key = (score, short_position, long_position)
+            if best_key is None or key < best_key:
+                best_key = key
+                best = (short, long, credit)
+        return best, best_key
+
+
+def select_spread(contracts, right, signal, spot, limits):
+    """Convenience wrapper: sort the chain and return the best spread."""
+    return SpreadSearch(contracts).best(right, signal, spot, limits)
+
+
+def best_spread_arrays(strike, bid, ask, signal, spot, limits):
+    """
+    SpreadSearch.best over one right's chain given as strike-sorted arrays,
+    NaN where a strike has no quote. Returns (short index, long index,
+    credit) or None; ties break as they do for a chain in strike order.
+    """
+    bull_put = signal == BULL_PUT
+    if bull_put:
+        short_limit = spot * (1 - limits.minimum_short_otm_percent)
+        hedge_limit = spot * (1 - limits.maximum_hedge_otm_percent)
+        hedges = (hedge_limit <= strike) & (strike <= short_limit)
+        shorts = (hedge_limit < strike) & (strike <= short_limit)
+    else:
+        short_limit = spot * (1 + limits.minimum_short_otm_percent)
+        hedge_limit = spot * (1 + limits.maximum_hedge_otm_percent)
+        hedges = (short_limit <= strike) & (strike <= hedge_limit)
+        shorts = (short_limit <= strike) & (strike < hedge_limit)
+    hedges &= (0 < ask) & (ask <= limits.maximum_hedge_price)
+    shorts &= (limits.minimum_short_price <= bid) & (bid <= limits.maximum_short_price)
+    short_rows = np.flatnonzero(shorts)
+    hedge_rows = np.flatnonzero(hedges)
+    if not len(short_rows) or not len(hedge_rows):
+        return None
+
+    short_bid = bid[short_rows][:, None]
+    hedge_ask = ask[hedge_rows][None, :]
+    credit = short_bid - hedge_ask
+    if bull_put:
+        valid = strike[hedge_rows][None, :] < strike[short_rows][:, None]
+    else:
+        valid = strike[hedge_rows][None, :] > strike[short_rows][:, None]
+    valid &= (limits.minimum_net_credit <= credit) & (credit <= limits.maximum_net_credit)
+    if not valid.any():
+        return None
+    # Same operand order as SpreadSearch._scan so floats agree; argmin takes
+    # the first minimum in (short, hedge) order.
+    score = (
+        np.abs(short_bid - limits.short_target_price)
+        + np.abs(hedge_ask - limits.hedge_target_price)
+        + np.abs(credit - limits.credit_target)
+    )
+    i, j = np.unravel_index(np.argmin(np.where(valid, score, np.inf)), valid.shape)
+    return int(short_rows[i]), int(hedge_rows[j]), float(credit[i, j])
@@ -0,0 +1,165 @@
+"""
+Multi-core parameter sweeps for the PMCC engine.
+
+The market data is loaded once in the parent and copied into a single
+shared-memory block; pool workers attach to it at start-up and wrap the
+block in read-only NumPy views, so no worker parses a CSV or receives a
+pickled copy of the history. Each task is one PmccConfig and returns only
+its summary row, which the parent streams out as soon as it arrives.
+
+Given a capital, each worker also reduces its run's equity curve to a
+few return moments, and sweep_stats turns every config's moments into
+CAGR, volatility, Sharpe, Sortino, Calmar and max drawdown in one batch
+(see lib.return_stats), so ranking a large grid costs milliseconds.
+"""
+import csv
+import itertools
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, fields, replace
+from functools import partial
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from lib.market_data import MarketData
+from lib.pmcc import PmccConfig, run_pmcc, summarize
+from lib.return_stats import ReturnMoments, moment_stats, pnl_moments
+
+SUMMARY_COLUMNS = ("trades", "win_rate", "avg_pnl", "avg_roi", "median_roi")
+
+_worker_market = None
+_worker_block = None
+
+
+def parameter_grid(base=PmccConfig(), **axes):
+    """
+    Every combination of the given axes applied on top of `base`, any
+    frozen dataclass (PmccConfig by default).
+
+    parameter_grid(days_to_long=[60, 90], short_strike_multiplier=[1.02, 1.03])
+    """
+    known = {f.name for f in fields(base)}
+    unknown = set(axes) - known
+    if unknown:
+        raise ValueError(f"unknown {type(base).__name__} parameters: {', '.join(sorted(unknown))}")
+    names = list(axes)
+    return [replace(base, **dict(zip(names, values))) for values in itertools.product(*axes.values())]
+
+
+class SharedArrays:
+    """Named arrays copied once into shared memory, attachable by name."""
+
+    def __init__(self, arrays):
+        arrays = {name: np.ascontiguousarray(array) for name, array in arrays.items()}
+        size = sum(a.nbytes for a in arrays.values())
+        self.block = shared_memory.SharedMemory(create=True, size=max(size, 1))
+        self.layout = []
+        offset = 0
+        for name, array in arrays.items():
+            view = np.ndarray(array.shape, dtype=array.dtype, buffer=self.block.buf, offset=offset)
+            view[:] = array
+            self.layout.append((name, array.dtype.str, array.shape, offset))
+            offset += array.nbytes
+
+    @property
+    def handle(self):
+        """What a worker needs to attach: the block name and column layout."""
+        return self.block.name, self.layout
+
+    @staticmethod
+    def attach(handle):
+        """Return (block, {name: read-only view}) over the shared block, without copying."""
+        name, layout = handle
+        block = shared_memory.SharedMemory(name=name)
+        arrays = {}
+        for column, dtype, shape, offset in layout:
+            view = np.ndarray(shape, dtype=np.dtype(dtype), buffer=block.buf, offset=offset)
+            view.flags.writeable = False
+            arrays[column] = view
+        return block, arrays
+
+    def close(self):
+        self.block.close()
+        self.block.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class SharedMarketData(SharedArrays):
+    """MarketData copied once into shared memory, attachable by name."""
+
+    def __init__(self, market):
+        super().__init__({f.name: getattr(market, f.name) for f in fields(MarketData)})
+
+    @staticmethod
+    def attach(handle):
+        """Return (block, MarketData) viewing the shared block without copying."""
+        block, columns = SharedArrays.attach(handle)
+        return block, MarketData(**columns)
+
+
+def _attach_worker(handle):
+    global _worker_block, _worker_market
+    # Keep the block referenced for the worker's lifetime; the views borrow it.
+    _worker_block, _worker_market = SharedMarketData.attach(handle)
+
+
+def _run_one(config, capital=None):
+    trades = run_pmcc(_worker_market, config)
+    summary = summarize(trades)
+    if capital is not None:
+        start = trades["date"][0] if len(trades["date"]) else 0
+        summary["moments"] = pnl_moments(trades["pnl"], trades["exit_date"], capital, start=start).row(0)
+    return config, summary
+
+
+def sweep(market, configs, workers=None, chunksize=None, capital=None):
+    """
+    Yield (config, summary) for every config, in the order given, each as
+    soon as its chunk is done.
+
+    workers defaults to every core; chunksize batches configs per task so
+    millisecond-long runs are not dominated by inter-process overhead.
+    With a capital, each summary also carries the "moments" of capital
+    plus the run's trade P&L (booked on exit days), for sweep_stats.
+    """
+    configs = list(configs)
+    workers = workers or os.cpu_count() or 1
+    if chunksize is None:
+        chunksize = max(1, len(configs) // (workers * 8))
+
+    with SharedMarketData(market) as shared:
+        with ProcessPoolExecutor(
+            max_workers=workers, initializer=_attach_worker, initargs=(shared.handle,)
+        ) as pool:
+            yield from pool.map(partial(_run_one, capital=capital), configs, chunksize=chunksize)
+
+
+def sweep_stats(results, risk_free_rate=0.0):
+    """ReturnStats of every (config, summary) from sweep(..., capital=...), one entry per config in order."""
+    moments = ReturnMoments.from_rows([summary["moments"] for _, summary in results])
+    return moment_stats(moments, risk_free_rate)
+
+
+def write_sweep_csv(results, path, parameters=None):
+    """Stream sweep results into one summary CSV; returns all rows."""
+    rows = []
+    with open(path, "w", newline="") as f:
+        writer = None
+        for config, summary in results:
+            params = asdict(config)
+            if parameters is not None:
+                params = {name: params[name] for name in parameters}
+            row = {**params, **{name: summary[name] for name in SUMMARY_COLUMNS}}
+            if writer is None:
+                writer = csv.DictWriter(f, fieldnames=list(row), lineterminator="\n")
+                writer.writeheader()
+            writer.writerow(row)
+            f.flush()
+            rows.append(row)
+    return rows
@@ -0,0 +1,232 @@
+"""
+Synthetic daily option chains from an underlying's closes and a vol index.
+
+The wheel and LEAP strategies (TslaLeapWheelAlgorithm, LeapStrategy,
+BrandonLeapPutPremiumSplit, WheelStrategyTSLA) need full option chains,
+which we only had through the hosted engine. ChainModel describes a
+strike x expiry grid, a volatility surface and a quote spread; the
+generators price that grid for every session, a block of sessions per
+Black-Scholes pass, and yield one ChainDay at a time:
+
+    for chain in market_chains(load_market_data(), ChainModel(), start="2010-01-01"):
+        chain.expiry, chain.right, chain.strike, chain.bid, chain.ask   # one row per contract
+
+    model = ChainModel(vol_scale=2.5, strike_step=10.0)               # TSLA off VIX
+    for chain in csv_chains("path/to/tsla_daily.csv", model): ...
+
+Only one block of sessions is ever in memory, so fifteen years stream in
+a few seconds with flat memory. synthesize_chains.py writes the days out
+as local_engine data for offline backtests.
+
+The grid: `strikes` strikes either side of the at-the-money one,
+`strike_step` apart (or, if None, a 1 / 2.5 / 5 step near
+`step_fraction` of spot); Friday expiries for the next `weeks` weeks and
+third-Friday expiries for the next `months` months. Expiries that fall
+on a market holiday inside the calendar move to the session before, as
+listed options do.
+
+The surface: the vol index (VIX as a decimal) is the 30-day at-the-money
+vol, and at-the-money variance reverts from it to `long_run_vol`**2 at
+`mean_reversion` per year, so term structure is upward sloping in calm
+markets and inverted after a spike. Across strikes,
+
+    iv = atm * (1 + skew * x + smile * x**2),  x = ln(K / F) / (atm * sqrt(t))
+
+with x clipped to +-MONEYNESS_LIMIT; everything is then scaled by
+`vol_scale` (for an underlying more volatile than the index) and clipped
+to [min_vol, max_vol]. Sessions with no index print use `fallback_vol`.
+
+Quotes: the spread is the larger of `min_spread` and `spread_fraction`
+of the model price, centred on it; bids round down and asks up to
+`tick`, and bids never go below zero.
+"""
+from dataclasses import dataclass
+from typing import NamedTuple, Optional
+
+import numpy as np
+
+from lib.market_data import VIX_PATH, align, day_number, read_daily_csv
+from lib.option_math import black_scholes
+from lib.trading_calendar import ROLL_BACK, TradingCalendar
+
+CALL, PUT = 0, 1  # local_engine.data right codes
+DAYS_PER_YEAR = 365.0
+INDEX_DAYS = 30  # tenor of the vol index
+MONEYNESS_LIMIT = 4.0  # standard deviations; keeps the smile from running away in the wings
+BLOCK_DAYS = 32  # sessions priced per pass: ~35 MB of temporaries on the default SPY grid
+
+
+@dataclass(frozen=True)
+class ChainModel:
+    # grid
+    strikes: int = 50
+    strike_step: Optional[float] = None
+    step_fraction: float = 0.01
+    weeks: int = 8
+    months: int = 30
+    # surface
+    risk_free_rate: float = 0.03
+    long_run_vol: float = 0.20
+    mean_reversion: float = 2.0
+    skew: float = -0.10
+    smile: float = 0.015
+    vol_scale: float = 1.0
+    fallback_vol: float = 0.20
+    min_vol: float = 0.05
+    max_vol: float = 3.0
+    # quotes
+    tick: float = 0.01
+    min_spread: float = 0.02
+    spread_fraction: float = 0.04
+
+
+class ChainDay(NamedTuple):
+    """One session's chain: the underlying, then one row per contract by (expiry, right, strike)."""
+
+    day: int  # lib.market_data day number
+    spot: float
+    vol: float  # the vol index the surface was built from, before vol_scale
+    expiry: np.ndarray  # int32 day numbers
+    right: np.ndarray  # int8, CALL or PUT
+    strike: np.ndarray
+    bid: np.ndarray
+    ask: np.ndarray
+    iv: np.ndarray
+    delta: np.ndarray
+
+
+def strike_steps(spot, step_fraction):
+    """The 1 / 2.5 / 5 x 10**n step nearest (in ratio) to `step_fraction` of each spot."""
+    raw = np.asarray(spot, dtype=np.float64) * step_fraction
+    scale = 10.0 ** np.floor(np.log10(raw))
+    ladder = np.array([1.0, 2.5, 5.0, 10.0])
+    nearest = np.abs(np.log(raw / scale)[..., None] - np.log(ladder)).argmin(axis=-1)
+    return ladder[nearest] * scale
+
+
+def expiry_grid(days, weeks, months, calendar=None):
+    """
+    (days x columns) expiry day numbers after each day, ascending, and a
+    mask of the ones to list (duplicates, e.g. a weekly that is also the
+    monthly, are masked out).
+    """
+    days = np.asarray(days, dtype=np.int64)
+    weekday = (days + 3) % 7  # Monday = 0; day 0 was a Thursday
+    friday = days + (4 - weekday) % 7
+    friday = np.where(friday == days, friday + 7, friday)
+    weekly = friday[:, None] + 7 * np.arange(weeks)
+
+    month = days.astype("datetime64[D]").astype("datetime64[M]")
+    firsts = (month[:, None] + np.arange(months + 1)).astype("datetime64[D]").astype(np.int64)
+    third = firsts + (4 - (firsts + 3) % 7) % 7 + 14
+    monthly = np.where((third[:, 0] > days)[:, None], third[:, :months], third[:, 1:])
+
+    expiry = np.hstack([weekly, monthly])
+    if calendar is not None:
+        inside = (expiry >= calendar.first) & (expiry <= calendar.last)
+        rolled = calendar.days[np.maximum(calendar.rows(expiry, ROLL_BACK), 0)]
+        expiry = np.where(inside, rolled, expiry)
+    expiry.sort(axis=1)
+    listed = expiry > days[:, None]
+    listed[:, 1:] &= expiry[:, 1:] != expiry[:, :-1]
+    return expiry, listed
+
+
+def _term_weight(t, speed):
+    """Share of today's variance excess still left, on average, over the next t years."""
+    kt = speed * t
+    return np.where(kt > 1e-8, -np.expm1(-kt) / np.where(kt > 1e-8, kt, 1.0), 1.0)
+
+
+def surface(model, spot, index_vol, t, strike):
+    """Implied vols for broadcast spots, index vols (decimals), years to expiry and strikes."""
+    theta = model.long_run_vol ** 2
+    weight = _term_weight(t, model.mean_reversion) / _term_weight(INDEX_DAYS / DAYS_PER_YEAR, model.mean_reversion)
+    atm = np.sqrt(np.maximum(theta + (index_vol ** 2 - theta) * weight, model.min_vol ** 2))
+    forward = spot * np.exp(model.risk_free_rate * t)
+    x = np.clip(np.log(strike / forward) / (atm * np.sqrt(t)), -MONEYNESS_LIMIT, MONEYNESS_LIMIT)
+    iv = atm * (1.0 + model.skew * x + model.smile * x * x) * model.vol_scale
+    return np.clip(iv, model.min_vol, model.max_vol)
+
+
+def quote(model, price):
+    """(bid, ask) around model prices: the spread model, rounded outwards to the tick."""
+    half = 0.5 * np.maximum(model.min_spread, model.spread_fraction * price)
+    # The epsilon keeps prices already on a tick from being pushed a tick out by float error.
+    bid = np.maximum(np.floor((price - half) / model.tick + 1e-9), 0.0)
+    ask = np.maximum(np.ceil((price + half) / model.tick - 1e-9), 1.0)
+    return np.round(bid * model.tick, 10), np.round(ask * model.tick, 10)
+
+
+def _price_block(model, days, spot, index_vol, calendar):
+    """Every contract of a block of sessions, as flat columns grouped by day, and each day's row offsets."""
+    expiry, listed = expiry_grid(days, model.weeks, model.months, calendar)
+    day_of_pair, column = np.nonzero(listed)  # row-major: by day, then expiry
+    pair_expiry = expiry[day_of_pair, column]
+
+    step = np.full(len(days), model.strike_step) if model.strike_step else strike_steps(spot, model.step_fraction)
+    at_the_money = np.round(spot / step) * step
+    strike = at_the_money[:, None] + step[:, None] * np.arange(-model.strikes, model.strikes + 1)
+    strike = strike[day_of_pair]  # pairs x strikes
+
+    s = spot[day_of_pair, None]
+    t = ((pair_expiry - days[day_of_pair]) / DAYS_PER_YEAR)[:, None]
+    live = strike > 0
+    strike = np.where(live, strike, s)  # priced, then dropped
+    iv = surface(model, s, index_vol[day_of_pair, None], t, strike)
+    values = black_scholes(s, strike, t, model.risk_free_rate, iv)
+
+    # pairs x right x strikes, so flattening orders each day by (expiry, right, strike).
+    shape = (len(pair_expiry), 2, strike.shape[1])
+    keep = np.broadcast_to(live[:, None, :], shape).ravel()
+    price = np.stack([values.call, values.put], axis=1).ravel()[keep]
+    bid, ask = quote(model, price)
+    columns = {
+        "expiry": np.broadcast_to(pair_expiry[:, None, None], shape).ravel()[keep].astype(np.int32),
+        "right": np.broadcast_to(np.array([CALL, PUT], dtype=np.int8)[:, None], shape).ravel()[keep],
+        "strike": np.broadcast_to(strike[:, None, :], shape).ravel()[keep],
+        "bid": bid,
+        "ask": ask,
+        "iv": np.broadcast_to(iv[:, None, :], shape).ravel()[keep],
+        "delta": np.stack([values.call_delta, values.put_delta], axis=1).ravel()[keep],
+    }
+    rows_per_day = np.bincount(day_of_pair, weights=live.sum(axis=1) * 2, minlength=len(days)).astype(np.int64)
+    return columns, np.concatenate(([0], np.cumsum(rows_per_day)))
+
+
+def synthesize(dates, spot, index_vol, model=ChainModel(), start=None, end=None, block_days=BLOCK_DAYS):
+    """
+    Yield a ChainDay for every session of `dates` (sorted day numbers) in
+    [start, end], priced off `spot` closes and `index_vol` (decimals, NaN
+    for no print) on the same rows.
+    """
+    dates = np.asarray(dates, dtype=np.int64)
+    spot = np.asarray(spot, dtype=np.float64)
+    index_vol = np.asarray(index_vol, dtype=np.float64)
+    index_vol = np.where(np.isnan(index_vol), model.fallback_vol, index_vol)
+    calendar = TradingCalendar(dates)
+
+    first = 0 if start is None else int(np.searchsorted(dates, day_number(start)))
+    last = len(dates) if end is None else int(np.searchsorted(dates, day_number(end), side="right"))
+    for block_start in range(first, last, block_days):
+        block = slice(block_start, min(block_start + block_days, last))
+        days, closes, vols = dates[block], spot[block], index_vol[block]
+        columns, offsets = _price_block(model, days, closes, vols, calendar)
+        for i, day in enumerate(days):
+            rows = slice(offsets[i], offsets[i + 1])
+            yield ChainDay(int(day), float(closes[i]), float(vols[i]),
+                           **{name: values[rows] for name, values in columns.items()})
+
+
+def market_chains(market, model=ChainModel(), start=None, end=None, block_days=BLOCK_DAYS):
+    """synthesize() over lib.market_data.MarketData: SPY closes and the VIX."""
+    return synthesize(market.dates, market.close, market.vix, model, start, end, block_days)
+
+
+def csv_chains(path, model=ChainModel(), start=None, end=None, column="close", vol_path=VIX_PATH,
+               vol_column="vix", block_days=BLOCK_DAYS, cache=True):
+    """synthesize() over any dated CSV's `column`, with a vol index CSV (in points, like the VIX)."""
+    dates, values = read_daily_csv(path, (column,), cache)
+    vol_dates, vol = read_daily_csv(vol_path, (vol_column,), cache)
+    return synthesize(dates, values[column], align(dates, vol_dates, vol[vol_column] / 100.0),
+                      model, start, end, block_days)
@@ -0,0 +1,165 @@
+"""
+Trade journal: typed records in columnar buffers, formatted only on demand.
+
+The strategies used to build a log line for every fill, stop, assignment
+and expiry as it happened, formatting a dozen numbers whether or not the
+line was ever read. A TradeJournal instead stores each event's numbers in
+preallocated NumPy columns (one set per record kind, doubled when full)
+and keeps the text template for later:
+
+    journal = TradeJournal()
+    OPENED = journal.kind(
+        "open", ("spx", "credit"), "OPEN | {time:%Y-%m-%d %H:%M} | {tag} | SPX {spx:.2f} | NET {credit:.2f}",
+    )
+    journal.record(OPENED, self.time, spx, credit, tag="BULL_PUT")   # fields in declared order
+    ...
+    journal.emit(self.log)          # all records as text, in recording order
+    journal.to_csv(path)            # or journal.save(path) for a .npz
+
+Every record has a time, a kind and a free-text tag; numeric fields are
+float64 and fields named in `objects` hold anything (symbols, dates).
+Pure Python and NumPy, so it runs on QuantConnect and on local_engine
+alike; on QuantConnect, where files cannot be written, csv_text() gives
+the same CSV for the ObjectStore.
+"""
+import csv
+import io
+
+import numpy as np
+
+INITIAL_CAPACITY = 64
+
+# Record kind names shared by the strategies, so journals read alike.
+OPEN = "open"
+CLOSE = "close"
+FILL = "fill"
+STOP = "stop"
+ASSIGN = "assign"
+EXPIRE = "expire"
+
+
+class RecordKind:
+    """One record schema and its columns; create with TradeJournal.kind()."""
+
+    def __init__(self, name, fields, text, objects, capacity):
+        self.name = name
+        self.fields = tuple(fields)
+        self.text = text
+        self.objects = frozenset(objects)
+        self.count = 0
+        self.sequence = np.empty(capacity, dtype=np.int64)  # journal-wide recording order
+        self.time = np.empty(capacity, dtype=object)
+        self.tag = np.empty(capacity, dtype=object)
+        self.columns = [np.empty(capacity, dtype=object if name in self.objects else np.float64)
+                        for name in self.fields]
+
+    def _grow(self):
+        size = 2 * len(self.time)
+        for name in ("sequence", "time", "tag"):
+            column = getattr(self, name)
+            grown = np.empty(size, dtype=column.dtype)
+            grown[:self.count] = column[:self.count]
+            setattr(self, name, grown)
+        for i, column in enumerate(self.columns):
+            grown = np.empty(size, dtype=column.dtype)
+            grown[:self.count] = column[:self.count]
+            self.columns[i] = grown
+
+    def row(self, i):
+        """Record `i` as a dict of time, tag and fields."""
+        values = {"time": self.time[i], "tag": self.tag[i]}
+        for name, column in zip(self.fields, self.columns):
+            value = column[i]
+            values[name] = value if name in self.objects else float(value)
+        return values
+
+    def format(self, i):
+        return self.text.format(**self.row(i))
+
+    def __len__(self):
+        return self.count
+
+
+class TradeJournal:
+    def __init__(self, capacity=INITIAL_CAPACITY):
+        self.capacity = capacity
+        self.kinds = {}
+        self._sequence = 0
+
+    def kind(self, name, fields, text, objects=()):
+        """Declare a record kind; returns the handle record() takes."""
+        if name in self.kinds:
+            raise ValueError(f"record kind {name!r} is already declared")
+        kind = self.kinds[name] = RecordKind(name, fields, text, objects, self.capacity)
+        return kind
+
+    def record(self, kind, time, *values, tag=""):
+        """Append one record; `values` are the kind's fields in declared order."""
+        if len(values) != len(kind.columns):
+            raise ValueError(f"{kind.name} records take {len(kind.columns)} fields, got {len(values)}")
+        i = kind.count
+        if i == len(kind.time):
+            kind._grow()
+        kind.sequence[i] = self._sequence
+        kind.time[i] = time
+        kind.tag[i] = tag
+        for column, value in zip(kind.columns, values):
+            column[i] = value
+        kind.count = i + 1
+        self._sequence += 1
+
+    def __len__(self):
+        return self._sequence
+
+    def count(self, name):
+        kind = self.kinds.get(name)
+        return 0 if kind is None else kind.count
+
+    def _ordered(self):
+        """(kind, row) of every record in recording order."""
+        entries = [(kind.sequence[i], kind, i) for kind in self.kinds.values() for i in range(kind.count)]
+        entries.sort(key=lambda entry: entry[0])
+        return [(kind, i) for _, kind, i in entries]
+
+    def lines(self, name=None):
+        """Text of the records (of one kind, if named), formatted now."""
+        return [kind.format(i) for kind, i in self._ordered() if name is None or kind.name == name]
+
+    def emit(self, write, name=None):
+        for line in self.lines(name):
+            write(line)
+
+    def rows(self):
+        """Every record as a dict with its kind, in recording order."""
+        return [{"kind": kind.name, **kind.row(i)} for kind, i in self._ordered()]
+
+    def _header(self):
+        fields = [name for kind in self.kinds.values() for name in kind.fields]
+        return ["time", "kind", "tag", *dict.fromkeys(fields)]
+
+    def write_csv(self, handle):
+        writer = csv.DictWriter(handle, self._header())
+        writer.writeheader()
+        writer.writerows(self.rows())
+
+    def csv_text(self):
+        handle = io.StringIO()
+        self.write_csv(handle)
+        return handle.getvalue()
+
+    def to_csv(self, path):
+        with open(path, "w", newline="") as handle:
+            self.write_csv(handle)
+
+    def save(self, path):
+        """Columns of every kind to one .npz, keyed "<kind>.<column>"."""
+        arrays = {}
+        for kind in self.kinds.values():
+            n = kind.count
+            arrays[f"{kind.name}.sequence"] = kind.sequence[:n]
+            arrays[f"{kind.name}.time"] = np.array([str(t) for t in kind.time[:n]])
+            arrays[f"{kind.name}.tag"] = np.array([str(t) for t in kind.tag[:n]])
+            for name, column in zip(kind.fields, kind.columns):
+                values = column[:n]
+                arrays[f"{kind.name}.{name}"] = np.array([str(v) for v in values]) if name in kind.objects else values
+        np.savez(path, **arrays)
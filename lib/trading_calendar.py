@@ -0,0 +1,85 @@
+"""
+Trading-calendar index for "N calendar days later" lookups.
+
+For every calendar day between the first and last trading day the index
+stores the row of the next and of the previous trading day, so moving a
+date by N calendar days and landing on a trading row is a single array
+read, whatever the weekends and holidays in between.
+
+Landing on a non-trading day is resolved by a policy:
+    SKIP          no row (-1), the old pmcc_backtest.rb behavior
+    ROLL_FORWARD  the next trading day
+    ROLL_BACK     the previous trading day
+"""
+import numpy as np
+
+SKIP = "skip"
+ROLL_FORWARD = "forward"
+ROLL_BACK = "back"
+POLICIES = (SKIP, ROLL_FORWARD, ROLL_BACK)
+
+
+class TradingCalendar:
+    """Index over sorted, unique trading day numbers (see lib.market_data)."""
+
+    def __init__(self, trading_days):
+        days = np.asarray(trading_days, dtype=np.int64)
+        if len(days) == 0:
+            raise ValueError("a trading calendar needs at least one trading day")
+        if np.any(np.diff(days) <= 0):
+            raise ValueError("trading days must be sorted and unique")
+        self.days = days
+        self.first = int(days[0])
+        self.last = int(days[-1])
+
+        span = self.last - self.first + 1
+        is_trading = np.zeros(span, dtype=bool)
+        is_trading[days - self.first] = True
+        rows = np.cumsum(is_trading) - 1  # row of the last trading day <= day
+
+        self.is_trading = is_trading
+        self.prev_row = rows
+        self.next_row = np.where(is_trading, rows, rows + 1)
+
+    def __len__(self):
+        return len(self.days)
+
+    def rows(self, day_numbers, policy=SKIP):
+        """Trading row for each day number under `policy`; -1 when there is none."""
+        if policy not in POLICIES:
+            raise ValueError(f"unknown calendar policy {policy!r}; expected one of {POLICIES}")
+        day_numbers = np.asarray(day_numbers, dtype=np.int64)
+        inside = (day_numbers >= self.first) & (day_numbers <= self.last)
+        offset = np.where(inside, day_numbers - self.first, 0)
+
+        if policy == SKIP:
+            rows = np.where(self.is_trading[offset], self.prev_row[offset], -1)
+        elif policy == ROLL_FORWARD:
+            rows = self.next_row[offset]
+        else:
+            rows = self.prev_row[offset]
+
+        # Before the first day only rolling forward lands on a row (row 0);
+        # after the last day only rolling back does (the last row).
+        rows = np.where(inside, rows, -1)
+        if policy == ROLL_FORWARD:
+            rows = np.where(day_numbers < self.first, 0, rows)
+        elif policy == ROLL_BACK:
+            rows = np.where(day_numbers > self.last, len(self.days) - 1, rows)
+        return rows
+
+    def offset_rows(self, rows, calendar_days, policy=SKIP):
+        """Row `calendar_days` after (or before, if negative) each given row."""
+        rows = np.asarray(rows, dtype=np.int64)
+        return self.rows(self.days[rows] + calendar_days, policy)
+
+    def trading_days_between(self, start_days, end_days):
+        """Trading days in (start, end], e.g. sessions left until an expiry."""
+        return self._count_through(end_days) - self._count_through(start_days)
+
+    def _count_through(self, day_numbers):
+        """Trading days on or before each day number."""
+        day_numbers = np.asarray(day_numbers, dtype=np.int64)
+        clipped = np.clip(day_numbers, self.first, self.last) - self.first
+        count = self.prev_row[clipped] + 1
+        return np.where(day_numbers < self.first, 0, count)
@@ -0,0 +1,138 @@
+"""
+Walk-forward selection over a precomputed results matrix.
+
+Every parameter set is evaluated once over the whole period, giving a
+(configs x days) matrix of daily P&L; a fold then only sums columns. Each
+fold picks the set with the best in-sample objective on its training
+months and scores it on the test months that follow; the folds roll
+forward by the test length, so the test windows tile the period:
+
+    fold 0   train 2020-01..2020-12   test 2021-01..2021-03
+    fold 1   train 2020-04..2021-03   test 2021-04..2021-06
+    ...
+
+stability() then reports how consistently each parameter was chosen.
+"""
+from collections import Counter
+from dataclasses import asdict, dataclass
+
+import numpy as np
+
+
+@dataclass(frozen=True)
+class Fold:
+    index: int
+    train_start: int  # day numbers; starts inclusive, ends exclusive
+    train_end: int
+    test_start: int
+    test_end: int
+
+
+@dataclass(frozen=True)
+class FoldResult:
+    fold: Fold
+    chosen: int  # row of the chosen config
+    train_score: float
+    train_pnl: float
+    test_pnl: float
+    test_trades: int
+    test_win_rate: float
+    test_percentile: float  # share of configs the chosen one beat out of sample
+    best_test_pnl: float  # hindsight optimum of the test window
+
+
+def _month_start(month):
+    return int(np.datetime64(month, "D").astype(np.int64))
+
+
+def monthly_folds(days, train_months=12, test_months=3):
+    """Rolling folds over the months spanned by `days` (lib.market_data day numbers)."""
+    if not len(days):
+        return []
+    months = np.asarray(days, dtype=np.int64).astype("datetime64[D]").astype("datetime64[M]")
+    first, last = months.min(), months.max()
+    folds = []
+    start = first
+    while start + train_months <= last:
+        test_start = start + train_months
+        folds.append(Fold(
+            len(folds), _month_start(start), _month_start(test_start),
+            _month_start(test_start), _month_start(test_start + test_months),
+        ))
+        start = start + test_months
+    return folds
+
+
+def total_pnl(pnl):
+    return pnl.sum(axis=1)
+
+
+def sharpe(pnl):
+    """Mean over standard deviation of the daily P&L (signal days only); 0 when flat."""
+    std = pnl.std(axis=1)
+    return np.where(std > 0, pnl.mean(axis=1) / np.where(std > 0, std, 1), 0.0)
+
+
+OBJECTIVES = {"pnl": total_pnl, "sharpe": sharpe}
+
+
+def walk_forward(pnl, days, folds, objective="pnl", traded=None):
+    """
+    FoldResult for each fold. pnl is (configs x days); `traded` is an
+    optional same-shape bool matrix of days with a position, else any
+    non-zero P&L counts as a trade.
+    """
+    pnl = np.asarray(pnl)
+    days = np.asarray(days)
+    traded = pnl != 0 if traded is None else np.asarray(traded)
+    score = OBJECTIVES[objective]
+    results = []
+    for fold in folds:
+        train = (days >= fold.train_start) & (days < fold.train_end)
+        test = (days >= fold.test_start) & (days < fold.test_end)
+        if not train.any():
+            continue
+        train_scores = score(pnl[:, train])
+        chosen = int(np.argmax(train_scores))
+        test_totals = pnl[:, test].sum(axis=1)
+        trades = int(traded[chosen, test].sum())
+        wins = int(((pnl[chosen, test] > 0) & traded[chosen, test]).sum())
+        results.append(FoldResult(
+            fold=fold,
+            chosen=chosen,
+            train_score=float(train_scores[chosen]),
+            train_pnl=float(pnl[chosen, train].sum()),
+            test_pnl=float(test_totals[chosen]),
+            test_trades=trades,
+            test_win_rate=100.0 * wins / trades if trades else 0.0,
+            test_percentile=float((test_totals < test_totals[chosen]).mean()) if len(test_totals) else 0.0,
+            best_test_pnl=float(test_totals.max()) if test.any() else 0.0,
+        ))
+    return results
+
+
+def stability(configs, results, parameters):
+    """
+    {parameter: (values chosen fold by fold, most common value, share of
+    folds that chose it)} for each named parameter.
+    """
+    report = {}
+    for name in parameters:
+        chosen = [getattr(configs[r.chosen], name) for r in results]
+        if not chosen:
+            continue
+        value, count = Counter(chosen).most_common(1)[0]
+        report[name] = (chosen, value, count / len(chosen))
+    return report
+
+
+def fold_rows(configs, results, parameters):
+    """One flat dict per fold (dates, chosen parameters, in/out-of-sample results) for CSV output."""
+    rows = []
+    for r in results:
+        params = asdict(configs[r.chosen])
+        row = {key: str(np.datetime64(value, "D")) for key, value in asdict(r.fold).items() if key != "index"}
+        row = {"fold": r.fold.index, **row, **{name: params[name] for name in parameters}}
+        row.update({key: value for key, value in asdict(r).items() if key not in ("fold", "chosen")})
+        rows.append(row)
+    return rows
@@ -0,0 +1,90 @@
+"""
+Wheel state machine that sleeps through bars that cannot change anything.
+
+The TSLA LEAP wheel used to reconcile positions and recompute its state
+on every bar, although once a put or call is sold nothing can happen
+until it expires or is assigned, which on a daily LEAP wheel is most
+days. WheelState keeps the wheel's state (CASH, SHORT_PUT, LONG_STOCK,
+COVERED_CALL) and the conditions that can end a quiet spell; due() is
+the per-bar fast path:
+
+    self.wheel = WheelState()
+    ...
+    def OnData(self, data):
+        if not self.wheel.due(self.Time.date(), price):
+            return                                    # nothing can have changed
+        ...                                           # full reconcile and decision
+        self.wheel.enter(SHORT_PUT)
+        self.wheel.sleep(until=contract.Expiry.date(), below=contract.Strike)
+
+    def OnOrderEvent(self, order_event):
+        if <assignment>:
+            self.wheel.wake()
+
+A sleeping wheel wakes on the first bar dated on or after `until`, priced
+at or below `below` or at or above `above` (a strike touch), or after
+wake() (an assignment or any other event the strategy sees first). It
+then stays awake, answering every bar, until the strategy sleeps it
+again; a strategy that is waiting to trade simply never sleeps.
+"""
+
+CASH = "CASH"
+SHORT_PUT = "SHORT_PUT"
+LONG_STOCK = "LONG_STOCK"
+COVERED_CALL = "COVERED_CALL"
+STATES = (CASH, SHORT_PUT, LONG_STOCK, COVERED_CALL)
+
+
+def wheel_state(has_shares, has_short_put, has_short_call):
+    """The state a portfolio is in: shares first, then a short put; anything else is cash."""
+    if has_shares:
+        return COVERED_CALL if has_short_call else LONG_STOCK
+    return SHORT_PUT if has_short_put else CASH
+
+
+class WheelState:
+    """One wheel's state, its wake-up conditions and counts of bars handled and skipped."""
+
+    def __init__(self, state=None):
+        self.state = state  # None until the first enter()
+        self.transitions = 0
+        self.handled = 0  # bars due() let through
+        self.skipped = 0  # bars due() answered "nothing to do" for
+        self.awake = True
+        self.until = None
+        self.below = None
+        self.above = None
+
+    def enter(self, state):
+        """Move to `state`; True if that is a change (the first enter() always is)."""
+        if state not in STATES:
+            raise ValueError(f"unknown wheel state {state!r}")
+        if state == self.state:
+            return False
+        self.state = state
+        self.transitions += 1
+        return True
+
+    def sleep(self, until=None, below=None, above=None):
+        """Skip bars until the date `until`, a price at or below `below` / at or above `above`, or wake()."""
+        self.awake = False
+        self.until = until
+        self.below = below
+        self.above = above
+
+    def wake(self):
+        self.awake = True
+        self.until = self.below = self.above = None
+
+    def due(self, day, price=None):
+        """True if this bar (dated `day`, priced `price`) needs the full pass; wakes the wheel if so."""
+        if not self.awake:
+            if ((self.until is not None and day >= self.until)
+                    or (price is not None and ((self.below is not None and price <= self.below)
+                                               or (self.above is not None and price >= self.above)))):
+                self.wake()
+            else:
+                self.skipped += 1
+                return False
+        self.handled += 1
+        return True
@@ -0,0 +1,465 @@
+"""
+Precomputed SPXW 0DTE sessions for batch replays of NickSpxZeroDteV1.
+
+Tuning the premium limits by full event replays re-reads every chain and
+re-derives every signal for each parameter set, although neither depends
+on the limits. SessionSnapshots.build does that work once: it scans the
+gap-reversal signals (lib.gap_reversal) and, for every signal day, keeps
+only what the limits can touch:
+
+    per minute from the signal to the close
+        signal_price   the SPX price the strategy would size the spread
+                       from (NaN outside the entry window)
+        has_chain      whether a chain arrives that minute
+        has_data       whether on_data runs that minute
+        spot           the SPX price, carried forward
+    per strike         today's strikes of the signal's right within
+                       strike_band of the signal prices
+    per minute x strike
+        bid, ask       that minute's quote, NaN where there is none
+
+evaluate() then replays one ZeroDteParameters on those arrays with the
+strategy's rules: the first entry minute with a valid spread
+(best_spread_arrays, the same pick as SpreadSearch), the stop on the
+closing debit (short ask - long bid, quotes carried forward), the 3:45 PM
+close of an ITM short, and cash settlement at the last SPX price.
+
+That stop is tested at minute closes, as the strategy does. Built with
+intrabar=True, the snapshots also keep each minute's SPX open/high/low and
+the implied volatility of every quote (one batched solve), and
+fills=INTRABAR instead fills the stop where lib.intrabar's reconstructed
+path first crosses it: inside the bar, at the stop price, or at the bar's
+open when it gapped through.
+
+A day costs one small matrix search plus a few vector scans, so thousands
+of parameter sets are cheap; evaluate_grid spreads them over a process
+pool that shares the arrays through lib.sweep.SharedArrays.
+
+The option filter's strikes(-200, 200) window is assumed wider than
+strike_band, as it is for 5-point SPXW strikes.
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from datetime import timedelta
+from typing import NamedTuple
+
+import numpy as np
+
+from lib.gap_reversal import BULL_PUT_CODE, GapReversalRules, resample, scan
+from lib.intrabar import MINUTES_PER_YEAR, bar_paths, closing_costs, first_crossing, node_years, quote_vols
+from lib.market_data import to_dates
+from lib.spread_search import BEAR_CALL, BULL_PUT, SpreadLimits, best_spread_arrays
+from lib.sweep import SharedArrays
+
+MULTIPLIER = 100
+CHECK_MINUTE = 15 * 60 + 45  # check_spread_before_close
+CLOSE_MINUTE = 16 * 60
+PUT = 1  # OptionRight.PUT
+
+NO_TRADE = 0
+EXPIRED = 1
+STOPPED = 2
+CLOSED_ITM = 3
+EXIT_NAMES = {NO_TRADE: "no trade", EXPIRED: "expired", STOPPED: "stopped", CLOSED_ITM: "closed ITM"}
+
+MINUTE = "minute"  # stop tested at minute closes, like the strategy
+INTRABAR = "intrabar"  # stop filled on the reconstructed intrabar path
+
+DAY_COLUMNS = ("day", "direction", "first_minute", "minute_offset", "minute_count",
+               "strike_offset", "strike_count", "quote_offset", "settlement")
+MINUTE_COLUMNS = ("signal_price", "has_chain", "has_data", "spot")
+BAR_COLUMNS = ("open", "high", "low")  # intrabar snapshots only; NaN without a bar
+
+_worker_sessions = None
+_worker_block = None
+_bar_highs = {}  # the day's pick -> (highest debit of each bar after entry, {bar: node debits})
+BAR_HIGH_CACHE = 50_000
+
+
+@dataclass(frozen=True)
+class ZeroDteParameters(SpreadLimits):
+    """SpreadLimits plus the stop multiple: every tunable limit of NickSpxZeroDteV1."""
+
+    stop_loss_multiple: float = 100.0
+
+
+class Session(NamedTuple):
+    """One signal day, as views into SessionSnapshots' arrays."""
+
+    day: int
+    signal: str
+    first_minute: int
+    entry_rows: np.ndarray  # minute rows where an entry can be tried
+    signal_price: np.ndarray
+    has_data: np.ndarray
+    spot: np.ndarray
+    strike: np.ndarray
+    bid: np.ndarray  # minutes x strikes
+    ask: np.ndarray
+    settlement: float
+    open: np.ndarray = None  # intrabar snapshots only
+    high: np.ndarray = None
+    low: np.ndarray = None
+    iv: np.ndarray = None  # minutes x strikes, implied by each quote's mid
+
+
+class Outcomes(NamedTuple):
+    pnl: np.ndarray  # dollars per session
+    exit: np.ndarray  # NO_TRADE, EXPIRED, STOPPED or CLOSED_ITM
+
+
+def _carried_forward(column):
+    """NaN-free copy of `column` (whose first value is set), repeating the last quote."""
+    present = ~np.isnan(column)
+    if present.all():
+        return column
+    return column[np.maximum.accumulate(np.where(present, np.arange(len(column)), 0))]
+
+
+class SessionSnapshots:
+    """Flat arrays for every signal day; see the module docstring."""
+
+    def __init__(self, arrays):
+        self.arrays = arrays
+        self.days = arrays["day"]
+
+    def __len__(self):
+        return len(self.days)
+
+    @property
+    def nbytes(self):
+        return sum(a.nbytes for a in self.arrays.values())
+
+    @classmethod
+    def build(cls, root, start=None, end=None, rules=GapReversalRules(), calendar=None, strike_band=0.05,
+              underlying="SPX", option_ticker="SPXW", intrabar=False):
+        """
+        Scan `underlying`'s minute files under `root` for signals between
+        `start` and `end` and snapshot `option_ticker`'s 0DTE chain on each
+        signal day. strike_band should cover the widest
+        maximum_hedge_otm_percent to be tested; intrabar=True adds what
+        fills=INTRABAR needs.
+        """
+        from local_engine import data  # the local minute-file layout
+
+        # A week of history before `start` supplies the first gap reference.
+        history = data.load_minute_history(root, underlying, start and start - timedelta(days=7), end)
+        columns = [history[name] for name in ("day", "minute", "open", "high", "low", "close")]
+        signals = scan(*columns, rules=rules, calendar=calendar)
+        candles = resample(*columns, rules.bar_minutes)
+        day_rows = np.searchsorted(history["day"], np.append(signals.day, signals.day + 1))
+        candle_rows = np.searchsorted(candles.day, np.append(signals.day, signals.day + 1))
+        count = len(signals.day)
+
+        days, minutes, strikes, quotes = [], [], [], []
+        minute_offset = strike_offset = quote_offset = 0
+        for i in range(count):
+            day_number = int(signals.day[i])
+            day = to_dates(day_number).item()
+            if start is not None and day < start:
+                continue
+            chain = data.load_option_quotes(root, option_ticker, day)
+            if chain is None:
+                continue
+            first = int(signals.minute[i])
+            grid = np.arange(first, CLOSE_MINUTE + 1)
+
+            # Underlying price and bar minutes.
+            bars = slice(day_rows[i], day_rows[i + count])
+            bar_minute = history["minute"][bars].astype(np.int64)
+            bar_close = history["close"][bars]
+            at = np.searchsorted(bar_minute, grid, side="right") - 1
+            spot = np.where(at >= 0, bar_close[np.maximum(at, 0)], 0.0)
+            has_bar = np.zeros(len(grid), dtype=bool)
+            inside = (bar_minute >= first) & (bar_minute <= CLOSE_MINUTE)
+            has_bar[bar_minute[inside] - first] = True
+            bar_values = np.full((len(BAR_COLUMNS), len(grid)), np.nan)
+            for j, name in enumerate(BAR_COLUMNS):
+                bar_values[j, bar_minute[inside] - first] = history[name][bars][inside]
+
+            # The price the pending signal carries: the close of the latest
+            # candle, from the signal candle until the signal lapses.
+            day_candles = slice(candle_rows[i], candle_rows[i + count])
+            candle_end = candles.minute[day_candles]
+            candle_close = candles.close[day_candles]
+            live = (candle_end >= first) & (candle_end < signals.until[i])
+            candle_end, candle_close = candle_end[live], candle_close[live]
+            latest = np.searchsorted(candle_end, grid, side="right") - 1
+            signal_price = np.where((grid < signals.until[i]) & (latest >= 0),
+                                    candle_close[np.maximum(latest, 0)], np.nan)
+
+            has_chain = np.diff(chain.minute_groups)[grid] > 0
+            put = signals.direction[i] == BULL_PUT_CODE
+            low = np.nanmin(signal_price)
+            high = np.nanmax(signal_price)
+            low, high = (low * (1 - strike_band), high) if put else (low, high * (1 + strike_band))
+            rows = np.flatnonzero(
+                (chain.expiry == day_number) & (chain.right == (PUT if put else 0))
+                & (chain.minute >= first) & (chain.minute <= CLOSE_MINUTE)
+                & (chain.strike >= low) & (chain.strike <= high)
+            )
+            day_strikes = np.unique(chain.strike[rows])
+            bid = np.full((len(grid), len(day_strikes)), np.nan)
+            ask = np.full((len(grid), len(day_strikes)), np.nan)
+            t = chain.minute[rows].astype(np.int64) - first
+            k = np.searchsorted(day_strikes, chain.strike[rows])
+            bid[t, k] = chain.bid[rows]
+            ask[t, k] = chain.ask[rows]
+
+            days.append((day_number, int(signals.direction[i]), first, minute_offset, len(grid),
+                         strike_offset, len(day_strikes), quote_offset, float(spot[-1])))
+            minutes.append((signal_price, has_chain, has_bar | has_chain, spot, *bar_values))
+            strikes.append(day_strikes)
+            quotes.append((bid.ravel(), ask.ravel()))
+            minute_offset += len(grid)
+            strike_offset += len(day_strikes)
+            quote_offset += bid.size
+
+        table = np.array(days, dtype=np.float64).reshape(-1, len(DAY_COLUMNS))
+        arrays = {name: table[:, j].astype(np.float64 if name == "settlement" else np.int64)
+                  for j, name in enumerate(DAY_COLUMNS)}
+        for j, name in enumerate(MINUTE_COLUMNS + (BAR_COLUMNS if intrabar else ())):
+            arrays[name] = np.concatenate([m[j] for m in minutes]) if minutes else np.empty(0)
+        arrays["has_chain"] = arrays["has_chain"].astype(bool)
+        arrays["has_data"] = arrays["has_data"].astype(bool)
+        arrays["strike"] = np.concatenate(strikes) if strikes else np.empty(0)
+        arrays["bid"] = np.concatenate([q[0] for q in quotes]) if quotes else np.empty(0)
+        arrays["ask"] = np.concatenate([q[1] for q in quotes]) if quotes else np.empty(0)
+        snapshots = cls(arrays)
+        if intrabar:
+            arrays["iv"] = snapshots._quote_vols()
+        return snapshots
+
+    def _quote_vols(self):
+        """Implied volatility of every quote in the snapshots, in one batched solve."""
+        inputs = []
+        for i in range(len(self)):
+            session = self.session(i)
+            shape = session.bid.shape
+            minute = session.first_minute + np.arange(shape[0])
+            inputs.append((
+                np.broadcast_to(session.spot[:, None], shape).ravel(),
+                np.broadcast_to(session.strike[None, :], shape).ravel(),
+                np.broadcast_to(((CLOSE_MINUTE - minute) / MINUTES_PER_YEAR)[:, None], shape).ravel(),
+                np.full(session.bid.size, session.signal != BULL_PUT),
+            ))
+        if not inputs:
+            return np.empty(0)
+        spot, strike, years, is_call = (np.concatenate(column) for column in zip(*inputs))
+        return quote_vols(self.arrays["bid"], self.arrays["ask"], spot, strike, is_call, years)
+
+    def session(self, i):
+        a = self.arrays
+        minutes = slice(a["minute_offset"][i], a["minute_offset"][i] + a["minute_count"][i])
+        strikes = slice(a["strike_offset"][i], a["strike_offset"][i] + a["strike_count"][i])
+        shape = (int(a["minute_count"][i]), int(a["strike_count"][i]))
+        quotes = slice(a["quote_offset"][i], a["quote_offset"][i] + shape[0] * shape[1])
+        signal_price = a["signal_price"][minutes]
+        return Session(
+            day=int(a["day"][i]),
+            signal=BULL_PUT if a["direction"][i] == BULL_PUT_CODE else BEAR_CALL,
+            first_minute=int(a["first_minute"][i]),
+            entry_rows=np.flatnonzero(~np.isnan(signal_price) & a["has_chain"][minutes]),
+            signal_price=signal_price,
+            has_data=a["has_data"][minutes],
+            spot=a["spot"][minutes],
+            strike=a["strike"][strikes],
+            bid=a["bid"][quotes].reshape(shape),
+            ask=a["ask"][quotes].reshape(shape),
+            settlement=float(a["settlement"][i]),
+            **({"iv": a["iv"][quotes].reshape(shape), **{name: a[name][minutes] for name in BAR_COLUMNS}}
+               if "iv" in a else {}),
+        )
+
+    def sessions(self):
+        return [self.session(i) for i in range(len(self))]
+
+
+def _feasible_rows(session, params):
+    """
+    Entry rows after the first that have at least one short and one hedge
+    inside the limits and enough credit between the best of each: a
+    necessary condition for best_spread_arrays, checked for every entry
+    minute in one pass.
+    """
+    rows = session.entry_rows[1:]
+    if not len(rows):
+        return rows
+    spot = session.signal_price[rows][:, None]
+    strike = session.strike[None, :]
+    bid = session.bid[rows]
+    ask = session.ask[rows]
+    if session.signal == BULL_PUT:
+        short_limit = spot * (1 - params.minimum_short_otm_percent)
+        hedge_limit = spot * (1 - params.maximum_hedge_otm_percent)
+        shorts = (hedge_limit < strike) & (strike <= short_limit)
+        hedges = (hedge_limit <= strike) & (strike <= short_limit)
+    else:
+        short_limit = spot * (1 + params.minimum_short_otm_percent)
+        hedge_limit = spot * (1 + params.maximum_hedge_otm_percent)
+        shorts = (short_limit <= strike) & (strike < hedge_limit)
+        hedges = (short_limit <= strike) & (strike <= hedge_limit)
+    shorts &= (params.minimum_short_price <= bid) & (bid <= params.maximum_short_price)
+    hedges &= (0 < ask) & (ask <= params.maximum_hedge_price)
+    best_bid = np.where(shorts, bid, -np.inf).max(axis=1)
+    cheapest_ask = np.where(hedges, ask, np.inf).min(axis=1)
+    return rows[best_bid - cheapest_ask >= params.minimum_net_credit]
+
+
+def _bar_costs(session, t, short, long, bars=slice(None)):
+    """
+    (bars, NODES) closing debit at each intrabar path node of the bars
+    after entry row `t` (all of them, or the `bars` selected).
+    """
+    if session.iv is None:
+        raise ValueError("fills=INTRABAR needs SessionSnapshots.build(..., intrabar=True)")
+    rows = slice(t, None)
+    bid = session.bid[rows][:, (short, long)]
+    ask = session.ask[rows][:, (short, long)]
+    iv = session.iv[rows][:, (short, long)]
+    quoted = ~np.isnan(ask)
+    # Quotes (and their vols) carried forward, as the securities keep them.
+    latest = np.maximum.accumulate(np.where(quoted, np.arange(len(bid))[:, None], 0), axis=0)
+    bid, ask, iv = (np.take_along_axis(a, latest, axis=0) for a in (bid, ask, iv))
+    short_ask, long_bid = ask[:, 0], bid[:, 1]
+    closes = np.where((short_ask > 0) & (long_bid >= 0), short_ask - long_bid, np.nan)
+
+    # Each bar is priced from the quote it started from.
+    path = bar_paths(session.open[rows][1:], session.high[rows][1:], session.low[rows][1:],
+                     session.spot[rows][1:])[bars]
+    minute = (session.first_minute + t + np.arange(1, len(closes)))[bars]
+    costs = closing_costs(
+        path, node_years(np.atleast_1d(minute), CLOSE_MINUTE), session.strike[[short, long]],
+        [session.signal != BULL_PUT] * 2, (-1, 1), iv[:-1][bars], ((ask[:-1] - bid[:-1]) / 2)[bars],
+    )
+    costs[:, -1] = closes[1:][bars]  # the close node is the quote itself
+    return costs
+
+
+def _intrabar_stop(session, t, short, long, stop_price):
+    """
+    (row, fill) of the first intrabar crossing of the stop after entry row
+    `t`, rows counted from `t`; (None, None) if it is never crossed.
+
+    Costs are linear between nodes, so a bar crosses iff its highest node
+    does. Those highs depend on the day's pick, not on the stop, so they
+    are cached per pick and a grid of stop multiples prices each pick once.
+    """
+    key = (session.day, session.first_minute + t, session.strike[short], session.strike[long],
+           session.ask[t, short], session.bid[t, long])
+    cached = _bar_highs.get(key)
+    if cached is None:
+        if len(_bar_highs) >= BAR_HIGH_CACHE:
+            _bar_highs.clear()
+        costs = _bar_costs(session, t, short, long)
+        cached = _bar_highs[key] = (np.where(np.isnan(costs), -np.inf, costs).max(axis=1), {})
+    highs, crossed_bars = cached
+    crossed = np.flatnonzero(highs >= stop_price)
+    if not len(crossed):
+        return None, None
+    bar = int(crossed[0])
+    if bar not in crossed_bars:
+        crossed_bars[bar] = _bar_costs(session, t, short, long, slice(bar, bar + 1))
+    return bar + 1, first_crossing(crossed_bars[bar], stop=stop_price).cost
+
+
+def evaluate_session(session, params, quantity=2, fee_per_contract=0.0, fills=MINUTE):
+    """(pnl in dollars, exit code) of one day under `params`."""
+    if not len(session.entry_rows):
+        return 0.0, NO_TRADE
+    # Most days enter on the first try; only screen the later minutes when it fails.
+    t = int(session.entry_rows[0])
+    pick = best_spread_arrays(session.strike, session.bid[t], session.ask[t], session.signal,
+                              session.signal_price[t], params)
+    if pick is None:
+        for t in _feasible_rows(session, params).tolist():
+            pick = best_spread_arrays(session.strike, session.bid[t], session.ask[t], session.signal,
+                                      session.signal_price[t], params)
+            if pick is not None:
+                break
+        else:
+            return 0.0, NO_TRADE
+    short, long, credit = pick
+
+    # Everything below is indexed from the entry minute.
+    short_ask = _carried_forward(session.ask[t:, short])
+    long_bid = _carried_forward(session.bid[t:, long])
+    debit = short_ask - long_bid
+    stop_price = credit * params.stop_loss_multiple
+    triggered = session.has_data[t:] & (short_ask > 0) & (long_bid >= 0) & (np.maximum(debit, 0) >= stop_price)
+    triggered[0] = False  # the stop is checked before the entry in on_data
+    stop = int(np.argmax(triggered)) if triggered.any() else None
+    stop_cost = debit[stop] if stop is not None else None
+
+    check = CHECK_MINUTE - session.first_minute - t
+    short_strike = session.strike[short]
+    spot = session.spot[t + check] if 0 < check < len(debit) else 0.0
+    if session.signal == BULL_PUT:
+        short_is_itm = spot < short_strike
+    else:
+        short_is_itm = spot > short_strike
+
+    stopped_before_check = stop is not None and stop < check
+    if fills == INTRABAR:
+        stop, stop_cost = _intrabar_stop(session, t, short, long, stop_price)
+        # The bar ending at 3:45 PM is traded before the scheduled check runs.
+        stopped_before_check = stop is not None and stop <= check
+
+    if stopped_before_check:
+        cost, exit_code = stop_cost, STOPPED
+    elif spot > 0 and short_is_itm:
+        cost, exit_code = debit[check], CLOSED_ITM
+    elif stop is not None:
+        cost, exit_code = stop_cost, STOPPED
+    else:
+        settlement = session.settlement
+        if session.signal == BULL_PUT:
+            intrinsic = max(short_strike - settlement, 0.0) - max(session.strike[long] - settlement, 0.0)
+        else:
+            intrinsic = max(settlement - short_strike, 0.0) - max(settlement - session.strike[long], 0.0)
+        cost, exit_code = intrinsic, EXPIRED
+
+    legs = 2 if exit_code == EXPIRED else 4  # settlement is free
+    pnl = (credit - float(cost)) * MULTIPLIER * quantity - fee_per_contract * legs * quantity
+    return pnl, exit_code
+
+
+def evaluate(sessions, params, quantity=2, fee_per_contract=0.0, fills=MINUTE):
+    """Outcomes of every session (a list from SessionSnapshots.sessions) under `params`."""
+    pnl = np.zeros(len(sessions))
+    exits = np.zeros(len(sessions), dtype=np.int8)
+    for i, session in enumerate(sessions):
+        pnl[i], exits[i] = evaluate_session(session, params, quantity, fee_per_contract, fills)
+    return Outcomes(pnl, exits)
+
+
+def _attach_worker(handle):
+    global _worker_block, _worker_sessions
+    # Keep the block referenced for the worker's lifetime; the views borrow it.
+    _worker_block, arrays = SharedArrays.attach(handle)
+    _worker_sessions = SessionSnapshots(arrays).sessions()
+
+
+def _evaluate_one(task):
+    params, quantity, fee_per_contract, fills = task
+    return params, evaluate(_worker_sessions, params, quantity, fee_per_contract, fills)
+
+
+def evaluate_grid(snapshots, configs, quantity=2, fee_per_contract=0.0, workers=None, chunksize=None,
+                  fills=MINUTE):
+    """
+    Yield (params, Outcomes) for every ZeroDteParameters in `configs`, in
+    order, evaluated across a process pool sharing `snapshots`.
+    """
+    configs = list(configs)
+    workers = workers or os.cpu_count() or 1
+    if chunksize is None:
+        chunksize = max(1, len(configs) // (workers * 8))
+    tasks = [(params, quantity, fee_per_contract, fills) for params in configs]
+
+    with SharedArrays(snapshots.arrays) as shared:
+        with ProcessPoolExecutor(
+            max_workers=workers, initializer=_attach_worker, initargs=(shared.handle,)
+        ) as pool:
+            yield from pool.map(_evaluate_one, tasks, chunksize=chunksize)
@@ -0,0 +1,57 @@
+import argparse
+from datetime import date
+
+from lib.profiling import CallbackProfiler
+from local_engine.engine import load_algorithm, run
+
+parser = argparse.ArgumentParser(description="Replay a QuantConnect strategy over local minute data.")
+parser.add_argument("strategy", help="strategy file, e.g. Nick_SPX_0DTE.py")
+parser.add_argument("--data", default="data/local", help="root of the local_engine.data day files")
+parser.add_argument("--start", type=date.fromisoformat, help="override the algorithm's start date")
+parser.add_argument("--end", type=date.fromisoformat, help="override the algorithm's end date")
+parser.add_argument("--class", dest="class_name", help="algorithm class, if the file has several")
+parser.add_argument("--fee", type=float, default=0.0, help="fee per option contract")
+parser.add_argument("--quiet", action="store_true", help="do not echo the algorithm's log")
+parser.add_argument("--journal", help="write the algorithm's trade journal here (.npz for binary, else CSV)")
+parser.add_argument("--profile", action="store_true", help="time the algorithm's callbacks and print a report")
+parser.add_argument("--profile-methods", default="",
+                    help="comma-separated strategy methods to time as well, e.g. select_spread,prepare_for_session")
+parser.add_argument("--profile-allocations", action="store_true", help="also record net allocations (slow)")
+parser.add_argument("--profile-folded", help="write flamegraph input (folded stacks) to this file")
+args = parser.parse_args()
+
+profiler = None
+if args.profile or args.profile_methods or args.profile_allocations or args.profile_folded:
+    methods = [name for name in args.profile_methods.split(",") if name]
+    profiler = CallbackProfiler(allocations=args.profile_allocations, methods=methods)
+
+algorithm = load_algorithm(args.strategy, args.class_name)
+result = run(algorithm, args.data, args.start, args.end, args.fee, echo=not args.quiet, profiler=profiler)
+
+stats = result.statistics
+print(f"\n=== {algorithm.__name__}: {stats['Trading Days']} days in {stats['Runtime Seconds']:.2f}s ===")
+print(f"Total Orders: {stats['Total Orders']}")
+print(f"Start Equity: ${stats['Start Equity']:,.2f}")
+print(f"End Equity: ${stats['End Equity']:,.2f}")
+print(f"Net Profit: {stats['Net Profit']:.2%}")
+print(f"Compounding Annual Return: {stats['Compounding Annual Return']:.2%}")
+print(f"Drawdown: {stats['Drawdown']:.2%}")
+print(f"Total Fees: ${stats['Total Fees']:,.2f}")
+for name, value in result.summary_statistics.items():
+    print(f"{name}: {value}")
+
+journal = getattr(result.algorithm, "journal", None)
+if args.journal and journal is not None:
+    if args.journal.endswith(".npz"):
+        journal.save(args.journal)
+    else:
+        journal.to_csv(args.journal)
+    print(f"Journal: {len(journal)} records written to {args.journal}")
+
+if profiler is not None:
+    if args.quiet:  # the engine logged the report, but nothing was echoed
+        print()
+        profiler.emit()
+    if args.profile_folded:
+        with open(args.profile_folded, "w") as handle:
+            handle.write("\n".join(profiler.folded()) + "\n")
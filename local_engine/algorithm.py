@@ -0,0 +1,438 @@
+"""
+QCAlgorithm and the portfolio/securities objects it exposes.
+
+The algorithm only records intent (subscriptions, schedules, orders); the
+replay engine in engine.py owns the clock, the data and the fills.
+"""
+from datetime import date, datetime
+
+from local_engine.api import (
+    DataDictionary, DateRules, OptionChains, OptionFilterUniverse, Resolution, Schedule,
+    SecurityType, Slice, Symbol, TimeRules, mid_price,
+)
+from local_engine.pep8 import Pep8
+
+
+class SecurityHolding(Pep8):
+    def __init__(self, security):
+        self.security = security
+        self.quantity = 0
+        self.average_price = 0.0
+        self.net_profit = 0.0
+        self.total_fees = 0.0
+
+    @property
+    def symbol(self):
+        return self.security.symbol
+
+    @property
+    def price(self):
+        return self.security.price
+
+    @property
+    def invested(self):
+        return self.quantity != 0
+
+    @property
+    def is_long(self):
+        return self.quantity > 0
+
+    @property
+    def is_short(self):
+        return self.quantity < 0
+
+    @property
+    def absolute_quantity(self):
+        return abs(self.quantity)
+
+    @property
+    def holdings_value(self):
+        return self.quantity * self.security.price * self.security.multiplier
+
+    @property
+    def absolute_holdings_value(self):
+        return abs(self.holdings_value)
+
+    @property
+    def holdings_cost(self):
+        return self.quantity * self.average_price * self.security.multiplier
+
+    @property
+    def unrealized_profit(self):
+        if self.quantity == 0:
+            return 0.0
+        return self.holdings_value - self.holdings_cost
+
+    def __repr__(self):
+        return f"{self.symbol}: {self.quantity} @ {self.average_price:.2f}"
+
+
+class Security(Pep8):
+    """An equity or index, priced from its minute bars."""
+
+    def __init__(self, symbol, resolution=Resolution.MINUTE, multiplier=1):
+        self.symbol = symbol
+        self.resolution = resolution
+        self.multiplier = multiplier
+        self.holdings = SecurityHolding(self)
+        self.open = self.high = self.low = self.close = self.volume = 0.0
+        self._bid = self._ask = 0.0
+        self.is_tradable = True
+
+    @property
+    def type(self):
+        return self.symbol.security_type
+
+    @property
+    def price(self):
+        return self.close
+
+    @property
+    def bid_price(self):
+        return self._bid
+
+    @property
+    def ask_price(self):
+        return self._ask
+
+    @property
+    def has_data(self):
+        return self.price > 0 or self.bid_price > 0 or self.ask_price > 0
+
+    def update(self, bar):
+        self.open, self.high, self.low, self.close, self.volume = bar.open, bar.high, bar.low, bar.close, bar.volume
+        self._bid = self._ask = bar.close
+
+    def set_data_normalization_mode(self, mode):
+        pass
+
+    def set_leverage(self, leverage):
+        pass
+
+    def set_fee_model(self, model):
+        pass
+
+    def __repr__(self):
+        return str(self.symbol)
+
+
+class Option(Security):
+    """A canonical option subscription: the chain universe and its filter."""
+
+    def __init__(self, symbol, resolution=Resolution.MINUTE):
+        super().__init__(symbol, resolution, multiplier=100)
+        self.universe = OptionFilterUniverse()
+        self.is_tradable = False
+
+    @property
+    def underlying(self):
+        return self.symbol.underlying
+
+    def set_filter(self, *args):
+        """set_filter(universe -> universe) or set_filter(min_strike, max_strike, min_expiry, max_expiry)."""
+        universe = OptionFilterUniverse()
+        if len(args) == 1:
+            universe = args[0](universe) or universe
+        else:
+            universe.strikes(args[0], args[1]).expiration(args[2], args[3])
+        self.universe = universe
+
+
+class OptionContractSecurity(Security):
+    """One option contract, quoted lazily from the engine's current minute."""
+
+    def __init__(self, symbol, engine):
+        super().__init__(symbol, Resolution.MINUTE, multiplier=100)
+        self._engine = engine
+        self._stamp = -1
+
+    def _refresh(self):
+        if self._stamp != self._engine.stamp:
+            self._stamp = self._engine.stamp
+            quote = self._engine.quote(self.symbol)
+            if quote is not None:
+                self._bid, self._ask = quote
+                self.close = mid_price(*quote)
+
+    @property
+    def price(self):
+        self._refresh()
+        return self.close
+
+    @property
+    def bid_price(self):
+        self._refresh()
+        return self._bid
+
+    @property
+    def ask_price(self):
+        self._refresh()
+        return self._ask
+
+    @property
+    def expiry(self):
+        return self.symbol.id.date
+
+    @property
+    def strike_price(self):
+        return self.symbol.strike
+
+    @property
+    def right(self):
+        return self.symbol.right
+
+
+class SecurityManager(DataDictionary):
+    """Securities by Symbol (or ticker); option contracts are added on first use."""
+
+    def __init__(self, algorithm):
+        super().__init__()
+        self._algorithm = algorithm
+        self._by_ticker = {}
+
+    def add(self, security):
+        dict.__setitem__(self, security.symbol, security)
+        if security.symbol.expiry is None:
+            self._by_ticker.setdefault(security.symbol.value, security)
+        return security
+
+    def _resolve(self, key):
+        if isinstance(key, str):
+            return self._by_ticker.get(key.upper())
+        security = dict.get(self, key)
+        if security is None and key.expiry is not None:
+            security = self.add(OptionContractSecurity(key, self._algorithm._engine))
+        return security
+
+    def __getitem__(self, key):
+        security = self._resolve(key)
+        if security is None:
+            raise KeyError(f"{key} is not in the securities collection")
+        return security
+
+    def get(self, key, default=None):
+        security = self._resolve(key)
+        return default if security is None else security
+
+    def __contains__(self, key):
+        if isinstance(key, str):
+            return key.upper() in self._by_ticker
+        return dict.__contains__(self, key)
+
+    contains_key = __contains__
+
+
+class SecurityPortfolioManager(Pep8):
+    def __init__(self, algorithm):
+        self._algorithm = algorithm
+        self.cash = 0.0
+        self.total_fees = 0.0
+        self.open = {}  # symbol -> SecurityHolding with a non-zero quantity
+
+    def __getitem__(self, key):
+        return self._algorithm.securities[key].holdings
+
+    def __contains__(self, key):
+        return key in self._algorithm.securities
+
+    contains_key = __contains__
+
+    def keys(self):
+        return list(self._algorithm.securities.keys())
+
+    def values(self):
+        return [security.holdings for security in self._algorithm.securities.values()]
+
+    def items(self):
+        return [(symbol, security.holdings) for symbol, security in self._algorithm.securities.items()]
+
+    @property
+    def invested(self):
+        return bool(self.open)
+
+    @property
+    def total_holdings_value(self):
+        return sum(holding.holdings_value for holding in self.open.values())
+
+    @property
+    def total_absolute_holdings_cost(self):
+        return sum(abs(holding.holdings_cost) for holding in self.open.values())
+
+    @property
+    def total_unrealized_profit(self):
+        return sum(holding.unrealized_profit for holding in self.open.values())
+
+    total_unrealised_profit = total_unrealized_profit
+
+    @property
+    def total_portfolio_value(self):
+        return self.cash + self.total_holdings_value
+
+    @property
+    def margin_remaining(self):
+        return self.cash
+
+    def set_cash(self, cash):
+        self.cash = float(cash)
+
+
+class SubscriptionManager(Pep8):
+    def __init__(self):
+        self.consolidators = {}  # symbol -> [consolidator]
+
+    def add_consolidator(self, symbol, consolidator):
+        self.consolidators.setdefault(symbol, []).append(consolidator)
+
+    def remove_consolidator(self, symbol, consolidator):
+        self.consolidators.get(symbol, []).remove(consolidator)
+
+
+class History(Pep8):
+    """
+    `history[TradeBar](symbol, periods, resolution)` as a list of TradeBars,
+    daily bars built from the minute files. Calling history(...) directly
+    returns the same list, not a DataFrame.
+    """
+
+    def __init__(self, algorithm):
+        self._algorithm = algorithm
+
+    def __getitem__(self, bar_type):
+        return self
+
+    def __call__(self, symbols, periods, resolution=None):
+        engine = self._algorithm._engine
+        if isinstance(symbols, (list, tuple)):
+            bars = [bar for symbol in symbols for bar in engine.history(symbol, periods, resolution)]
+            return sorted(bars, key=lambda bar: bar.end_time)
+        return engine.history(symbols, periods, resolution)
+
+
+def _as_date(year, month=None, day=None):
+    if isinstance(year, datetime):
+        return year.date()
+    if isinstance(year, date):
+        return year
+    return date(year, month, day)
+
+
+class QCAlgorithm(Pep8):
+    def __init__(self):
+        self._engine = None
+        self.time = datetime(1998, 1, 1)
+        self.start_date = date(1998, 1, 1)
+        self.end_date = date.today()
+        self.live_mode = False
+        self.is_warming_up = False
+        self.securities = SecurityManager(self)
+        self.portfolio = SecurityPortfolioManager(self)
+        self.schedule = Schedule()
+        self.date_rules = DateRules()
+        self.time_rules = TimeRules()
+        self.subscription_manager = SubscriptionManager()
+        self.history = History(self)
+        self.current_slice = Slice(self.time, DataDictionary(), OptionChains({}))
+        self.summary_statistics = {}
+        self.runtime_statistics = {}
+
+    # Setup.
+
+    def set_start_date(self, year, month=None, day=None):
+        self.start_date = _as_date(year, month, day)
+
+    def set_end_date(self, year, month=None, day=None):
+        self.end_date = _as_date(year, month, day)
+
+    def set_cash(self, cash):
+        self.portfolio.set_cash(cash)
+
+    def set_time_zone(self, time_zone):
+        pass
+
+    def set_brokerage_model(self, *args):
+        pass
+
+    def set_benchmark(self, benchmark):
+        pass
+
+    def set_warm_up(self, period, resolution=None):
+        pass
+
+    def set_security_initializer(self, initializer):
+        pass
+
+    def add_equity(self, ticker, resolution=Resolution.MINUTE, market=None, fill_forward=True,
+                   leverage=None, extended_market_hours=False, data_normalization_mode=None):
+        symbol = Symbol.create(ticker, SecurityType.EQUITY)
+        return self.securities.get(symbol) or self.securities.add(Security(symbol, resolution))
+
+    def add_index(self, ticker, resolution=Resolution.MINUTE, market=None, fill_forward=True):
+        symbol = Symbol.create(ticker, SecurityType.INDEX)
+        return self.securities.get(symbol) or self.securities.add(Security(symbol, resolution))
+
+    def add_option(self, underlying, resolution=Resolution.MINUTE, market=None, fill_forward=True,
+                   leverage=None, extended_market_hours=False):
+        if isinstance(underlying, str):
+            underlying = self.add_equity(underlying, resolution).symbol
+        symbol = Symbol.create_canonical_option(underlying)
+        return self.securities.get(symbol) or self.securities.add(Option(symbol, resolution))
+
+    def add_index_option(self, underlying, target_option=None, resolution=Resolution.MINUTE, market=None,
+                         fill_forward=True):
+        if isinstance(target_option, int):  # add_index_option(symbol, resolution)
+            target_option, resolution = None, target_option
+        if isinstance(underlying, str):
+            underlying = self.add_index(underlying, resolution).symbol
+        symbol = Symbol.create_canonical_option(underlying, target_option)
+        return self.securities.get(symbol) or self.securities.add(Option(symbol, resolution))
+
+    # Orders.
+
+    def market_order(self, symbol, quantity, asynchronous=False, tag="", order_properties=None):
+        return self._engine.market_order(self.securities[symbol].symbol, quantity, tag)
+
+    def combo_market_order(self, legs, quantity, asynchronous=False, tag="", order_properties=None):
+        return self._engine.combo_market_order(legs, quantity, tag)
+
+    def buy(self, symbol, quantity):
+        return self.market_order(symbol, abs(quantity))
+
+    def sell(self, symbol, quantity):
+        return self.market_order(symbol, -abs(quantity))
+
+    def liquidate(self, symbol=None, asynchronous=False, tag="Liquidated", order_properties=None):
+        if symbol is None:
+            holdings = list(self.portfolio.open.values())
+        else:
+            holdings = [self.portfolio[symbol]]
+        return [self.market_order(h.symbol, -h.quantity, tag=tag) for h in holdings if h.quantity != 0]
+
+    def set_holdings(self, symbol, percentage, liquidate_existing_holdings=False, tag=""):
+        security = self.securities[symbol]
+        if liquidate_existing_holdings:
+            for holding in list(self.portfolio.open.values()):
+                if holding.symbol is not security.symbol:
+                    self.market_order(holding.symbol, -holding.quantity, tag=tag)
+        target = int(self.portfolio.total_portfolio_value * percentage / (security.price * security.multiplier))
+        quantity = target - security.holdings.quantity
+        return self.market_order(security.symbol, quantity, tag=tag) if quantity else None
+
+    # Output.
+
+    def log(self, message):
+        self._engine.log(message)
+
+    debug = error = log
+
+    def plot(self, chart, series, value=None):
+        self._engine.plot(chart, series, value)
+
+    def add_chart(self, chart):
+        for name in chart.series:
+            self._engine.charts.setdefault(chart.name, {}).setdefault(name, [])
+
+    def set_summary_statistic(self, name, value):
+        self.summary_statistics[name] = value
+
+    def set_runtime_statistic(self, name, value):
+        self.runtime_statistics[name] = value
@@ -0,0 +1,953 @@
+"""
+The QCAlgorithm data types the strategies in this repo touch.
+
+Enums, symbols, bars, consolidators, schedule rules, option universes and
+chains, slices, legs and order tickets/events. Everything answers to both
+Lean's PascalCase and snake_case names (see pep8.py).
+"""
+from datetime import date, datetime, time, timedelta
+
+import numpy as np
+
+from lib.implied_vol import implied_vol
+from lib.option_math import black_scholes
+from local_engine.pep8 import Enum, Pep8
+
+MARKET_OPEN = 9 * 60 + 30  # minute of day, New York time
+MARKET_CLOSE = 16 * 60
+RISK_FREE_RATE = 0.01
+EPOCH = date(1970, 1, 1)
+
+
+class Resolution(Enum):
+    TICK = 0
+    SECOND = 1
+    MINUTE = 2
+    HOUR = 3
+    DAILY = 4
+
+
+class OptionRight(Enum):
+    CALL = 0
+    PUT = 1
+
+
+class OptionStyle(Enum):
+    AMERICAN = 0
+    EUROPEAN = 1
+
+
+class SecurityType(Enum):
+    BASE = 0
+    EQUITY = 1
+    OPTION = 2
+    INDEX = 10
+    INDEX_OPTION = 11
+
+
+class OrderStatus(Enum):
+    NEW = 0
+    SUBMITTED = 1
+    PARTIALLY_FILLED = 2
+    FILLED = 3
+    CANCELED = 5
+    NONE = 6
+    INVALID = 7
+
+
+class OrderDirection(Enum):
+    BUY = 0
+    SELL = 1
+    HOLD = 2
+
+
+class OrderType(Enum):
+    MARKET = 0
+    OPTION_EXERCISE = 6
+    COMBO_MARKET = 9
+
+
+class DayOfWeek(Enum):
+    """Python weekday() numbering."""
+
+    MONDAY = 0
+    TUESDAY = 1
+    WEDNESDAY = 2
+    THURSDAY = 3
+    FRIDAY = 4
+    SATURDAY = 5
+    SUNDAY = 6
+
+
+class DataNormalizationMode(Enum):
+    RAW = 0
+    ADJUSTED = 1
+    SPLIT_ADJUSTED = 2
+    TOTAL_RETURN = 3
+
+
+class BrokerageName(Enum):
+    DEFAULT = 0
+    INTERACTIVE_BROKERS_BROKERAGE = 1
+    QUANT_CONNECT_BROKERAGE = 2
+    TRADIER_BROKERAGE = 3
+
+
+class AccountType(Enum):
+    MARGIN = 0
+    CASH = 1
+
+
+class SeriesType(Enum):
+    LINE = 0
+    SCATTER = 1
+    CANDLE = 2
+    BAR = 3
+
+
+class TimeZones(Enum):
+    NEW_YORK = "America/New_York"
+    UTC = "UTC"
+
+
+class Series(Pep8):
+    def __init__(self, name, series_type=SeriesType.LINE, unit="$", index=0):
+        self.name = name
+        self.series_type = series_type
+        self.unit = unit
+        self.index = index
+
+
+class Chart(Pep8):
+    """A chart declaration; plotted points are kept by the engine, keyed by chart and series name."""
+
+    def __init__(self, name):
+        self.name = name
+        self.series = {}
+
+    def add_series(self, series):
+        self.series[series.name] = series
+
+
+def to_date(day_number):
+    return EPOCH + timedelta(days=int(day_number))
+
+
+class SecurityIdentifier(Pep8):
+    __slots__ = ("symbol", "security_type", "date", "option_right", "strike_price")
+
+    def __init__(self, symbol, security_type, date=None, option_right=None, strike_price=None):
+        self.symbol = symbol
+        self.security_type = security_type
+        self.date = date
+        self.option_right = option_right
+        self.strike_price = strike_price
+
+
+class Symbol(Pep8):
+    """
+    Interned security identifier: one object per security, so symbols
+    compare and hash by identity like Lean's.
+
+    Option contracts also keep `ticker` (the option ticker, e.g. "SPXW"),
+    `expiry` (a day number), `right` and `strike` for the engine's quote
+    lookups; their value and id are only built when asked for.
+    """
+
+    __slots__ = ("_value", "security_type", "underlying", "_id", "ticker", "expiry", "right", "strike")
+    _interned = {}
+
+    def __init__(self, value, security_type, underlying=None, id=None, ticker=None, expiry=None, right=None,
+                 strike=None):
+        self._value = value
+        self.security_type = security_type
+        self.underlying = underlying
+        self._id = id
+        self.ticker = ticker or value
+        self.expiry = expiry
+        self.right = right
+        self.strike = strike
+
+    @classmethod
+    def create(cls, ticker, security_type=SecurityType.EQUITY, market=None):
+        ticker = ticker.upper()
+        key = (ticker, security_type)
+        symbol = cls._interned.get(key)
+        if symbol is None:
+            symbol = cls._interned[key] = cls(ticker, security_type)
+        return symbol
+
+    @classmethod
+    def create_canonical_option(cls, underlying, ticker=None, market=None):
+        ticker = (ticker or underlying.value).upper()
+        security_type = SecurityType.INDEX_OPTION if underlying.security_type == SecurityType.INDEX else SecurityType.OPTION
+        key = ("?" + ticker, security_type)
+        symbol = cls._interned.get(key)
+        if symbol is None:
+            symbol = cls._interned[key] = cls("?" + ticker, security_type, underlying, ticker=ticker)
+        return symbol
+
+    @classmethod
+    def create_option(cls, underlying, ticker, expiry, right, strike):
+        """Contract symbol; `expiry` is a day number, `right` an OptionRight."""
+        key = (ticker, int(expiry), int(right), float(strike))
+        symbol = cls._interned.get(key)
+        if symbol is None:
+            security_type = SecurityType.INDEX_OPTION if underlying.security_type == SecurityType.INDEX else SecurityType.OPTION
+            symbol = cls._interned[key] = cls(None, security_type, underlying, None, *key)
+        return symbol
+
+    @property
+    def value(self):
+        if self._value is None:
+            self._value = (f"{self.ticker:<6}{to_date(self.expiry):%y%m%d}{'CP'[self.right]}"
+                           f"{round(self.strike * 1000):08d}")
+        return self._value
+
+    @property
+    def id(self):
+        if self._id is None:
+            if self.expiry is None:
+                self._id = SecurityIdentifier(self.ticker, self.security_type)
+            else:
+                expiry = datetime.combine(to_date(self.expiry), time())
+                self._id = SecurityIdentifier(self.ticker, self.security_type, expiry, self.right, self.strike)
+        return self._id
+
+    @property
+    def canonical(self):
+        if self.expiry is None:
+            return self
+        return Symbol.create_canonical_option(self.underlying, self.ticker)
+
+    @property
+    def has_underlying(self):
+        return self.underlying is not None
+
+    def is_canonical(self):
+        return self.value.startswith("?")
+
+    def __str__(self):
+        return self.value
+
+    __repr__ = __str__
+
+
+class TradeBar(Pep8):
+    __slots__ = ("time", "symbol", "open", "high", "low", "close", "volume", "end_time")
+
+    def __init__(self, time=None, symbol=None, open=0.0, high=0.0, low=0.0, close=0.0, volume=0.0,
+                 period=timedelta(minutes=1)):
+        self.time = time
+        self.symbol = symbol
+        self.open = open
+        self.high = high
+        self.low = low
+        self.close = close
+        self.volume = volume
+        self.end_time = None if time is None else time + period
+
+    @property
+    def price(self):
+        return self.close
+
+    value = price
+
+    @property
+    def period(self):
+        return self.end_time - self.time
+
+    def __repr__(self):
+        return (f"{self.symbol}: O: {self.open:.2f} H: {self.high:.2f} L: {self.low:.2f} "
+                f"C: {self.close:.2f} V: {self.volume:.0f}")
+
+
+class Bar(Pep8):
+    """One side (bid or ask) of a QuoteBar."""
+
+    __slots__ = ("open", "high", "low", "close")
+
+    def __init__(self, open=0.0, high=0.0, low=0.0, close=0.0):
+        self.open = open
+        self.high = high
+        self.low = low
+        self.close = close
+
+
+class QuoteBar(Pep8):
+    """An option contract's quote for one minute; each side is flat at that minute's bid or ask."""
+
+    __slots__ = ("time", "symbol", "bid", "ask", "end_time")
+
+    def __init__(self, time, symbol, bid, ask, period=timedelta(minutes=1)):
+        self.time = time
+        self.symbol = symbol
+        self.bid = Bar(bid, bid, bid, bid)
+        self.ask = Bar(ask, ask, ask, ask)
+        self.end_time = time + period
+
+    @property
+    def close(self):
+        return mid_price(self.bid.close, self.ask.close)
+
+    price = value = close
+
+    def __repr__(self):
+        return f"{self.symbol}: B: {self.bid.close:.2f} A: {self.ask.close:.2f}"
+
+
+class Event:
+    """C#-style event: `consolidator.data_consolidated += handler`."""
+
+    def __init__(self):
+        self._handlers = []
+
+    def __iadd__(self, handler):
+        self._handlers.append(handler)
+        return self
+
+    def __isub__(self, handler):
+        self._handlers.remove(handler)
+        return self
+
+    def fire(self, sender, argument):
+        for handler in self._handlers:
+            handler(sender, argument)
+
+
+class TradeBarConsolidator(Pep8):
+    """
+    Time bars aligned to midnight (5-minute bars end at 9:35, 9:40, ...) or,
+    given an int, bars of that many inputs. A bar is emitted as soon as its
+    last input arrives, or at the first time step past its end.
+    """
+
+    def __init__(self, period):
+        if isinstance(period, int):
+            self._count, self._period = period, None
+        else:
+            self._count, self._period = None, period
+        self._seen = 0
+        self._working = None
+        self.consolidated = None
+        self.data_consolidated = Event()
+
+    def update(self, bar):
+        working = self._working
+        if self._period is not None and (working is None or not working.time <= bar.time < working.end_time):
+            start = self._window_start(bar.time)
+            if working is not None:
+                self._emit()
+                working = None
+        if working is None:
+            period = self._period or bar.period
+            working = self._working = TradeBar(
+                start if self._period is not None else bar.time, bar.symbol,
+                bar.open, bar.high, bar.low, bar.close, bar.volume, period,
+            )
+        else:
+            working.high = max(working.high, bar.high)
+            working.low = min(working.low, bar.low)
+            working.close = bar.close
+            working.volume += bar.volume
+            if self._period is None:
+                working.end_time = bar.end_time
+        self._seen += 1
+
+        if self._period is not None:
+            if bar.end_time >= working.end_time:
+                self._emit()
+        elif self._seen == self._count:
+            self._emit()
+
+    def scan(self, now):
+        if self._working is not None and self._period is not None and now >= self._working.end_time:
+            self._emit()
+
+    def _window_start(self, moment):
+        midnight = datetime.combine(moment.date(), time())
+        if self._period >= timedelta(days=1):
+            return midnight
+        return moment - (moment - midnight) % self._period
+
+    def _emit(self):
+        bar, self._working, self._seen = self._working, None, 0
+        self.consolidated = bar
+        self.data_consolidated.fire(self, bar)
+
+
+class DateRule(Pep8):
+    """Selects the days, out of the run's trading days, an event fires on."""
+
+    def __init__(self, name, select):
+        self.name = name
+        self._select = select
+
+    def days(self, trading_days):
+        return set(self._select(trading_days))
+
+
+def _pick(trading_days, group, offset, from_end):
+    groups = {}
+    for day in trading_days:
+        groups.setdefault(group(day), []).append(day)
+    for days in groups.values():
+        if offset < len(days):
+            yield days[-1 - offset] if from_end else days[offset]
+
+
+class DateRules(Pep8):
+    def every_day(self, symbol=None):
+        return DateRule("EveryDay", lambda days: days)
+
+    def every(self, *days_of_week):
+        wanted = set()
+        for day in days_of_week:
+            wanted.update(day if isinstance(day, (list, tuple, set)) else [day])
+        return DateRule("Every", lambda days: (d for d in days if d.weekday() in wanted))
+
+    def week_start(self, symbol=None, days_offset=0):
+        return DateRule("WeekStart", lambda days: _pick(days, lambda d: d.isocalendar()[:2], days_offset, False))
+
+    def week_end(self, symbol=None, days_offset=0):
+        return DateRule("WeekEnd", lambda days: _pick(days, lambda d: d.isocalendar()[:2], days_offset, True))
+
+    def month_start(self, symbol=None, days_offset=0):
+        return DateRule("MonthStart", lambda days: _pick(days, lambda d: (d.year, d.month), days_offset, False))
+
+    def month_end(self, symbol=None, days_offset=0):
+        return DateRule("MonthEnd", lambda days: _pick(days, lambda d: (d.year, d.month), days_offset, True))
+
+    def on(self, *args):
+        if len(args) == 3 and all(isinstance(a, int) for a in args):
+            wanted = {date(*args)}
+        else:
+            wanted = {a.date() if isinstance(a, datetime) else a for a in args}
+        return DateRule("On", lambda days: (d for d in days if d in wanted))
+
+
+class TimeRule(Pep8):
+    def __init__(self, name, minutes):
+        self.name = name
+        self.minutes = tuple(minutes)
+
+
+class TimeRules(Pep8):
+    """Times as minutes of the day; seconds are dropped."""
+
+    def at(self, hour, minute=0, second=0, time_zone=None):
+        return TimeRule(f"{hour}:{minute:02d}", [hour * 60 + minute])
+
+    def every(self, interval):
+        """Every `interval` from midnight, limited to the regular session."""
+        step = max(int(interval.total_seconds() // 60), 1)
+        return TimeRule("Every", (m for m in range(0, 24 * 60, step) if MARKET_OPEN <= m <= MARKET_CLOSE))
+
+    def after_market_open(self, symbol=None, minutes_after_open=0, extended_market_open=False):
+        return TimeRule("AfterMarketOpen", [MARKET_OPEN + int(minutes_after_open)])
+
+    def before_market_close(self, symbol=None, minutes_before_close=0, extended_market_close=False):
+        return TimeRule("BeforeMarketClose", [MARKET_CLOSE - int(minutes_before_close)])
+
+    @property
+    def midnight(self):
+        return TimeRule("Midnight", [0])
+
+    @property
+    def noon(self):
+        return TimeRule("Noon", [12 * 60])
+
+
+class ScheduledEvent(Pep8):
+    def __init__(self, date_rule, time_rule, callback, name=None):
+        self.date_rule = date_rule
+        self.time_rule = time_rule
+        self.callback = callback
+        self.name = name or f"{date_rule.name}: {time_rule.name}"
+        self.enabled = True
+
+
+class Schedule(Pep8):
+    def __init__(self):
+        self.events = []
+
+    def on(self, date_rule, time_rule, callback):
+        event = ScheduledEvent(date_rule, time_rule, callback)
+        self.events.append(event)
+        return event
+
+
+class OptionFilterUniverse(Pep8):
+    """
+    Records an option filter. Lean's defaults apply until overridden:
+    standard (monthly) expiries, 0-35 days out, one strike either side of ATM.
+    """
+
+    def __init__(self):
+        self.min_strike, self.max_strike = -1, 1
+        self.min_expiry, self.max_expiry = 0, 35
+        self.weeklys = False
+        self.standards = True
+        self.rights = None
+
+    def include_weeklys(self):
+        self.weeklys = True
+        return self
+
+    def weeklys_only(self):
+        self.weeklys, self.standards = True, False
+        return self
+
+    def standards_only(self):
+        self.weeklys, self.standards = False, True
+        return self
+
+    def strikes(self, min_strike, max_strike):
+        self.min_strike, self.max_strike = int(min_strike), int(max_strike)
+        return self
+
+    def expiration(self, min_expiry, max_expiry):
+        as_days = lambda value: value.days if isinstance(value, timedelta) else int(value)
+        self.min_expiry, self.max_expiry = as_days(min_expiry), as_days(max_expiry)
+        return self
+
+    def calls_only(self):
+        self.rights = OptionRight.CALL
+        return self
+
+    def puts_only(self):
+        self.rights = OptionRight.PUT
+        return self
+
+    def only_apply_filter_at_market_open(self):
+        return self
+
+    def rows(self, snapshot, today, spot, all_weeklys=False):
+        """Rows of a chain_store.ChainSnapshot that pass the filter."""
+        groups = snapshot.group_mask(today + self.min_expiry, today + self.max_expiry, self.rights)
+        if not all_weeklys and self.weeklys != self.standards:
+            expiry, _, _, _ = snapshot.groups()
+            groups &= is_standard_expiry(expiry) == self.standards
+        strikes = snapshot.strikes_in(groups)
+        if not len(strikes) or spot <= 0:
+            return snapshot.rows_in(groups)
+        atm = int(np.argmin(np.abs(strikes - spot)))
+        low = strikes[max(atm + self.min_strike, 0)]
+        high = strikes[min(atm + self.max_strike, len(strikes) - 1)]
+        return snapshot.rows_in(groups, low, high)
+
+
+def is_standard_expiry(day_numbers):
+    """Third-Friday (monthly) expiries."""
+    days = np.asarray(day_numbers, dtype=np.int64)
+    as_dates = days.astype("datetime64[D]")
+    day_of_month = (as_dates - as_dates.astype("datetime64[M]")).astype(np.int64) + 1
+    weekday = (days + 3) % 7  # 1970-01-01 was a Thursday
+    return (weekday == DayOfWeek.FRIDAY) & (day_of_month >= 15) & (day_of_month <= 21)
+
+
+class Greeks(Pep8):
+    __slots__ = ("delta", "gamma", "vega", "theta", "rho")
+
+    def __init__(self, delta=0.0, gamma=0.0, vega=0.0, theta=0.0, rho=0.0):
+        self.delta = delta
+        self.gamma = gamma
+        self.vega = vega
+        self.theta = theta
+        self.rho = rho
+
+    @property
+    def theta_per_day(self):
+        return self.theta / 365.0
+
+
+class OptionContract(Pep8):
+    __slots__ = ("_chain", "_position", "symbol", "strike", "expiry", "right", "bid_price", "ask_price")
+
+    def __init__(self, chain, position, symbol, strike, expiry, right, bid_price, ask_price):
+        self._chain = chain
+        self._position = position
+        self.symbol = symbol
+        self.strike = strike
+        self.expiry = expiry
+        self.right = right
+        self.bid_price = bid_price
+        self.ask_price = ask_price
+
+    @property
+    def last_price(self):
+        return mid_price(self.bid_price, self.ask_price)
+
+    @property
+    def mid_price(self):
+        return mid_price(self.bid_price, self.ask_price)
+
+    @property
+    def underlying_symbol(self):
+        return self.symbol.underlying
+
+    @property
+    def underlying_last_price(self):
+        return self._chain.underlying.price
+
+    @property
+    def time(self):
+        return self._chain.time
+
+    @property
+    def open_interest(self):
+        return self._chain.open_interest_at(self._position)
+
+    @property
+    def implied_volatility(self):
+        return self._chain.greeks_at(self._position)[1]
+
+    @property
+    def greeks(self):
+        return self._chain.greeks_at(self._position)[0]
+
+    volume = bid_size = ask_size = 0
+
+    def __repr__(self):
+        return str(self.symbol)
+
+
+def mid_price(bid, ask):
+    if bid > 0 and ask > 0:
+        return (bid + ask) / 2
+    return max(bid, ask, 0.0)
+
+
+class OptionChain(Pep8):
+    """
+    One minute of one option universe: the filtered row numbers of a
+    chain_store.ChainStore. Contract objects are built only for the rows a
+    strategy touches (all of them when it iterates the chain), and greeks
+    for the whole chain on first use.
+
+    select() answers expiry/right/strike questions from the store's
+    columns, building contracts for the matching rows only.
+    """
+
+    def __init__(self, symbol, underlying, time, store, rows):
+        self.symbol = symbol
+        self.underlying = underlying
+        self.time = time
+        self.store = store
+        self.rows = rows
+        self._built = [None] * len(rows)
+        self._contracts = None
+        self._greeks = None
+
+    def __len__(self):
+        return len(self.rows)
+
+    def __iter__(self):
+        return iter(self.contracts.values())
+
+    @property
+    def strike(self):
+        return self.store.strike[self.rows]
+
+    @property
+    def expiry(self):
+        return self.store.expiry[self.rows]
+
+    @property
+    def right(self):
+        return self.store.right[self.rows]
+
+    @property
+    def bid(self):
+        return self.store.bid[self.rows]
+
+    @property
+    def ask(self):
+        return self.store.ask[self.rows]
+
+    @property
+    def contracts(self):
+        if self._contracts is None:
+            self._contracts = {c.symbol: c for c in self._contracts_at(range(len(self.rows)))}
+        return self._contracts
+
+    def select(self, expiry=None, right=None, min_strike=None, max_strike=None):
+        """Contracts with the given expiry (date or day number), right and strike bounds."""
+        keep = np.ones(len(self.rows), dtype=bool)
+        if expiry is not None:
+            keep &= self.expiry == (expiry if isinstance(expiry, int) else day_number_of(expiry))
+        if right is not None:
+            keep &= self.right == right
+        if min_strike is not None:
+            keep &= self.strike >= min_strike
+        if max_strike is not None:
+            keep &= self.strike <= max_strike
+        return self._contracts_at(np.flatnonzero(keep).tolist())
+
+    def _contracts_at(self, positions):
+        built = self._built
+        missing = [p for p in positions if built[p] is None]
+        if missing:
+            store = self.store
+            rows = self.rows[missing]
+            underlying = self.underlying.symbol
+            ticker = self.symbol.ticker
+            expiries = {}
+            for position, expiry, right, strike, bid, ask in zip(
+                missing, store.expiry[rows].tolist(), store.right[rows].tolist(), store.strike[rows].tolist(),
+                store.bid[rows].tolist(), store.ask[rows].tolist(),
+            ):
+                expiry_time = expiries.get(expiry)
+                if expiry_time is None:
+                    expiry_time = expiries[expiry] = datetime.combine(to_date(expiry), time())
+                symbol = Symbol.create_option(underlying, ticker, expiry, right, strike)
+                built[position] = OptionContract(self, position, symbol, strike, expiry_time, right, bid, ask)
+        return [built[p] for p in positions]
+
+    def open_interest_at(self, position):
+        if self.store.open_interest is None:
+            return 0.0
+        return float(self.store.open_interest[self.rows[position]])
+
+    def greeks_at(self, position):
+        if self._greeks is None:
+            self._greeks = self._solve_greeks()
+        greeks, iv = self._greeks
+        return greeks[position], iv[position]
+
+    def _solve_greeks(self):
+        """Implied vol from the mid quote, then Black-Scholes greeks, for every row."""
+        now = self.time
+        expiry, strike, bid, ask = self.expiry, self.strike, self.bid, self.ask
+        minutes_left = ((expiry.astype(np.int64) - (now.date() - EPOCH).days) * 1440
+                        + MARKET_CLOSE - (now.hour * 60 + now.minute))
+        t = np.maximum(minutes_left, 0) / (1440 * 365.0)
+        mid = np.where((bid > 0) & (ask > 0), (bid + ask) / 2, np.maximum(bid, ask))
+        is_call = self.right == OptionRight.CALL
+        spot = float(self.underlying.price)
+        iv, _ = implied_vol(mid, spot, strike, t, RISK_FREE_RATE, is_call)
+        values = black_scholes(spot, strike, t, RISK_FREE_RATE, iv)
+        delta = np.where(is_call, values.call_delta, values.put_delta)
+        if self.store.delta is not None:
+            quoted = self.store.delta[self.rows]
+            delta = np.where(np.isnan(quoted), delta, quoted)
+        theta = np.where(is_call, values.call_theta, values.put_theta)
+        columns = [np.nan_to_num(a).tolist() for a in (delta, values.gamma, values.vega, theta)]
+        greeks = [Greeks(*row) for row in zip(*columns)]
+        return greeks, np.nan_to_num(iv).tolist()
+
+
+def day_number_of(day):
+    """A date or datetime as a day number (see lib.market_data)."""
+    if isinstance(day, datetime):
+        day = day.date()
+    return (day - EPOCH).days
+
+
+class DataDictionary(dict, Pep8):
+    """dict keyed by Symbol with Lean's contains_key / get."""
+
+    def contains_key(self, symbol):
+        return symbol in self
+
+
+class OptionChains(DataDictionary):
+    """The slice's chains; each is built only when a strategy asks for it."""
+
+    def __init__(self, builders):
+        super().__init__()
+        self._builders = builders  # canonical symbol -> () -> OptionChain or None
+
+    def _build(self, symbol):
+        builder = self._builders.pop(symbol, None)
+        if builder is not None:
+            chain = builder()
+            if chain is not None and len(chain):
+                dict.__setitem__(self, symbol, chain)
+        return dict.get(self, symbol)
+
+    def get(self, symbol, default=None):
+        chain = self._build(symbol)
+        return default if chain is None else chain
+
+    def __getitem__(self, symbol):
+        chain = self._build(symbol)
+        if chain is None:
+            raise KeyError(f"no option chain for {symbol} in this slice")
+        return chain
+
+    def __contains__(self, symbol):
+        return self._build(symbol) is not None
+
+    def __len__(self):
+        self._build_all()
+        return dict.__len__(self)
+
+    def __iter__(self):
+        self._build_all()
+        return dict.__iter__(self)
+
+    def _build_all(self):
+        for symbol in list(self._builders):
+            self._build(symbol)
+
+    def keys(self):
+        self._build_all()
+        return dict.keys(self)
+
+    def values(self):
+        self._build_all()
+        return dict.values(self)
+
+    def items(self):
+        self._build_all()
+        return dict.items(self)
+
+
+class QuoteBars(DataDictionary):
+    """
+    The slice's option quote bars. A contract's bar is looked up (one binary
+    search) when a strategy asks for it; iterating builds them all.
+    """
+
+    def __init__(self, lookup=None, symbols=None):
+        super().__init__()
+        self._lookup = lookup  # contract symbol -> QuoteBar or None
+        self._symbols = symbols  # () -> every contract quoted this minute
+        self._complete = lookup is None
+
+    def _get(self, symbol):
+        bar = dict.get(self, symbol)
+        if bar is None and not self._complete and getattr(symbol, "expiry", None) is not None:
+            bar = self._lookup(symbol)
+            if bar is not None:
+                dict.__setitem__(self, symbol, bar)
+        return bar
+
+    def get(self, symbol, default=None):
+        bar = self._get(symbol)
+        return default if bar is None else bar
+
+    def __getitem__(self, symbol):
+        bar = self._get(symbol)
+        if bar is None:
+            raise KeyError(f"no quote bar for {symbol} in this slice")
+        return bar
+
+    def __contains__(self, symbol):
+        return self._get(symbol) is not None
+
+    contains_key = __contains__
+
+    def _build_all(self):
+        if not self._complete:
+            for symbol in self._symbols():
+                self._get(symbol)
+            self._complete = True
+
+    def __len__(self):
+        self._build_all()
+        return dict.__len__(self)
+
+    def __iter__(self):
+        self._build_all()
+        return dict.__iter__(self)
+
+    def keys(self):
+        self._build_all()
+        return dict.keys(self)
+
+    def values(self):
+        self._build_all()
+        return dict.values(self)
+
+    def items(self):
+        self._build_all()
+        return dict.items(self)
+
+
+class Slice(Pep8):
+    def __init__(self, time, bars, option_chains, quote_bars=None):
+        self.time = time
+        self.bars = bars
+        self.option_chains = option_chains
+        self.quote_bars = QuoteBars() if quote_bars is None else quote_bars
+        self.ticks = DataDictionary()
+
+    @property
+    def has_data(self):
+        return bool(self.bars) or bool(self.option_chains._builders) or bool(dict.__len__(self.option_chains))
+
+    def contains_key(self, symbol):
+        return symbol in self.bars or symbol in self.option_chains
+
+    __contains__ = contains_key
+
+    def get(self, symbol, default=None):
+        bar = self.bars.get(symbol)
+        return bar if bar is not None else self.option_chains.get(symbol, default)
+
+    def __getitem__(self, symbol):
+        value = self.get(symbol)
+        if value is None:
+            raise KeyError(f"{symbol} has no data in this slice")
+        return value
+
+
+class Leg(Pep8):
+    __slots__ = ("symbol", "quantity", "order_price")
+
+    def __init__(self, symbol, quantity, order_price=None):
+        self.symbol = symbol
+        self.quantity = quantity
+        self.order_price = order_price
+
+    @staticmethod
+    def create(symbol, quantity, order_price=None):
+        return Leg(symbol, quantity, order_price)
+
+
+class OrderTicket(Pep8):
+    def __init__(self, order_id, symbol, quantity, time, tag="", order_type=OrderType.MARKET):
+        self.order_id = order_id
+        self.symbol = symbol
+        self.quantity = quantity
+        self.time = time
+        self.tag = tag
+        self.order_type = order_type
+        self.status = OrderStatus.NEW
+        self.quantity_filled = 0
+        self.average_fill_price = 0.0
+        self.order_events = []
+
+    def __repr__(self):
+        return f"OrderTicket({self.order_id}, {self.symbol}, {self.quantity}, status={self.status})"
+
+
+class OrderEvent(Pep8):
+    def __init__(self, order_id, symbol, time, status, fill_price=0.0, fill_quantity=0,
+                 order_fee=0.0, message="", is_assignment=False):
+        self.order_id = order_id
+        self.symbol = symbol
+        self.utc_time = time
+        self.status = status
+        self.fill_price = fill_price
+        self.fill_quantity = fill_quantity
+        self.order_fee = order_fee
+        self.message = message
+        self.is_assignment = is_assignment
+        self.fill_price_currency = "USD"
+
+    @property
+    def quantity(self):
+        return self.fill_quantity
+
+    @property
+    def direction(self):
+        if self.fill_quantity > 0:
+            return OrderDirection.BUY
+        return OrderDirection.SELL if self.fill_quantity < 0 else OrderDirection.HOLD
+
+    def __repr__(self):
+        return (f"{self.utc_time} OrderID: {self.order_id} Symbol: {self.symbol} Status: {self.status} "
+                f"Quantity: {self.fill_quantity} FillPrice: {self.fill_price}")
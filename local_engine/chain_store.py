@@ -0,0 +1,186 @@
+"""
+Columnar option-chain snapshots for a trading day.
+
+A ChainStore holds one option ticker's quotes for a whole day as parallel
+arrays (struct of arrays): minute, expiry, right, strike, bid, ask and,
+when the data has them, delta and open_interest. Rows are sorted by
+(minute, expiry, right, strike), and two offset tables index them:
+
+    minute_offsets[m]:minute_offsets[m + 1]    rows of minute m
+    group_offsets[g]:group_offsets[g + 1]      rows of group g, one group
+                                               per (minute, expiry, right)
+    minute_groups[m]:minute_groups[m + 1]      groups of minute m
+
+So "puts expiring today between 5700 and 5800 at 10:15" is two binary
+searches over a few dozen groups and strikes, and the answer is a slice of
+the day's arrays; nothing is copied or allocated per contract.
+
+A 400-strike SPXW 0DTE day (312,000 rows) is about 9 MB.
+"""
+import numpy as np
+
+MINUTES_PER_DAY = 1440
+
+
+class ChainSnapshot:
+    """One minute of a ChainStore: a window over its group table."""
+
+    __slots__ = ("store", "minute", "first_group", "last_group")
+
+    def __init__(self, store, minute):
+        self.store = store
+        self.minute = minute
+        self.first_group = int(store.minute_groups[minute])
+        self.last_group = int(store.minute_groups[minute + 1])
+
+    def __len__(self):
+        offsets = self.store.group_offsets
+        return int(offsets[self.last_group] - offsets[self.first_group])
+
+    @property
+    def rows(self):
+        """(first, end) rows of the whole snapshot."""
+        offsets = self.store.group_offsets
+        return int(offsets[self.first_group]), int(offsets[self.last_group])
+
+    def groups(self):
+        """(expiry, right, first row, end row) arrays of this minute's groups."""
+        store = self.store
+        g = slice(self.first_group, self.last_group)
+        return (store.group_expiry[g], store.group_right[g],
+                store.group_offsets[self.first_group:self.last_group],
+                store.group_offsets[self.first_group + 1:self.last_group + 1])
+
+    def expiries(self):
+        return np.unique(self.store.group_expiry[self.first_group:self.last_group])
+
+    def group(self, expiry, right):
+        """Group number of (expiry, right) at this minute, or -1."""
+        return self.store.group(self.minute, expiry, right)
+
+    def strike_range(self, expiry, right, low=-np.inf, high=np.inf):
+        """(first, end) rows of (expiry, right) with low <= strike <= high."""
+        return self.store.strike_range(self.minute, expiry, right, low, high)
+
+    def find(self, expiry, right, strike):
+        """Row of one contract, or -1."""
+        return self.store.find(self.minute, expiry, right, strike)
+
+    def group_mask(self, min_expiry=None, max_expiry=None, right=None):
+        """Which of this minute's groups fall within the given bounds."""
+        expiry, group_right, _, _ = self.groups()
+        keep = np.ones(len(expiry), dtype=bool)
+        if min_expiry is not None:
+            keep &= expiry >= min_expiry
+        if max_expiry is not None:
+            keep &= expiry <= max_expiry
+        if right is not None:
+            keep &= group_right == right
+        return keep
+
+    def strikes_in(self, group_mask):
+        """Sorted unique strikes of the selected groups."""
+        _, _, firsts, ends = self.groups()
+        strike = self.store.strike
+        parts = [strike[f:e] for f, e in zip(firsts[group_mask].tolist(), ends[group_mask].tolist())]
+        return np.unique(np.concatenate(parts)) if parts else np.empty(0)
+
+    def rows_in(self, group_mask, low=-np.inf, high=np.inf):
+        """Rows of the selected groups with low <= strike <= high, in (expiry, right, strike) order."""
+        _, _, firsts, ends = self.groups()
+        strike = self.store.strike
+        ranges = []
+        for first, end in zip(firsts[group_mask].tolist(), ends[group_mask].tolist()):
+            strikes = strike[first:end]
+            ranges.append(np.arange(first + int(strikes.searchsorted(low, "left")),
+                                    first + int(strikes.searchsorted(high, "right"))))
+        return np.concatenate(ranges) if ranges else np.empty(0, dtype=np.int64)
+
+    def select(self, min_expiry=None, max_expiry=None, right=None, low=-np.inf, high=np.inf):
+        """Row numbers matching every given bound."""
+        return self.rows_in(self.group_mask(min_expiry, max_expiry, right), low, high)
+
+
+class ChainStore:
+    """A day of option quotes for one ticker, sorted and indexed by minute and (expiry, right)."""
+
+    def __init__(self, minute, expiry, right, strike, bid, ask, delta=None, open_interest=None):
+        self.minute = np.asarray(minute, dtype=np.int16)
+        self.expiry = np.asarray(expiry, dtype=np.int32)
+        self.right = np.asarray(right, dtype=np.int8)
+        self.strike = np.asarray(strike, dtype=np.float64)
+        self.bid = np.asarray(bid, dtype=np.float64)
+        self.ask = np.asarray(ask, dtype=np.float64)
+        self.delta = None if delta is None else np.asarray(delta, dtype=np.float64)
+        self.open_interest = None if open_interest is None else np.asarray(open_interest, dtype=np.float64)
+
+        n = len(self.minute)
+        self.minute_offsets = np.searchsorted(self.minute, np.arange(MINUTES_PER_DAY + 1)).astype(np.int64)
+        if n:
+            starts = np.flatnonzero(
+                (self.minute[1:] != self.minute[:-1])
+                | (self.expiry[1:] != self.expiry[:-1])
+                | (self.right[1:] != self.right[:-1])
+            ) + 1
+            starts = np.concatenate(([0], starts))
+        else:
+            starts = np.empty(0, dtype=np.int64)
+        self.group_offsets = np.append(starts, n).astype(np.int64)
+        self.group_expiry = self.expiry[starts]
+        self.group_right = self.right[starts]
+        self.group_key = self.group_expiry.astype(np.int64) * 2 + self.group_right
+        self.minute_groups = np.searchsorted(self.minute[starts], np.arange(MINUTES_PER_DAY + 1)).astype(np.int64)
+
+    @classmethod
+    def from_unsorted(cls, **columns):
+        order = np.lexsort((columns["strike"], columns["right"], columns["expiry"], columns["minute"]))
+        return cls(**{name: None if values is None else np.asarray(values)[order]
+                      for name, values in columns.items()})
+
+    def __len__(self):
+        return len(self.minute)
+
+    @property
+    def nbytes(self):
+        arrays = (self.minute, self.expiry, self.right, self.strike, self.bid, self.ask, self.delta,
+                  self.open_interest, self.minute_offsets, self.group_offsets, self.group_expiry,
+                  self.group_right, self.group_key, self.minute_groups)
+        return sum(a.nbytes for a in arrays if a is not None)
+
+    def has_minute(self, minute):
+        return self.minute_groups[minute + 1] > self.minute_groups[minute]
+
+    def minutes(self):
+        """Minutes of the day that have quotes."""
+        return np.flatnonzero(np.diff(self.minute_groups))
+
+    def snapshot(self, minute):
+        return ChainSnapshot(self, minute)
+
+    def group(self, minute, expiry, right):
+        """Group number of (expiry, right) at `minute`, or -1."""
+        first = int(self.minute_groups[minute])
+        keys = self.group_key[first:int(self.minute_groups[minute + 1])]
+        key = int(expiry) * 2 + int(right)
+        i = int(keys.searchsorted(key))
+        if i < len(keys) and keys[i] == key:
+            return first + i
+        return -1
+
+    def strike_range(self, minute, expiry, right, low=-np.inf, high=np.inf):
+        """(first, end) rows of (expiry, right) at `minute` with low <= strike <= high."""
+        g = self.group(minute, expiry, right)
+        if g < 0:
+            return 0, 0
+        first, end = int(self.group_offsets[g]), int(self.group_offsets[g + 1])
+        strikes = self.strike[first:end]
+        return first + int(strikes.searchsorted(low, "left")), first + int(strikes.searchsorted(high, "right"))
+
+    def find(self, minute, expiry, right, strike):
+        """Row of one contract at `minute`, or -1."""
+        first, end = self.strike_range(minute, expiry, right, strike, strike)
+        return first if end > first else -1
+
+    def columns(self):
+        names = ("minute", "expiry", "right", "strike", "bid", "ask", "delta", "open_interest")
+        return {name: getattr(self, name) for name in names if getattr(self, name) is not None}
@@ -0,0 +1,175 @@
+"""
+Local minute data for the replay engine.
+
+One file per ticker per day in the lib.column_cache format, so a day is
+memory-mapped as a handful of aligned columns rather than parsed:
+
+    <root>/<TICKER>/minute/YYYYMMDD.cols    underlying bars
+        minute   int16   minute of day of the bar's END (9:31 -> 571)
+        open, high, low, close, volume   float64
+
+    <root>/<OPTION TICKER>/option/YYYYMMDD.cols    option quotes
+        minute   int16   as above
+        expiry   int32   lib.market_data day number
+        right    int8    0 call, 1 put (OptionRight values)
+        strike, bid, ask   float64
+        delta, open_interest   float64, optional
+
+Quote rows are stored sorted by (minute, expiry, right, strike) and load as
+a chain_store.ChainStore. Index options use the option ticker ("SPXW"),
+equity options the underlying's ("SPY").
+
+The import_*_csv helpers split CSV exports into this layout.
+"""
+import csv
+import os
+from datetime import datetime
+
+import numpy as np
+
+from lib.column_cache import map_columns, write_columns
+from lib.market_data import day_number
+from local_engine.chain_store import MINUTES_PER_DAY, ChainStore
+
+BAR_FIELDS = ("open", "high", "low", "close", "volume")
+QUOTE_FIELDS = ("strike", "bid", "ask")
+OPTIONAL_QUOTE_FIELDS = ("delta", "open_interest")
+
+
+def _day_file(root, ticker, kind, day):
+    return os.path.join(root, ticker.upper(), kind, f"{day:%Y%m%d}.cols")
+
+
+def available_days(root, ticker, kind="minute"):
+    """Sorted dates that have a `kind` file for `ticker`."""
+    directory = os.path.join(root, ticker.upper(), kind)
+    if not os.path.isdir(directory):
+        return []
+    days = []
+    for name in os.listdir(directory):
+        stem, ext = os.path.splitext(name)
+        if ext == ".cols" and len(stem) == 8 and stem.isdigit():
+            days.append(datetime.strptime(stem, "%Y%m%d").date())
+    return sorted(days)
+
+
+class MinuteBars:
+    """One day of underlying bars, indexable by minute of day."""
+
+    def __init__(self, minute, open, high, low, close, volume):
+        self.minute = np.asarray(minute, dtype=np.int16)
+        self.open = np.asarray(open, dtype=np.float64)
+        self.high = np.asarray(high, dtype=np.float64)
+        self.low = np.asarray(low, dtype=np.float64)
+        self.close = np.asarray(close, dtype=np.float64)
+        self.volume = np.asarray(volume, dtype=np.float64)
+        # Row of the bar ending at each minute, -1 where there is none.
+        self.row_at = np.full(MINUTES_PER_DAY + 1, -1, dtype=np.int32)
+        self.row_at[self.minute] = np.arange(len(self.minute), dtype=np.int32)
+
+    def __len__(self):
+        return len(self.minute)
+
+    def daily(self):
+        """(open, high, low, close, volume) of the whole day."""
+        return (float(self.open[0]), float(self.high.max()), float(self.low.min()),
+                float(self.close[-1]), float(self.volume.sum()))
+
+
+def write_minute_bars(root, ticker, day, **columns):
+    bars = MinuteBars(**{name: columns[name] for name in ("minute", *BAR_FIELDS)})
+    order = np.argsort(bars.minute, kind="stable")
+    write_columns(_day_file(root, ticker, "minute", day),
+                  {name: getattr(bars, name)[order] for name in ("minute", *BAR_FIELDS)})
+
+
+def write_option_quotes(root, ticker, day, **columns):
+    names = ("minute", "expiry", "right", *QUOTE_FIELDS, *OPTIONAL_QUOTE_FIELDS)
+    store = ChainStore.from_unsorted(**{name: columns.get(name) for name in names})
+    write_columns(_day_file(root, ticker, "option", day), store.columns())
+
+
+def load_minute_bars(root, ticker, day):
+    path = _day_file(root, ticker, "minute", day)
+    if not os.path.exists(path):
+        return None
+    columns, _ = map_columns(path)
+    return MinuteBars(**columns)
+
+
+def load_minute_history(root, ticker, start=None, end=None):
+    """
+    Every minute bar of `ticker` between `start` and `end` (inclusive) as
+    flat columns sorted by (day, minute); `day` holds lib.market_data day
+    numbers.
+    """
+    parts = []
+    for day in available_days(root, ticker):
+        if (start is None or day >= start) and (end is None or day <= end):
+            bars = load_minute_bars(root, ticker, day)
+            if len(bars):
+                parts.append((day_number(day), bars))
+    columns = {"day": np.concatenate([np.full(len(bars), number, dtype=np.int64) for number, bars in parts])
+               if parts else np.empty(0, dtype=np.int64)}
+    for name in ("minute", *BAR_FIELDS):
+        columns[name] = (np.concatenate([getattr(bars, name) for _, bars in parts]) if parts
+                         else np.empty(0, dtype=np.int16 if name == "minute" else np.float64))
+    return columns
+
+
+def load_option_quotes(root, ticker, day):
+    """The day's ChainStore, mapped from disk; None when there is no file."""
+    path = _day_file(root, ticker, "option", day)
+    if not os.path.exists(path):
+        return None
+    columns, _ = map_columns(path)
+    return ChainStore(**columns)
+
+
+def _minute_of_day(timestamp):
+    return timestamp.hour * 60 + timestamp.minute
+
+
+def import_minute_csv(path, root, ticker):
+    """Split a 'time,open,high,low,close,volume' CSV (bar end times) into day files."""
+    by_day = {}
+    with open(path, newline="") as f:
+        for row in csv.DictReader(f):
+            stamp = datetime.fromisoformat(row["time"])
+            by_day.setdefault(stamp.date(), []).append(
+                (_minute_of_day(stamp), *(float(row[name]) for name in BAR_FIELDS))
+            )
+    for day, rows in by_day.items():
+        columns = np.array(rows, dtype=np.float64).T
+        write_minute_bars(root, ticker, day, minute=columns[0].astype(np.int16),
+                          **dict(zip(BAR_FIELDS, columns[1:])))
+    return sorted(by_day)
+
+
+def import_option_csv(path, root, ticker):
+    """
+    Split a 'time,expiry,right,strike,bid,ask[,delta,open_interest]' CSV into
+    day files; right is C/P (or call/put), expiry YYYY-MM-DD.
+    """
+    by_day = {}
+    with open(path, newline="") as f:
+        reader = csv.DictReader(f)
+        optional = [name for name in OPTIONAL_QUOTE_FIELDS if name in reader.fieldnames]
+        for row in reader:
+            stamp = datetime.fromisoformat(row["time"])
+            right = 0 if row["right"].strip().upper().startswith("C") else 1
+            by_day.setdefault(stamp.date(), []).append((
+                _minute_of_day(stamp), day_number(row["expiry"]), right,
+                float(row["strike"]), float(row["bid"]), float(row["ask"]),
+                *(float(row[name]) for name in optional),
+            ))
+    for day, rows in by_day.items():
+        columns = np.array(rows, dtype=np.float64).T
+        extra = dict(zip(optional, columns[6:]))
+        write_option_quotes(
+            root, ticker, day,
+            minute=columns[0].astype(np.int16), expiry=columns[1].astype(np.int32),
+            right=columns[2].astype(np.int8), strike=columns[3], bid=columns[4], ask=columns[5],
+            **extra,
+        )
+    return sorted(by_day)
@@ -0,0 +1,522 @@
+"""
+Event-driven minute-bar replay of a QCAlgorithm over local data files.
+
+Each trading day (a day with a minute file for the first equity or index
+the algorithm adds) loads its bars and option quotes from local_engine.data
+and walks the union of bar minutes, quote minutes and scheduled-event
+minutes. At each minute:
+
+    1. equity/index securities take the bar ending at that minute;
+    2. scheduled events due at that minute fire;
+    3. consolidators receive the new bars (or notice a window has passed);
+    4. on_data(slice) runs if anything arrived.
+
+Option chains and option-contract quotes are looked up only when the
+strategy asks for them. After the last minute OnEndOfDay runs, then
+expiring options settle: index options in cash, equity options by
+exercise/assignment into shares.
+
+Fills are immediate and whole: buys at the ask, sells at the bid (bar
+securities at the close); an order on a security without a quote is
+INVALID. There is no margin model and no fee unless fee_per_contract is set.
+"""
+import bisect
+import importlib.machinery
+import importlib.util
+import inspect
+import os
+import sys
+import time as timer
+from dataclasses import dataclass, field
+from datetime import datetime, time, timedelta
+
+import numpy as np
+
+from lib.market_data import day_number
+from local_engine import data
+from local_engine.algorithm import Option, QCAlgorithm
+from local_engine.api import (
+    DataDictionary, OptionChain, OptionChains, OptionRight, OrderEvent, OrderStatus, OrderTicket,
+    OrderType, QuoteBar, QuoteBars, Resolution, SecurityType, Slice, Symbol, TradeBar,
+)
+
+MINUTE = timedelta(minutes=1)
+OFFSETS = [timedelta(minutes=m) for m in range(data.MINUTES_PER_DAY)]
+SESSION_START = time(9, 30)
+SESSION_LENGTH = timedelta(hours=6, minutes=30)
+SHIM_DIR = os.path.join(os.path.dirname(__file__), "shim")
+
+
+def _callback(algorithm, name):
+    """The algorithm's handler under its snake_case or PascalCase name, or None."""
+    pascal = "".join(part.capitalize() for part in name.split("_"))
+    for attribute in (name, pascal):
+        if getattr(type(algorithm), attribute, None) is not None:
+            return getattr(algorithm, attribute)
+    return None
+
+
+def _name(callback):
+    return getattr(callback, "__name__", None) or type(callback).__name__
+
+
+@dataclass
+class BacktestResult:
+    statistics: dict
+    summary_statistics: dict
+    equity: list  # (date, total portfolio value) at each day's close
+    orders: list
+    logs: list
+    charts: dict = field(default_factory=dict)
+    algorithm: object = None  # the finished algorithm instance, for its own records
+
+
+class Engine:
+    def __init__(self, algorithm_class, data_root, start=None, end=None, fee_per_contract=0.0, echo=False,
+                 profiler=None):
+        self.algorithm_class = algorithm_class
+        self.data_root = data_root
+        self.start = start
+        self.end = end
+        self.fee_per_contract = fee_per_contract
+        self.echo = echo
+        self.profiler = profiler  # lib.profiling.CallbackProfiler, wired in after initialize
+
+        self.algorithm = None
+        self.stamp = 0  # bumped every time step; option quotes refresh against it
+        self.minute = 0
+        self.today = None
+        self.today_number = None
+        self.logs = []
+        self.orders = []
+        self.charts = {}
+        self.equity = []
+
+        self._order_id = 0
+        self._bars = {}  # security -> MinuteBars for today
+        self._quotes = {}  # option ticker -> today's ChainStore
+        self._options = {}  # option ticker -> Option subscription
+        self._days = {}  # ticker -> sorted available days
+        self._daily = {}  # (ticker, day) -> (open, high, low, close, volume)
+        self._rule_days = {}
+
+    # Running.
+
+    def run(self):
+        started = timer.perf_counter()
+        algorithm = self.algorithm = self.algorithm_class()
+        algorithm._engine = self
+        _callback(algorithm, "initialize")()
+        if self.profiler is not None:
+            self._instrument(algorithm, self.profiler)
+
+        start = self.start or algorithm.start_date
+        end = self.end or algorithm.end_date
+        starting_cash = algorithm.portfolio.cash
+
+        securities = list(algorithm.securities.values())
+        feeds = [s for s in securities if not isinstance(s, Option) and s.symbol.expiry is None]
+        if not feeds:
+            raise ValueError("the algorithm must add at least one equity or index")
+        self._options = {s.symbol.ticker: s for s in securities if isinstance(s, Option)}
+        trading_days = [d for d in self._available(feeds[0].symbol.value) if start <= d <= end]
+
+        on_data = _callback(algorithm, "on_data")
+        on_end_of_day = _callback(algorithm, "on_end_of_day")
+        per_symbol = on_end_of_day is not None and len(inspect.signature(on_end_of_day).parameters) > 0
+
+        for day in trading_days:
+            self._run_day(day, feeds, trading_days, on_data)
+            if on_end_of_day is not None:
+                if per_symbol:
+                    for security in feeds:
+                        on_end_of_day(security.symbol)
+                else:
+                    on_end_of_day()
+            self._settle_expiring()
+            self.equity.append((day, algorithm.portfolio.total_portfolio_value))
+
+        on_end = _callback(algorithm, "on_end_of_algorithm")
+        if on_end is not None:
+            on_end()
+        if self.profiler is not None:
+            self.profiler.emit(self.log)
+
+        elapsed = timer.perf_counter() - started
+        return BacktestResult(
+            statistics=self._statistics(start, starting_cash, len(trading_days), elapsed),
+            summary_statistics=dict(algorithm.summary_statistics),
+            equity=self.equity,
+            orders=self.orders,
+            logs=self.logs,
+            charts=self.charts,
+            algorithm=algorithm,
+        )
+
+    @staticmethod
+    def _instrument(algorithm, profiler):
+        """Wrap the callbacks registered in initialize: handlers, scheduled events, consolidators."""
+        profiler.instrument(algorithm)
+        for event in algorithm.schedule.events:
+            event.callback = profiler.wrap(f"scheduled {_name(event.callback)}", event.callback)
+        for consolidators in algorithm.subscription_manager.consolidators.values():
+            for consolidator in consolidators:
+                handlers = consolidator.data_consolidated._handlers
+                handlers[:] = [profiler.wrap(f"consolidated {_name(handler)}", handler) for handler in handlers]
+
+    def _run_day(self, day, feeds, trading_days, on_data):
+        algorithm = self.algorithm
+        self.today = day
+        self.today_number = day_number(day)
+        midnight = datetime.combine(day, time())
+
+        self._bars = {}
+        minutes = set()
+        for security in feeds:
+            bars = data.load_minute_bars(self.data_root, security.symbol.value, day)
+            if bars is not None:
+                self._bars[security] = bars
+                minutes.update(bars.minute.tolist())
+        self._quotes = {}
+        for ticker in self._options:
+            quotes = data.load_option_quotes(self.data_root, ticker, day)
+            if quotes is not None:
+                self._quotes[ticker] = quotes
+                minutes.update(quotes.minutes().tolist())
+
+        scheduled = {}
+        for event in algorithm.schedule.events:
+            if event.enabled and day in self._event_days(event, trading_days):
+                for minute in event.time_rule.minutes:
+                    scheduled.setdefault(minute, []).append(event.callback)
+        minutes.update(scheduled)
+
+        bar_feeds = [
+            (security, day_bars.row_at.tolist(), list(zip(day_bars.open.tolist(), day_bars.high.tolist(),
+                                                day_bars.low.tolist(), day_bars.close.tolist(),
+                                                day_bars.volume.tolist())))
+            for security, day_bars in self._bars.items()
+        ]
+        consolidators = algorithm.subscription_manager.consolidators
+        for minute in sorted(minutes):
+            now = midnight + OFFSETS[minute]
+            algorithm.time = now
+            self.minute = minute
+            self.stamp += 1
+
+            bars = DataDictionary()
+            for security, row_at, values in bar_feeds:
+                row = row_at[minute]
+                if row >= 0:
+                    bar = TradeBar(now - MINUTE, security.symbol, *values[row])
+                    security.update(bar)
+                    bars[security.symbol] = bar
+            builders = {}
+            for ticker, quotes in self._quotes.items():
+                if quotes.has_minute(minute):
+                    builders[self._options[ticker].symbol] = self._chain_builder(ticker, quotes, minute, now)
+            quote_bars = QuoteBars(self._quote_bar, self._quoted_symbols) if builders else QuoteBars()
+            current = algorithm.current_slice = Slice(now, bars, OptionChains(builders), quote_bars)
+            has_data = bool(bars) or bool(builders)
+
+            for callback in scheduled.get(minute, ()):
+                callback()
+            for symbol, handlers in consolidators.items():
+                bar = bars.get(symbol)
+                for consolidator in handlers:
+                    if bar is not None:
+                        consolidator.update(bar)
+                    else:
+                        consolidator.scan(now)
+            if has_data and on_data is not None:
+                on_data(current)
+
+        for security, day_bars in self._bars.items():
+            if len(day_bars):
+                self._daily[(security.symbol.value, day)] = day_bars.daily()
+
+    def _event_days(self, event, trading_days):
+        days = self._rule_days.get(id(event))
+        if days is None:
+            days = self._rule_days[id(event)] = event.date_rule.days(trading_days)
+        return days
+
+    def _available(self, ticker):
+        days = self._days.get(ticker)
+        if days is None:
+            days = self._days[ticker] = data.available_days(self.data_root, ticker)
+        return days
+
+    # Option data.
+
+    def _chain_builder(self, ticker, quotes, minute, now):
+        option = self._options[ticker]
+
+        def build():
+            underlying = self.algorithm.securities[option.symbol.underlying]
+            rows = option.universe.rows(quotes.snapshot(minute), self.today_number, underlying.price,
+                                        all_weeklys=ticker != underlying.symbol.value)
+            return OptionChain(option.symbol, underlying, now, quotes, rows)
+
+        return build
+
+    def quote(self, symbol):
+        """(bid, ask) of an option contract at the current minute, or None."""
+        quotes = self._quotes.get(symbol.ticker)
+        if quotes is None:
+            return None
+        row = quotes.find(self.minute, symbol.expiry, symbol.right, symbol.strike)
+        if row < 0:
+            return None
+        return float(quotes.bid[row]), float(quotes.ask[row])
+
+    def _quote_bar(self, symbol):
+        quote = self.quote(symbol)
+        if quote is None:
+            return None
+        return QuoteBar(self.algorithm.time - MINUTE, symbol, *quote)
+
+    def _quoted_symbols(self):
+        """Every contract with a quote at the current minute."""
+        symbols = []
+        for ticker, quotes in self._quotes.items():
+            underlying = self._options[ticker].symbol.underlying
+            rows = slice(int(quotes.minute_offsets[self.minute]), int(quotes.minute_offsets[self.minute + 1]))
+            for expiry, right, strike in zip(quotes.expiry[rows].tolist(), quotes.right[rows].tolist(),
+                                             quotes.strike[rows].tolist()):
+                symbols.append(Symbol.create_option(underlying, ticker, expiry, right, strike))
+        return symbols
+
+    # History.
+
+    def history(self, symbol, periods, resolution=None):
+        security = self.algorithm.securities[symbol]
+        ticker = security.symbol.value
+        resolution = security.resolution if resolution is None else resolution
+        if isinstance(periods, timedelta):
+            periods = max(periods.days, 1) if resolution == Resolution.DAILY else int(periods.total_seconds() // 60)
+
+        if resolution == Resolution.DAILY:
+            days = self._available(ticker)
+            days = days[max(bisect.bisect_left(days, self.today) - periods, 0):bisect.bisect_left(days, self.today)]
+            bars = []
+            for day in days:
+                values = self._daily.get((ticker, day))
+                if values is None:
+                    day_bars = data.load_minute_bars(self.data_root, ticker, day)
+                    if day_bars is None or not len(day_bars):
+                        continue
+                    values = self._daily[(ticker, day)] = day_bars.daily()
+                bars.append(TradeBar(datetime.combine(day, SESSION_START), security.symbol, *values,
+                                     period=SESSION_LENGTH))
+            return bars
+
+        bars = []
+        days = self._available(ticker)
+        for day in reversed(days[:bisect.bisect_right(days, self.today)]):
+            day_bars = self._bars.get(security) if day == self.today else None
+            if day_bars is None:
+                day_bars = data.load_minute_bars(self.data_root, ticker, day)
+            if day_bars is None:
+                continue
+            midnight = datetime.combine(day, time())
+            rows = range(len(day_bars))
+            if day == self.today:
+                rows = range(int(np.searchsorted(day_bars.minute, self.minute, side="right")))
+            day_list = [
+                TradeBar(midnight + OFFSETS[int(day_bars.minute[i])] - MINUTE, security.symbol,
+                         float(day_bars.open[i]), float(day_bars.high[i]), float(day_bars.low[i]),
+                         float(day_bars.close[i]), float(day_bars.volume[i]))
+                for i in rows
+            ]
+            bars[:0] = day_list
+            if len(bars) >= periods:
+                break
+        return bars[-periods:] if periods else []
+
+    # Orders.
+
+    def _ticket(self, symbol, quantity, tag, order_type=OrderType.MARKET):
+        self._order_id += 1
+        return OrderTicket(self._order_id, symbol, quantity, self.algorithm.time, tag, order_type)
+
+    def market_order(self, symbol, quantity, tag=""):
+        security = self.algorithm.securities[symbol]
+        ticket = self._ticket(security.symbol, quantity, tag)
+        if quantity == 0 or not security.is_tradable or not security.has_data:
+            self._invalid(ticket, "no quote" if quantity else "zero quantity")
+        else:
+            self._fill(ticket, security, quantity, self._fill_price(security, quantity))
+        return ticket
+
+    def combo_market_order(self, legs, quantity, tag=""):
+        """All legs fill at their own bid/ask, or all are INVALID."""
+        securities = [self.algorithm.securities[leg.symbol] for leg in legs]
+        tickets = [
+            self._ticket(security.symbol, leg.quantity * quantity, tag, OrderType.COMBO_MARKET)
+            for leg, security in zip(legs, securities)
+        ]
+        if quantity == 0 or not all(s.is_tradable and s.has_data for s in securities):
+            for ticket in tickets:
+                self._invalid(ticket, "a leg has no quote" if quantity else "zero quantity")
+            return tickets
+        for ticket, security in zip(tickets, securities):
+            self._fill(ticket, security, ticket.quantity, self._fill_price(security, ticket.quantity))
+        return tickets
+
+    @staticmethod
+    def _fill_price(security, quantity):
+        if quantity > 0:
+            return security.ask_price if security.ask_price > 0 else security.price
+        return security.bid_price
+
+    def _fee(self, security, quantity):
+        if security.symbol.expiry is None:
+            return 0.0
+        return self.fee_per_contract * abs(quantity)
+
+    def _fill(self, ticket, security, quantity, price, message="", is_assignment=False, fee=None):
+        portfolio = self.algorithm.portfolio
+        holding = security.holdings
+        multiplier = security.multiplier
+        fee = self._fee(security, quantity) if fee is None else fee
+
+        old = holding.quantity
+        new = old + quantity
+        if old == 0 or (old > 0) == (quantity > 0):
+            holding.average_price = (old * holding.average_price + quantity * price) / new
+        else:
+            closed = min(abs(quantity), abs(old)) * (1 if old > 0 else -1)
+            holding.net_profit += closed * (price - holding.average_price) * multiplier
+            if new == 0:
+                holding.average_price = 0.0
+            elif (new > 0) != (old > 0):
+                holding.average_price = price
+        holding.quantity = new
+        holding.net_profit -= fee
+        holding.total_fees += fee
+        portfolio.cash -= quantity * price * multiplier + fee
+        portfolio.total_fees += fee
+        if new == 0:
+            portfolio.open.pop(security.symbol, None)
+        else:
+            portfolio.open[security.symbol] = holding
+
+        ticket.status = OrderStatus.FILLED
+        ticket.quantity_filled = quantity
+        ticket.average_fill_price = price
+        self.orders.append({
+            "id": ticket.order_id, "time": ticket.time, "symbol": str(security.symbol), "quantity": quantity,
+            "price": price, "fee": fee, "type": ticket.order_type, "status": OrderStatus.FILLED,
+            "tag": ticket.tag or message,
+        })
+        self._order_event(ticket, OrderEvent(ticket.order_id, security.symbol, ticket.time, OrderStatus.FILLED,
+                                             price, quantity, fee, message, is_assignment))
+
+    def _invalid(self, ticket, message):
+        ticket.status = OrderStatus.INVALID
+        self.orders.append({
+            "id": ticket.order_id, "time": ticket.time, "symbol": str(ticket.symbol), "quantity": ticket.quantity,
+            "price": 0.0, "fee": 0.0, "type": ticket.order_type, "status": OrderStatus.INVALID, "tag": ticket.tag,
+        })
+        self._order_event(ticket, OrderEvent(ticket.order_id, ticket.symbol, ticket.time, OrderStatus.INVALID,
+                                             message=message))
+
+    def _order_event(self, ticket, event):
+        ticket.order_events.append(event)
+        handler = _callback(self.algorithm, "on_order_event")
+        if handler is not None:
+            handler(event)
+        if event.is_assignment:
+            handler = _callback(self.algorithm, "on_assignment_order_event")
+            if handler is not None:
+                handler(event)
+
+    def _settle_expiring(self):
+        """Expire today's (or older) option positions at the underlying's close."""
+        securities = self.algorithm.securities
+        for holding in list(self.algorithm.portfolio.open.values()):
+            symbol = holding.symbol
+            if symbol.expiry is None or symbol.expiry > self.today_number:
+                continue
+            underlying = securities[symbol.underlying]
+            spot = underlying.price
+            if symbol.right == OptionRight.CALL:
+                intrinsic = max(spot - symbol.strike, 0.0)
+            else:
+                intrinsic = max(symbol.strike - spot, 0.0)
+            quantity = holding.quantity
+            assigned = quantity < 0 and intrinsic > 0
+            message = "Assignment" if assigned else "Automatic Exercise" if intrinsic > 0 else "OTM expiry"
+            ticket = self._ticket(symbol, -quantity, message, OrderType.OPTION_EXERCISE)
+
+            if intrinsic > 0 and symbol.security_type == SecurityType.OPTION:
+                # Physical delivery: the option leaves at zero, shares move at the strike.
+                self._fill(ticket, holding.security, -quantity, 0.0, message, assigned, fee=0.0)
+                shares = quantity * holding.security.multiplier * (1 if symbol.right == OptionRight.CALL else -1)
+                delivery = self._ticket(underlying.symbol, shares, message, OrderType.OPTION_EXERCISE)
+                self._fill(delivery, underlying, shares, symbol.strike, message, assigned, fee=0.0)
+            else:
+                self._fill(ticket, holding.security, -quantity, intrinsic, message, assigned, fee=0.0)
+
+    # Output.
+
+    def log(self, message):
+        line = f"{self.algorithm.time:%Y-%m-%d %H:%M:%S} {message}"
+        self.logs.append(line)
+        if self.echo:
+            print(line)
+
+    def plot(self, chart, series, value=None):
+        if value is None:  # plot(series, value)
+            series, value = chart, series
+        self.charts.setdefault(chart, {}).setdefault(series, []).append((self.algorithm.time, float(value)))
+
+    def _statistics(self, start, starting_cash, days, elapsed):
+        values = np.array([starting_cash] + [value for _, value in self.equity], dtype=np.float64)
+        peak = np.maximum.accumulate(values)
+        drawdown = float(np.max(1 - values / np.where(peak > 0, peak, 1)))
+        ending = float(values[-1])
+        years = ((self.equity[-1][0] - start).days + 1) / 365.25 if self.equity else 0.0
+        cagr = (ending / starting_cash) ** (1 / years) - 1 if years > 0 and starting_cash > 0 and ending > 0 else 0.0
+        filled = [order for order in self.orders if order["status"] == OrderStatus.FILLED]
+        return {
+            "Trading Days": days,
+            "Total Orders": len(filled),
+            "Start Equity": float(starting_cash),
+            "End Equity": ending,
+            "Net Profit": ending / starting_cash - 1 if starting_cash else 0.0,
+            "Compounding Annual Return": cagr,
+            "Drawdown": drawdown,
+            "Total Fees": float(self.algorithm.portfolio.total_fees),
+            "Runtime Seconds": elapsed,
+        }
+
+
+def load_algorithm(path, class_name=None):
+    """
+    Import a strategy file against the AlgorithmImports/QuantConnect shims and
+    return its QCAlgorithm subclass (the only one, or `class_name`). Any file
+    extension works: zero_dte_iron_condor.rb is Python.
+    """
+    if SHIM_DIR not in sys.path:
+        sys.path.insert(0, SHIM_DIR)
+    name = os.path.splitext(os.path.basename(path))[0]
+    loader = importlib.machinery.SourceFileLoader(name, path)
+    module = importlib.util.module_from_spec(importlib.util.spec_from_loader(name, loader))
+    loader.exec_module(module)
+
+    classes = [
+        value for value in vars(module).values()
+        if isinstance(value, type) and issubclass(value, QCAlgorithm) and value is not QCAlgorithm
+    ]
+    if class_name is not None:
+        classes = [c for c in classes if c.__name__ == class_name]
+    if len(classes) != 1:
+        found = ", ".join(c.__name__ for c in classes) or "none"
+        raise ValueError(f"expected one QCAlgorithm subclass in {path}, found {found}")
+    return classes[0]
+
+
+def run(algorithm_class, data_root, start=None, end=None, fee_per_contract=0.0, echo=False, profiler=None):
+    return Engine(algorithm_class, data_root, start, end, fee_per_contract, echo, profiler).run()
@@ -0,0 +1,39 @@
+"""
+PascalCase / snake_case aliasing.
+
+Lean's Python API answers to both `self.Portfolio.TotalPortfolioValue` and
+`self.portfolio.total_portfolio_value`. The local classes are written in
+snake_case; Pep8 resolves any PascalCase attribute to its snake_case twin.
+"""
+import re
+from functools import lru_cache
+
+_ACRONYM = re.compile(r"([A-Z]+)([A-Z][a-z])")
+_WORD = re.compile(r"([a-z0-9])([A-Z])")
+
+
+@lru_cache(maxsize=None)
+def snake(name):
+    """'TotalPortfolioValue' -> 'total_portfolio_value', 'ID' -> 'id'."""
+    return _WORD.sub(r"\1_\2", _ACRONYM.sub(r"\1_\2", name)).lower()
+
+
+class Pep8:
+    __slots__ = ()
+
+    def __getattr__(self, name):
+        if name[:1].isupper():
+            alias = snake(name)
+            if alias != name:
+                return getattr(self, alias)
+        raise AttributeError(f"{type(self).__name__!s} has no attribute {name!r}")
+
+
+class Enum:
+    """Namespace of constants reachable as both MINUTE and Minute."""
+
+    def __init_subclass__(cls):
+        for name, value in list(vars(cls).items()):
+            if name.isupper() and isinstance(value, (int, str)):
+                pascal = "".join(part.capitalize() for part in name.split("_"))
+                setattr(cls, pascal, value)
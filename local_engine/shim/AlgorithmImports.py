@@ -0,0 +1,15 @@
+"""Stand-in for Lean's AlgorithmImports when running under local_engine."""
+from datetime import date, datetime, time, timedelta
+
+import numpy as np
+
+from local_engine.algorithm import (
+    Option, OptionContractSecurity, QCAlgorithm, Security, SecurityHolding, SecurityManager,
+    SecurityPortfolioManager,
+)
+from local_engine.api import (
+    AccountType, BrokerageName, Chart, DataNormalizationMode, DayOfWeek, Greeks, Leg, OptionChain,
+    OptionContract, OptionFilterUniverse, OptionRight, OptionStyle, OrderDirection, OrderEvent,
+    OrderStatus, OrderTicket, OrderType, Resolution, SecurityType, Series, SeriesType, Slice, Symbol,
+    TimeZones, TradeBar, TradeBarConsolidator,
+)
@@ -0,0 +1 @@
+from AlgorithmImports import *  # noqa: F401,F403
@@ -0,0 +1,2 @@
+"""Stand-in for the QuantConnect namespaces when running under local_engine."""
+from AlgorithmImports import *  # noqa: F401,F403
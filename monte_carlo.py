@@ -0,0 +1,60 @@
+import argparse
+import time
+from functools import partial
+
+from lib.bootstrap import CIRCULAR, KINDS
+from lib.market_data import load_market_data
+from lib.monte_carlo import (PERCENTILES, BlockBootstrap, Gbm, LeapConfig, VixRegime, leap_paths, pmcc_paths,
+                             risk_table, simulate)
+from lib.pmcc import PmccConfig
+
+MODELS = {"bootstrap": BlockBootstrap, "regime": VixRegime, "gbm": Gbm}
+
+
+# python3 monte_carlo.py                                   PMCC, block bootstrap, 10,000 paths x 15 years
+# python3 monte_carlo.py --bootstrap stationary --block-days 10
+# python3 monte_carlo.py --strategy leap --contracts 5 --model regime --paths 100000
+def main():
+    parser = argparse.ArgumentParser(
+        description="P&L and drawdown distributions of PMCC or LEAP rules over simulated paths.")
+    parser.add_argument("--strategy", choices=("pmcc", "leap"), default="pmcc")
+    parser.add_argument("--model", choices=sorted(MODELS), default="bootstrap")
+    parser.add_argument("--bootstrap", choices=KINDS, default=CIRCULAR, help="block scheme of the bootstrap model")
+    parser.add_argument("--block-days", type=int, default=BlockBootstrap.block_days,
+                        help="(mean) bootstrap block length")
+    parser.add_argument("--paths", type=int, default=10_000)
+    parser.add_argument("--years", type=float, default=15)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, help="processes (default: every core)")
+    parser.add_argument("--capital", type=float, help="PMCC capital per share (default: 10x the starting spot)")
+    parser.add_argument("--contracts", type=int, default=LeapConfig.contracts, help="LEAP contracts per entry")
+    parser.add_argument("--cash", type=float, default=LeapConfig.cash, help="LEAP starting cash")
+    args = parser.parse_args()
+
+    if args.strategy == "pmcc":
+        runner = partial(pmcc_paths, config=PmccConfig(), capital=args.capital)
+    else:
+        runner = partial(leap_paths, config=LeapConfig(contracts=args.contracts, cash=args.cash))
+
+    model = MODELS[args.model]()
+    if args.model == "bootstrap":
+        model = BlockBootstrap(args.block_days, args.bootstrap)
+
+    market = load_market_data()
+    start = time.perf_counter()
+    moments = simulate(runner, model, market, args.paths, args.years, args.seed, workers=args.workers)
+    elapsed = time.perf_counter() - start
+    table = risk_table(moments)
+
+    print(f"\n=== {args.strategy.upper()} Monte Carlo: {args.paths:,} {args.model} paths x {args.years:g} years "
+          f"in {elapsed:.1f}s ===")
+    print(f"{'percentile':>12} " + " ".join(f"{p:>10}" for p in PERCENTILES))
+    print(f"{'P&L':>12} " + " ".join(f"{v:>10,.0f}" for v in table["pnl"]))
+    print(f"{'CAGR':>12} " + " ".join(f"{v:>10.1%}" for v in table["cagr"]))
+    print(f"{'Max DD':>12} " + " ".join(f"{v:>10.1%}" for v in table["max_drawdown"]))
+    print(f"{'Sharpe':>12} " + " ".join(f"{v:>10.2f}" for v in table["sharpe"]))
+    print(f"Losing paths: {table['loss_probability']:.1%}")
+
+
+if __name__ == "__main__":
+    main()
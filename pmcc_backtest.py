@@ -0,0 +1,18 @@
+import time
+
+from lib.market_data import load_market_data
+from lib.pmcc import PmccConfig, run_pmcc, write_trades_csv
+
+# Same defaults as pmcc_backtest.rb; override fields to try other setups,
+# e.g. PmccConfig(days_to_long=90, short_strike_multiplier=1.05).
+CONFIG = PmccConfig()
+
+market = load_market_data()
+
+start = time.perf_counter()
+trades = run_pmcc(market, CONFIG)
+elapsed = time.perf_counter() - start
+
+write_trades_csv(trades, "results/trades.csv")
+
+print(f"Backtest complete in {elapsed * 1e3:.1f} ms. Results saved to results/trades.csv.")
@@ -0,0 +1,45 @@
+import time
+
+from lib.market_data import load_market_data
+from lib.sweep import parameter_grid, sweep, sweep_stats, write_sweep_csv
+
+# === GRID ===
+GRID = dict(
+    days_to_long=[45, 60, 90, 120],
+    days_to_short=[21, 30, 45],
+    long_strike_multiplier=[0.90, 0.95, 1.00],
+    short_strike_multiplier=[1.02, 1.03, 1.05],
+)
+# Per-share dollars backing the overlapping positions: a new PMCC opens every
+# session, so ~30 debits of up to ~$31 are out at once.
+CAPITAL = 1_000
+RANK_BY = "sharpe"  # any lib.return_stats.ReturnStats field
+
+
+def main():
+    market = load_market_data()
+    configs = [c for c in parameter_grid(**GRID) if c.days_to_short < c.days_to_long]
+
+    start = time.perf_counter()
+    results = list(sweep(market, configs, capital=CAPITAL))
+    rows = write_sweep_csv(results, "results/sweep.csv", parameters=GRID)
+    elapsed = time.perf_counter() - start
+
+    start = time.perf_counter()
+    stats = sweep_stats(results)
+    ranked = stats.rank(RANK_BY)
+    ranking = time.perf_counter() - start
+
+    print(f"\n=== PMCC Sweep: {len(rows)} configs in {elapsed:.2f}s, ranked by {RANK_BY} in {ranking * 1000:.1f} ms ===")
+    print("long short k_long k_short | trades  win%   avg pnl  avg roi  median roi |   CAGR  Sharpe  Sortino  Max DD")
+    for i in ranked[:10]:
+        row = rows[i]
+        print(f"{row['days_to_long']:>4} {row['days_to_short']:>5} {row['long_strike_multiplier']:>6.2f} "
+              f"{row['short_strike_multiplier']:>7.2f} | {row['trades']:>6} {row['win_rate']:>5.1f} "
+              f"{row['avg_pnl']:>9.2f} {row['avg_roi']:>8.2f} {row['median_roi']:>11.2f} | "
+              f"{stats.cagr[i]:>6.1%} {stats.sharpe[i]:>7.2f} {stats.sortino[i]:>8.2f} {stats.max_drawdown[i]:>7.1%}")
+    print("Full table saved to results/sweep.csv.")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,7 +2,8 @@ from QuantConnect import *
 from QuantConnect.Algorithm import *
 from QuantConnect.Data import *
 from QuantConnect.Orders import OrderStatus
-from datetime import timedelta   # ← Added for TimeSpan equivalent
+
+from lib.spread_mark import MID, SpreadMarks
 
 class ZeroDTEBullPutSpreadSPX(QCAlgorithm):
     def Initialize(self):
@@ -30,6 +31,11 @@ class ZeroDTEBullPutSpreadSPX(QCAlgorithm):
         self.short_leg = None
         self.long_leg = None
         self.last_debug_day = None
+        self.last_entry_day = None   # one spread a day, even after an early exit
+
+        # Marks the open spread from its legs' quotes and fires the
+        # profit target / stop loss (see ManagePosition)
+        self.marks = SpreadMarks()
 
         # Entry at 10:00 AM ET
         self.Schedule.On(
@@ -38,13 +44,6 @@ class ZeroDTEBullPutSpreadSPX(QCAlgorithm):
             self.TryEnterSpread
         )
 
-        # Check profit/stop-loss every minute after entry
-        self.Schedule.On(
-            self.DateRules.EveryDay(self.spx),
-            self.TimeRules.Every(timedelta(minutes=1)),   # Fixed: use timedelta
-            self.ManagePosition
-        )
-
         # Forced exit near close
         self.Schedule.On(
             self.DateRules.EveryDay(self.spx),
@@ -53,8 +52,13 @@ class ZeroDTEBullPutSpreadSPX(QCAlgorithm):
         )
 
     def OnData(self, slice: Slice):
+        # Profit target / stop loss on the held legs' quotes
+        self.marks.update(slice)
+
         if self.spread_active or self.Portfolio.Invested:
             return
+        if self.last_entry_day == self.Time.date():
+            return
 
         # VIX Filter
         if self.vix in slice.Bars:
@@ -131,31 +135,38 @@ class ZeroDTEBullPutSpreadSPX(QCAlgorithm):
         self.long_leg = long_put.Symbol
         self.entry_credit = net_credit
         self.spread_active = True
+        self.last_entry_day = self.Time.date()
+
+        max_profit = net_credit
+        self.marks.track(
+            [(short_put.Symbol, -1), (long_put.Symbol, 1)],
+            net_credit,
+            target_price=net_credit - 0.5 * max_profit,   # 50% profit target
+            stop_price=net_credit + 2.0 * max_profit,     # 2x credit stop loss
+            on_target=self.ManagePosition,
+            on_stop=self.ManagePosition,
+            mode=MID,
+            quotes=[(short_bid, short_ask), (long_bid, long_ask)]
+        )
 
-    def ManagePosition(self):
+    def ManagePosition(self, mark):
         if not self.spread_active or not self.Portfolio.Invested:
             return
 
-        # Current P/L calculation (in dollars per spread)
-        short_value = self.Portfolio[self.short_leg].HoldingsValue if self.short_leg and self.short_leg in self.Portfolio else 0
-        long_value = self.Portfolio[self.long_leg].HoldingsValue if self.long_leg and self.long_leg in self.Portfolio else 0
-        current_pnl = (short_value + long_value) / 100.0
-
-        max_profit = self.entry_credit * 100
-        profit_target = 0.5 * max_profit          # 50% profit target
-        stop_loss = -2.0 * max_profit             # 2x credit stop loss
+        # Spread P/L in dollars per spread, legs marked at the mid
+        current_pnl = mark.pnl * 100
 
-        if current_pnl >= profit_target:
+        if mark.price <= mark.target_price:
             self.Debug(f"Profit target hit ({current_pnl:.0f}) - Closing spread")
-            self.ExitPositions()
-        elif current_pnl <= stop_loss:
+        else:
             self.Debug(f"Stop-loss hit ({current_pnl:.0f}) - Closing spread")
-            self.ExitPositions()
+        self.ExitPositions()
 
     def TryEnterSpread(self):
         pass
 
     def ExitPositions(self):
+        self.marks.clear()
         if self.Portfolio.Invested:
             self.Liquidate()
             self.spread_active = False
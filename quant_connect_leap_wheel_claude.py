@@ -1,5 +1,9 @@
 # region imports
 from AlgorithmImports import *
+
+from lib.chain_index import ChainIndex
+from lib.trade_journal import ASSIGN, EXPIRE, FILL, OPEN, TradeJournal
+from lib.wheel_state import COVERED_CALL, SHORT_PUT, WheelState, wheel_state
 # endregion
 
 class TslaLeapWheelAlgorithm(QCAlgorithm):
@@ -46,8 +50,37 @@ class TslaLeapWheelAlgorithm(QCAlgorithm):
         # Cooldown: don't re-scan the same day we placed an order
         self.last_trade_date: datetime | None = None
 
-        # -- Trade log storage ----------------------------------------
-        self._trade_log: list[str] = []
+        # Wheel state; sleeps through the days a sold LEAP is just being held
+        self.wheel = WheelState()
+        self._position_state: int = 0  # last "Position State" point, re-plotted on skipped days
+
+        # Chain index of the current slice, shared by every pick at that time
+        self._chain_index: ChainIndex | None = None
+        self._chain_index_time: datetime | None = None
+
+        # -- Trade journal (written out in OnEndOfAlgorithm) -----------
+        self.journal = TradeJournal()
+        self.opened = self.journal.kind(
+            OPEN, ("contracts", "strike", "expiry", "bid", "premium", "tsla", "portfolio"),
+            "[TRADE-OPEN] {time} | SELL {tag} x{contracts:.0f} | Strike={strike:g} | Expiry={expiry} | "
+            "Bid={bid:.2f} | Premium=${premium:,.0f} | TSLA=${tsla:.2f} | Portfolio=${portfolio:,.0f}",
+            objects=("expiry",),
+        )
+        self.assigned = self.journal.kind(
+            ASSIGN, ("symbol", "quantity", "price", "shares"),
+            "[TRADE-ASSIGN] {time} | {tag} ASSIGNED | {symbol} | FillQty={quantity:g} | "
+            "FillPrice=${price:.2f} | TSLA shares {shares:+,.0f}",
+            objects=("symbol",),
+        )
+        self.expired = self.journal.kind(
+            EXPIRE, ("symbol",),
+            "[TRADE-CLOSE] {time} | {tag} EXPIRED/WORTHLESS | Symbol={symbol}",
+            objects=("symbol",),
+        )
+        self.equity_fills = self.journal.kind(
+            FILL, ("quantity", "price", "portfolio"),
+            "[EQUITY-FILL] {time} | TSLA qty={quantity:+.0f} @ ${price:.2f} | Portfolio=${portfolio:,.0f}",
+        )
 
         # -- Custom charts --------------------------------------------
         equity_chart = Chart("Strategy vs Benchmark")
@@ -83,6 +116,12 @@ class TslaLeapWheelAlgorithm(QCAlgorithm):
         if tsla_price <= 0:
             return
 
+        # -- Fast path: a held LEAP can only change at expiry or assignment;
+        #    the charts still get today's point, from the cached state
+        if not self.wheel.due(today, tsla_price):
+            self._plot(tsla_price)
+            return
+
         # -- Refresh share count from portfolio -----------------------
         self.shares_held = int(self.Portfolio[self.tsla].Quantity)
 
@@ -95,19 +134,11 @@ class TslaLeapWheelAlgorithm(QCAlgorithm):
         has_shares     = self.shares_held >= 100
 
         # Log state only when it changes
-        state_name = "CASH"
-        if has_shares and has_short_call:
-            state_name = "COVERED_CALL"
-        elif has_shares:
-            state_name = "LONG_STOCK"
-        elif has_short_put:
-            state_name = "SHORT_PUT"
-
-        if not hasattr(self, '_last_logged_state') or self._last_logged_state != state_name:
+        state_name = wheel_state(has_shares, has_short_put, has_short_call)
+        if self.wheel.enter(state_name):
             self.Log(f"[STATE-CHANGE] {today} | {state_name} | "
                      f"TSLA=${tsla_price:.2f} | Shares={self.shares_held} | "
                      f"Portfolio=${self.Portfolio.TotalPortfolioValue:,.0f}")
-            self._last_logged_state = state_name
 
         # --- State 0: cash - open short puts --------------------------
         if not has_short_put and not has_short_call and not has_shares:
@@ -117,13 +148,26 @@ class TslaLeapWheelAlgorithm(QCAlgorithm):
         elif has_shares and not has_short_call:
             self._sell_leap_call(tsla_price, today)
 
+        # --- Holding a confirmed short: nothing to do until it expires
+        #     (or OnOrderEvent sees it assigned and wakes the wheel) ----
+        elif state_name in (SHORT_PUT, COVERED_CALL):
+            held = self._short_put_symbol if state_name == SHORT_PUT else self._short_call_symbol
+            expiry = held.ID.Date.date()
+            if today < expiry:
+                self.wheel.sleep(until=expiry)
+
         # -- Charts ---------------------------------------------------
+        self._position_state = 1 if has_shares else 0
+        self._plot(tsla_price)
+
+    # ------------------------------------------------------------------ #
+    #  Daily chart points (also on days the fast path skips)
+    # ------------------------------------------------------------------ #
+    def _plot(self, tsla_price: float):
         portfolio_value = self.Portfolio.TotalPortfolioValue
         self.Plot("Strategy vs Benchmark", "Wheel Portfolio", portfolio_value)
         self.Plot("Strategy vs Benchmark", "TSLA Price",      tsla_price)
-
-        state = 1 if has_shares else 0
-        self.Plot("Position State", "State", state)
+        self.Plot("Position State", "State", self._position_state)
 
     # ------------------------------------------------------------------ #
     #  Sell maximum affordable LEAP puts
@@ -152,12 +196,9 @@ class TslaLeapWheelAlgorithm(QCAlgorithm):
         self._short_put_symbol = contract.Symbol
         self.last_trade_date = today
 
-        log_entry = (f"[TRADE-OPEN] {today} | SELL PUT x{max_contracts} | "
-                     f"Strike={contract.Strike} | Expiry={contract.Expiry.date()} | "
-                     f"Bid={contract.BidPrice:.2f} | Premium=${premium:,.0f} | "
-                     f"TSLA=${tsla_price:.2f} | Portfolio=${self.Portfolio.TotalPortfolioValue:,.0f}")
-        self.Log(log_entry)
-        self._trade_log.append(log_entry)
+        self.journal.record(self.opened, today, max_contracts, contract.Strike, contract.Expiry.date(),
+                             contract.BidPrice, premium, tsla_price, self.Portfolio.TotalPortfolioValue,
+                             tag="PUT")
 
     # ------------------------------------------------------------------ #
     #  Sell LEAP covered calls (1 per 100 shares held)
@@ -185,12 +226,9 @@ class TslaLeapWheelAlgorithm(QCAlgorithm):
         self._short_call_symbol = contract.Symbol
         self.last_trade_date = today
 
-        log_entry = (f"[TRADE-OPEN] {today} | SELL CALL x{max_calls} | "
-                     f"Strike={contract.Strike} | Expiry={contract.Expiry.date()} | "
-                     f"Bid={contract.BidPrice:.2f} | Premium=${premium:,.0f} | "
-                     f"TSLA=${tsla_price:.2f} | Portfolio=${self.Portfolio.TotalPortfolioValue:,.0f}")
-        self.Log(log_entry)
-        self._trade_log.append(log_entry)
+        self.journal.record(self.opened, today, max_calls, contract.Strike, contract.Expiry.date(),
+                             contract.BidPrice, premium, tsla_price, self.Portfolio.TotalPortfolioValue,
+                             tag="CALL")
 
     # ------------------------------------------------------------------ #
     #  Pick the best contract from the live chain
@@ -200,35 +238,26 @@ class TslaLeapWheelAlgorithm(QCAlgorithm):
         if chain is None:
             return None
 
-        candidates = [
-            c for c in chain
-            if c.Right == right
-            and c.BidPrice > 0
-            and timedelta(days=365) <= (c.Expiry.date() - self.Time.date()) <= timedelta(days=730)
-        ]
-        if not candidates:
-            return None
-
-        best_expiry = min(
-            {c.Expiry for c in candidates},
-            key=lambda e: abs((e.date() - target_expiry).days)
+        today = self.Time.date()
+        return chain.nearest(
+            right, target_strike, target_expiry,
+            earliest=today + timedelta(days=365), latest=today + timedelta(days=730),
         )
-        same_expiry = [c for c in candidates if c.Expiry == best_expiry]
-        best = min(same_expiry, key=lambda c: abs(c.Strike - target_strike))
-        return best
 
     # ------------------------------------------------------------------ #
-    #  Retrieve the current option chain
+    #  Index the current option chain (once per slice)
     # ------------------------------------------------------------------ #
     def _get_option_chain(self):
         chain_provider = self.CurrentSlice
         if chain_provider is None:
             return None
-        if not chain_provider.OptionChains.ContainsKey(self.option_symbol):
-            return None
-        chain = chain_provider.OptionChains[self.option_symbol]
-        contracts = list(chain)
-        return contracts if contracts else None
+        if self._chain_index_time != self.Time:
+            self._chain_index_time = self.Time
+            self._chain_index = None
+            if chain_provider.OptionChains.ContainsKey(self.option_symbol):
+                index = ChainIndex(chain_provider.OptionChains[self.option_symbol], min_bid=0.0)
+                self._chain_index = index if index else None
+        return self._chain_index
 
     # ------------------------------------------------------------------ #
     #  Sync open-option state with actual portfolio
@@ -237,15 +266,13 @@ class TslaLeapWheelAlgorithm(QCAlgorithm):
         if self._short_put_symbol is not None:
             qty = self.Portfolio[self._short_put_symbol].Quantity
             if qty == 0:
-                self.Log(f"[TRADE-CLOSE] {self.Time.date()} | PUT EXPIRED/WORTHLESS | "
-                         f"Symbol={self._short_put_symbol}")
+                self.journal.record(self.expired, self.Time.date(), self._short_put_symbol, tag="PUT")
                 self._short_put_symbol = None
 
         if self._short_call_symbol is not None:
             qty = self.Portfolio[self._short_call_symbol].Quantity
             if qty == 0:
-                self.Log(f"[TRADE-CLOSE] {self.Time.date()} | CALL EXPIRED/WORTHLESS | "
-                         f"Symbol={self._short_call_symbol}")
+                self.journal.record(self.expired, self.Time.date(), self._short_call_symbol, tag="CALL")
                 self._short_call_symbol = None
 
     # ------------------------------------------------------------------ #
@@ -263,24 +290,19 @@ class TslaLeapWheelAlgorithm(QCAlgorithm):
         if symbol.SecurityType == SecurityType.Option:
 
             if symbol == self._short_put_symbol and qty > 0:
-                log_entry = (f"[TRADE-ASSIGN] {date_str} | PUT ASSIGNED | {symbol} | "
-                             f"FillQty={qty} | FillPrice=${price:.2f} | "
-                             f"Acquired {qty * 100} TSLA shares")
-                self.Log(log_entry)
-                self._trade_log.append(log_entry)
+                self.wheel.wake()
+                # Acquired qty * 100 shares
+                self.journal.record(self.assigned, date_str, symbol, qty, price, qty * 100, tag="PUT")
                 self._short_put_symbol = None
 
             elif symbol == self._short_call_symbol and qty > 0:
-                log_entry = (f"[TRADE-ASSIGN] {date_str} | CALL ASSIGNED | {symbol} | "
-                             f"FillQty={qty} | FillPrice=${price:.2f} | "
-                             f"{qty * 100} TSLA shares called away")
-                self.Log(log_entry)
-                self._trade_log.append(log_entry)
+                self.wheel.wake()
+                # qty * 100 shares called away
+                self.journal.record(self.assigned, date_str, symbol, qty, price, -qty * 100, tag="CALL")
                 self._short_call_symbol = None
 
         elif symbol == self.tsla:
-            self.Log(f"[EQUITY-FILL] {date_str} | TSLA qty={qty:+.0f} @ ${price:.2f} | "
-                     f"Portfolio=${self.Portfolio.TotalPortfolioValue:,.0f}")
+            self.journal.record(self.equity_fills, date_str, qty, price, self.Portfolio.TotalPortfolioValue)
 
     # ------------------------------------------------------------------ #
     #  OnEndOfAlgorithm - summary
@@ -298,9 +320,9 @@ class TslaLeapWheelAlgorithm(QCAlgorithm):
         self.Log(f"  Total Value       : ${total_value:,.2f}")
         self.Log(f"  Open Short Put    : {self._short_put_symbol}")
         self.Log(f"  Open Short Call   : {self._short_call_symbol}")
-        self.Log(f"  Total Trades      : {len(self._trade_log)}")
+        self.Log(f"  Total Trades      : {self.journal.count(OPEN) + self.journal.count(ASSIGN)}")
+        self.Log(f"  Days handled      : {self.wheel.handled} ({self.wheel.skipped} held days skipped)")
         self.Log("-" * 70)
         self.Log("TRADE HISTORY:")
-        for entry in self._trade_log:
-            self.Log(entry)
+        self.journal.emit(self.Log)
         self.Log("=" * 70)
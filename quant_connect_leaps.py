@@ -1,5 +1,7 @@
 from AlgorithmImports import *
 
+from lib.trade_journal import OPEN, TradeJournal
+
 class LeapStrategy(QCAlgorithm):
     def Initialize(self):
         self.ticker = "SPY"  # Change ticker here
@@ -18,6 +20,17 @@ class LeapStrategy(QCAlgorithm):
         self.trade_counter = 0
         self.last_trade_date = None
 
+        # Entry records, written out with the summary in OnEndOfAlgorithm
+        self.journal = TradeJournal()
+        self.opened = self.journal.kind(
+            OPEN,
+            ("trade", "contracts", "expiry", "strike", "ask", "delta", "equity", "open_contracts", "free_margin"),
+            "{time:%Y-%m-%d} Trade#{trade:.0f} Bought {contracts:.0f}x {tag} {expiry:%Y-%m-%d} Call ${strike:.0f} "
+            "at ${ask:.2f}, delta {delta:.2f} | Equity: ${equity:.2f}, Contracts: {open_contracts:.0f}, "
+            "Free Margin: ${free_margin:.2f}",
+            objects=("expiry",)
+        )
+
     def OptionFilter(self, universe):
         return universe.IncludeWeeklys().Strikes(-10, 10).Expiration(360, 391)
 
@@ -88,9 +101,9 @@ class LeapStrategy(QCAlgorithm):
                         "open_contracts_at_entry": open_contracts_now
                     }
                     self.open_trades.append(trade_info)
-                    log_msg = f"{self.Time.strftime('%Y-%m-%d')} Trade#{self.trade_counter} Bought {self.contracts_to_buy}x {self.ticker} {c.Expiry.strftime('%Y-%m-%d')} Call ${c.Strike:.0f} at ${c.AskPrice:.2f}, delta {c.Greeks.Delta:.2f} | Equity: ${equity_now:.2f}, Contracts: {open_contracts_now}, Free Margin: ${available_margin:.2f}"
-                    self.Debug(log_msg)
-                    self.Log(log_msg)
+                    self.journal.record(self.opened, self.Time, self.trade_counter, self.contracts_to_buy,
+                                        c.Expiry, c.Strike, c.AskPrice, c.Greeks.Delta, equity_now,
+                                        open_contracts_now, available_margin, tag=self.ticker)
                     return
 
     def OnEndOfAlgorithm(self):
@@ -108,6 +121,8 @@ class LeapStrategy(QCAlgorithm):
 
         self.open_trades.clear()
 
+        self.journal.emit(self.Log)
+
         header = f"\nTRADE SUMMARY for {self.ticker}\nTrade# | Entry Date | Exit Date | Expiry | Strike | Entry Price | Exit Price | Delta | Profit % | Equity | Open Contracts | Free Margin\n" + "-"*140
         self.Debug(header)
         self.Log(header)
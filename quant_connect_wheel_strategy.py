@@ -1,5 +1,7 @@
 from AlgorithmImports import *
 
+from lib.trade_journal import EXPIRE, OPEN, TradeJournal
+
 class WheelStrategyTSLA(QCAlgorithm):
 
     def Initialize(self):
@@ -22,6 +24,18 @@ class WheelStrategyTSLA(QCAlgorithm):
         self.last_log_date = None
         self.last_state = None
 
+        # Trade and expiry records, written out in OnEndOfAlgorithm
+        self.journal = TradeJournal()
+        self.opened = self.journal.kind(
+            OPEN, ("strike", "dte", "delta", "premium", "price", "quantity", "balance"),
+            "[TRADE] {time} | {tag}, Strike: {strike:g}, DTE: {dte:.0f}, Delta: {delta:.2f}, "
+            "Premium: {premium:.2f}, Price: {price:.2f}, Qty: {quantity:.0f}, Balance: {balance:.2f}"
+        )
+        self.expired = self.journal.kind(
+            EXPIRE, ("price", "balance"),
+            "[EXPIRY] {time} | {tag}, Price: {price:.2f}, Balance: {balance:.2f}"
+        )
+
     def OptionFilter(self, universe):
         return universe.Strikes(-60, 60).Expiration(timedelta(28), timedelta(35)).IncludeWeeklys()
 
@@ -46,7 +60,7 @@ class WheelStrategyTSLA(QCAlgorithm):
                 status = "Executed (CALL Assigned)"
                 self.holding_stock = False
 
-            self.Debug(f"[EXPIRY] {self.Time.date()} | {status}, Price: {stock_price:.2f}, Balance: {self.RollingBalance():.2f}")
+            self.journal.record(self.expired, self.Time.date(), stock_price, self.RollingBalance(), tag=status)
 
             self.contract = None
             self.position = None
@@ -134,9 +148,11 @@ class WheelStrategyTSLA(QCAlgorithm):
         dte = (contract.Expiry.date() - self.Time.date()).days
         price = self.Securities[self.symbol].Price
 
-        self.Debug(f"[TRADE] {self.Time.date()} | {option_type}, Strike: {contract.Strike}, "
-                   f"DTE: {dte}, Delta: {delta:.2f}, Premium: {premium:.2f}, "
-                   f"Price: {price:.2f}, Qty: {quantity}, Balance: {self.RollingBalance():.2f}")
+        self.journal.record(self.opened, self.Time.date(), contract.Strike, dte, delta, premium, price, quantity,
+                            self.RollingBalance(), tag=option_type)
 
     def RollingBalance(self):
-        return self.Portfolio.TotalPortfolioValue
\ No newline at end of file
+        return self.Portfolio.TotalPortfolioValue
+
+    def OnEndOfAlgorithm(self):
+        self.journal.emit(self.Log)
@@ -0,0 +1,52 @@
+import argparse
+import time
+
+import numpy as np
+
+from lib.market_data import SPY_PATH, VIX_PATH, read_daily_csv, to_dates
+from lib.synthetic_chains import ChainModel, csv_chains
+from local_engine import data
+
+CLOSE_MINUTE = 16 * 60
+
+# python3 synthesize_chains.py --start 2010-01-01 --end 2024-12-31
+#     SPY chains off the VIX into data/synthetic, one bar and one chain per session at the close
+# python3 synthesize_chains.py --underlying path/to/tsla_daily.csv --ticker TSLA --vol-scale 2.5 --strike-step 10
+# python3 local_backtest.py quant_connect_leap_wheel_claude.py --data data/synthetic
+parser = argparse.ArgumentParser(description="Write synthetic daily option chains as local_engine data.")
+parser.add_argument("--underlying", default=SPY_PATH, help="dated CSV with open,high,low,close columns")
+parser.add_argument("--vol", default=VIX_PATH, help="dated CSV of the vol index, in points, column 'vix'")
+parser.add_argument("--ticker", default="SPY")
+parser.add_argument("--out", default="data/synthetic", help="local_engine data root")
+parser.add_argument("--start")
+parser.add_argument("--end")
+parser.add_argument("--strikes", type=int, default=ChainModel.strikes, help="strikes either side of the money")
+parser.add_argument("--strike-step", type=float, help="strike spacing in dollars (default: ~1%% of spot)")
+parser.add_argument("--weeks", type=int, default=ChainModel.weeks, help="weekly expiries listed")
+parser.add_argument("--months", type=int, default=ChainModel.months, help="monthly expiries listed")
+parser.add_argument("--vol-scale", type=float, default=ChainModel.vol_scale,
+                    help="underlying vol as a multiple of the index")
+parser.add_argument("--skew", type=float, default=ChainModel.skew)
+parser.add_argument("--spread", type=float, default=ChainModel.spread_fraction, help="spread as a fraction of price")
+args = parser.parse_args()
+
+model = ChainModel(strikes=args.strikes, strike_step=args.strike_step, weeks=args.weeks, months=args.months,
+                   vol_scale=args.vol_scale, skew=args.skew, spread_fraction=args.spread)
+dates, bars = read_daily_csv(args.underlying, data.BAR_FIELDS[:4])
+row = dict(zip(dates.tolist(), range(len(dates))))
+minute = np.array([CLOSE_MINUTE], dtype=np.int16)
+
+started = time.perf_counter()
+sessions = contracts = 0
+for chain in csv_chains(args.underlying, model, args.start, args.end, vol_path=args.vol):
+    day = to_dates([chain.day])[0].item()
+    i = row[chain.day]
+    data.write_minute_bars(args.out, args.ticker, day, minute=minute, volume=np.zeros(1),
+                           **{name: bars[name][i:i + 1] for name in data.BAR_FIELDS[:4]})
+    data.write_option_quotes(args.out, args.ticker, day, minute=np.full(len(chain.strike), CLOSE_MINUTE, np.int16),
+                             expiry=chain.expiry, right=chain.right, strike=chain.strike,
+                             bid=chain.bid, ask=chain.ask, delta=chain.delta)
+    sessions += 1
+    contracts += len(chain.strike)
+print(f"{sessions:,} sessions, {contracts:,} contracts written to {args.out} "
+      f"in {time.perf_counter() - started:.1f}s")
@@ -0,0 +1,80 @@
+import csv
+import time
+from datetime import date
+
+from lib.event_calendar import EventCalendar
+from lib.gap_reversal import GapReversalRules
+from lib.sweep import parameter_grid
+from lib.walk_forward import fold_rows, monthly_folds, stability, walk_forward
+from lib.zero_dte_sessions import INTRABAR, MINUTE, NO_TRADE, SessionSnapshots, ZeroDteParameters, evaluate_grid
+
+# === SETUP ===
+DATA = "data/local"  # local_engine minute files (see local_engine/data.py)
+START = date(2020, 1, 1)
+END = date(2026, 5, 22)
+RULES = GapReversalRules(bar_minutes=5, skip_if_gap_closes=False)
+TRAIN_MONTHS = 12
+TEST_MONTHS = 3
+OBJECTIVE = "pnl"  # or "sharpe"
+QUANTITY = 2
+FEE_PER_CONTRACT = 0.0
+FILLS = MINUTE  # or INTRABAR: fill stops where the reconstructed intrabar path crosses them
+
+# === GRID ===
+GRID = dict(
+    minimum_short_otm_percent=[0.0075, 0.01, 0.0125],
+    maximum_hedge_otm_percent=[0.02, 0.03],
+    minimum_short_price=[0.25, 0.35, 0.45],
+    maximum_hedge_price=[0.15, 0.25],
+    minimum_net_credit=[0.25, 0.35],
+    credit_target=[0.40, 0.50, 0.60],
+    stop_loss_multiple=[2.0, 3.0, 4.0, 100.0],
+)
+
+
+def main():
+    configs = [c for c in parameter_grid(ZeroDteParameters(), **GRID)
+               if c.minimum_net_credit <= c.maximum_net_credit
+               and c.minimum_short_otm_percent < c.maximum_hedge_otm_percent]
+
+    start = time.perf_counter()
+    snapshots = SessionSnapshots.build(
+        DATA, START, END, rules=RULES, calendar=EventCalendar.load(),
+        strike_band=max(GRID["maximum_hedge_otm_percent"]), intrabar=FILLS == INTRABAR,
+    )
+    print(f"{len(snapshots)} signal days snapshotted in {time.perf_counter() - start:.1f}s "
+          f"({snapshots.nbytes / 2**20:.0f} MiB)")
+
+    start = time.perf_counter()
+    pnl, traded = [], []
+    for params, outcomes in evaluate_grid(snapshots, configs, QUANTITY, FEE_PER_CONTRACT, fills=FILLS):
+        pnl.append(outcomes.pnl)
+        traded.append(outcomes.exit != NO_TRADE)
+    print(f"{len(configs)} configs evaluated in {time.perf_counter() - start:.1f}s")
+
+    folds = monthly_folds(snapshots.days, TRAIN_MONTHS, TEST_MONTHS)
+    results = walk_forward(pnl, snapshots.days, folds, OBJECTIVE, traded)
+    rows = fold_rows(configs, results, GRID)
+    if rows:
+        with open("results/walk_forward.csv", "w", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=list(rows[0]), lineterminator="\n")
+            writer.writeheader()
+            writer.writerows(rows)
+
+    print(f"\n=== Walk-forward: {len(results)} folds, train {TRAIN_MONTHS}m / test {TEST_MONTHS}m ===")
+    print("test window              |  train P&L   test P&L  trades  win%  beat  hindsight")
+    for r, row in zip(results, rows):
+        print(f"{row['test_start']} .. {row['test_end']} | "
+              f"{r.train_pnl:>9,.0f} {r.test_pnl:>10,.0f} {r.test_trades:>7} {r.test_win_rate:>5.1f} "
+              f"{r.test_percentile:>5.0%} {r.best_test_pnl:>10,.0f}")
+    if results:
+        print(f"Out-of-sample total: ${sum(r.test_pnl for r in results):,.0f}")
+
+    print("\n=== Parameter stability ===")
+    for name, (chosen, value, share) in stability(configs, results, GRID).items():
+        print(f"{name:<27} {value!s:>7} chosen in {share:>4.0%} of folds | {' '.join(str(v) for v in chosen)}")
+    print("Fold table saved to results/walk_forward.csv.")
+
+
+if __name__ == "__main__":
+    main()